@@ -1,17 +1,37 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
-from pydantic import BaseModel
-from typing import List, Dict, Optional
+from fastapi.responses import HTMLResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, ValidationError
+from typing import Awaitable, Callable, List, Dict, Literal, Optional
+from datetime import date
+import copy
 import json
 import os
+import uuid
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
+from openai.types import CompletionUsage
+from openai.types.chat import ChatCompletionMessage
+import asyncio
 import logging
-
-from tools.shipping_tracker import get_shipping_status
-from prompts.system_prompt_no_vector import SYSTEM_PROMPT_NO_VECTOR
+import time
+
+from tools.shipping_tracker import add_live_tracking, carrier, find_orders, get_shipping_status, iter_shipping_statuses
+from tools.definitions import TOOLS_BY_PROMPT, registry as tool_registry
+from core.router import ModelRouter, ORDER_LOOKUP
+from core.retrieval import RetrievalModes
+from core.response_cache import ResponseCache, fingerprint
+from core.singleflight import SingleFlight
+from core.session_locks import SessionBusyError, SessionLocks
+from core.catalog import Catalog, CatalogError, CatalogWatcher, get_catalog, on_catalog_change, reload_catalog
+from core.prompt_state import PromptState
+from core.profiling import RequestProfiler
+from core.session_store import SessionStore
+from core.chat_socket import SlowConsumerError, SocketChannel, SocketStats
+from core.order_updates import OrderStatusFeed
+from core.cancellation import CancellationStats, ClientDisconnected, cancel_on_disconnect
+from core.idempotency import IdempotencyConflict, IdempotencyStore, request_fingerprint
 
 load_dotenv()
 
@@ -32,16 +52,89 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# OPENAI_BASE_URL points the app at another OpenAI-compatible API (e.g. scripts/fake_llm_server.py for load tests)
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL")
+
+client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), base_url=OPENAI_BASE_URL)
+
+# Relevance-pruned catalog injection for the catalog prompt variant
+CATALOG_PRUNING_ENABLED = os.getenv("CATALOG_PRUNING_ENABLED", "true").lower() not in ("0", "false", "no")
+
+# Load and compile the product catalog at startup (shared by all subsystems)
+prompt_state = PromptState(get_catalog(), pruning=CATALOG_PRUNING_ENABLED)
+
+# Model tiering - picks model + prompt variant per message
+router = ModelRouter.from_env()
+router.validate_prompts(prompt_state.system_prompts)
+
+# Retrieval strategy for product questions (RETRIEVAL_MODE: full / vector / hybrid, overridable per request)
+retrieval = RetrievalModes.from_env()
+
+# Exact-match cache for first-turn questions (quick prompts etc.)
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() not in ("0", "false", "no")
+response_cache = ResponseCache.from_env()
+
+# Semantic cache for paraphrased first-turn questions (needs faiss + numpy)
+semantic_cache = None
+if os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() in ("1", "true", "yes"):
+    from core.semantic_cache import SemanticCache
+    # Embeddings use a sync client off the event loop (shared helper in tools/vector_search.py)
+    semantic_cache = SemanticCache.from_env(OpenAI(api_key=os.getenv("OPENAI_API_KEY"), base_url=OPENAI_BASE_URL))
+    logger.info(f"🧠 Semantic cache enabled (threshold: {semantic_cache.threshold})")
+
+# Identical concurrent first-turn questions share one upstream call
+singleflight = SingleFlight()
+
+# One request at a time per session (SESSION_LOCK_POLICY: wait / reject / cancel)
+session_locks = SessionLocks.from_env()
+
+def swap_prompt_state(catalog: Catalog):
+    """Build prompts for a reloaded catalog; the returned swap installs them and drops catalog-dependent caches"""
+    new_state = PromptState(catalog, pruning=CATALOG_PRUNING_ENABLED)
+
+    def swap():
+        global prompt_state
+        prompt_state = new_state
+
+        response_cache.clear()
+        if semantic_cache:
+            semantic_cache.invalidate()
+
+    return swap
 
-# Load full menu at startup
-logger.info("Loading full product catalog...")
-with open('data/products.json', 'r') as f:
-    FULL_MENU = json.load(f)
-logger.info(f"✅ Loaded {len(FULL_MENU)} products from catalog")
+on_catalog_change(swap_prompt_state)
 
-# In-memory conversation storage (use Redis/DB in production)
-conversations: Dict[str, List[Dict]] = {}
+# Optional file watcher (CATALOG_WATCH_INTERVAL seconds); started with the app
+catalog_watcher = CatalogWatcher.from_env()
+
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+# Opt-in request profiling: X-Profile header (with admin token) or PROFILE_SAMPLE_RATE
+profiler = RequestProfiler.from_env()
+
+# Conversation storage: in memory by default, durable with SESSION_STORE=sqlite/redis
+# Holds user/assistant/tool turns only; the system prompt is chosen per turn by the router
+sessions = SessionStore.from_env()
+
+# WebSocket chat: per-connection counters and the shared order-status push feed
+socket_stats = SocketStats()
+order_feed = OrderStatusFeed.from_env(get_shipping_status)
+
+# Work abandoned by disconnected/cancelling clients
+cancellations = CancellationStats()
+
+# Tool rounds per turn before the model has to answer without tools
+MAX_TOOL_ROUNDS = int(os.getenv("MAX_TOOL_ROUNDS", "3"))
+
+# Results of requests sent with an Idempotency-Key, for retries
+idempotency = IdempotencyStore.from_env()
+
+# Messages a socket may queue while its current answer is in progress
+WS_MAX_PENDING = int(os.getenv("WS_MAX_PENDING", "4"))
+
+# Bulk order-status lookups: ids per request, and results per streamed chunk
+ORDER_STATUS_MAX_IDS = int(os.getenv("ORDER_STATUS_MAX_IDS", "10000"))
+ORDER_STATUS_CHUNK = int(os.getenv("ORDER_STATUS_CHUNK", "500"))
 
 class Message(BaseModel):
     role: str
@@ -50,146 +143,530 @@ class Message(BaseModel):
 class ChatRequest(BaseModel):
     message: str
     session_id: Optional[str] = "default"
+    retrieval_mode: Optional[Literal["full", "vector", "hybrid"]] = None
+    # Retries with the same key (or Idempotency-Key header) get the original's answer
+    idempotency_key: Optional[str] = None
 
 class ChatResponse(BaseModel):
     response: str
     session_id: str
 
-# OpenAI function/tool definition - only shipping tracker
-TOOLS = [
-    {
-        "type": "function",
-        "function": {
-            "name": "get_shipping_status",
-            "description": "Look up order/shipment status by order ID. Use this when customers ask about their order, delivery status, tracking information, or when they mention an order number.",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "order_id": {
-                        "type": "string",
-                        "description": "The order ID to look up (format: ORD-XXXX, e.g., ORD-1001)"
+class OrderStatusRequest(BaseModel):
+    order_ids: List[str]
+
+async def get_conversation_history(session_id: str) -> List[Dict]:
+    """Get or initialize conversation history (without system prompt)"""
+    return await sessions.get(session_id)
+
+def build_messages(system_content: str, history: List[Dict]) -> List[Dict]:
+    """
+    Prepend the system prompt for this turn
+
+    The request prefix is kept byte-identical across requests for upstream prompt
+    caching: static instructions, then the canonical tool schemas (sent alongside),
+    then the catalog, with only per-turn product details and history after that.
+    """
+    return [{"role": "system", "content": system_content}] + history
+
+def cached_prompt_tokens(usage) -> int:
+    """Prompt tokens served from the upstream prompt cache (0 when the API doesn't report it)"""
+    details = getattr(usage, "prompt_tokens_details", None)
+    # Older SDKs keep unknown usage fields as plain dicts
+    if isinstance(details, dict):
+        return details.get("cached_tokens") or 0
+    return getattr(details, "cached_tokens", None) or 0
+
+def completion_kwargs(route, messages: List[Dict], tools: Optional[List[Dict]]) -> Dict:
+    kwargs = {"model": route.model, "messages": messages, "temperature": 0}
+    if tools:
+        kwargs["tools"] = tools
+        kwargs["tool_choice"] = "auto"
+    if route.max_tokens:
+        kwargs["max_tokens"] = route.max_tokens
+    return kwargs
+
+def record_usage(route, usage: CompletionUsage):
+    cached_tokens = cached_prompt_tokens(usage)
+
+    logger.info(f"📊 Tokens [{route.model}] - Prompt: {usage.prompt_tokens} (cached: {cached_tokens}), Completion: {usage.completion_tokens}, Total: {usage.total_tokens}")
+    router.record(route, route.model, usage.prompt_tokens, usage.completion_tokens, cached_tokens)
+
+async def create_completion(route, messages: List[Dict], tools: Optional[List[Dict]]):
+    """Call OpenAI with the route's model and record usage against its tier"""
+    try:
+        response = await client.chat.completions.create(**completion_kwargs(route, messages, tools))
+    except asyncio.CancelledError:
+        # Cancelling closes the HTTP request, so the upstream stops generating
+        cancellations.upstream_calls += 1
+        raise
+    record_usage(route, response.usage)
+    return response
+
+async def stream_completion(route, messages: List[Dict], tools: Optional[List[Dict]], on_delta: Callable[[str], Awaitable[None]]) -> ChatCompletionMessage:
+    """
+    Streaming variant of create_completion
+
+    Content deltas are passed to on_delta as they arrive; tool calls are
+    assembled from their fragments. Returns the complete assistant message.
+    """
+    content = []
+    tool_calls: Dict[int, Dict] = {}
+    usage = None
+    stream = None
+    try:
+        stream = await client.chat.completions.create(
+            **completion_kwargs(route, messages, tools),
+            stream=True,
+            extra_body={"stream_options": {"include_usage": True}}
+        )
+        async for chunk in stream:
+            # The final chunk carries usage and no choices (older SDKs keep it as a dict)
+            usage = getattr(chunk, "usage", None) or usage
+            if not chunk.choices:
+                continue
+
+            delta = chunk.choices[0].delta
+            if delta.content:
+                content.append(delta.content)
+                await on_delta(delta.content)
+            for fragment in delta.tool_calls or []:
+                call = tool_calls.setdefault(fragment.index, {"id": None, "type": "function", "function": {"name": "", "arguments": ""}})
+                if fragment.id:
+                    call["id"] = fragment.id
+                if fragment.function:
+                    call["function"]["name"] += fragment.function.name or ""
+                    call["function"]["arguments"] += fragment.function.arguments or ""
+    except asyncio.CancelledError:
+        cancellations.upstream_calls += 1
+        raise
+    finally:
+        # Closing the response stops the upstream stream when we bail out early
+        if stream is not None:
+            await stream.response.aclose()
+
+    if usage is not None:
+        record_usage(route, CompletionUsage.model_validate(usage) if isinstance(usage, dict) else usage)
+
+    return ChatCompletionMessage.model_validate({
+        "role": "assistant",
+        "content": "".join(content) or None,
+        "tool_calls": [tool_calls[index] for index in sorted(tool_calls)] or None,
+    })
+
+async def run_turn(
+    state: PromptState,
+    route,
+    history: List[Dict],
+    user_message: str,
+    on_delta: Optional[Callable[[str], Awaitable[None]]] = None
+) -> List[Dict]:
+    """
+    Run one conversation turn against the model
+
+    Args:
+        state: Catalog-derived prompts for this turn
+        route: Route chosen by the model router
+        history: Prior turns (not modified)
+        user_message: The new user message
+        on_delta: Receives response text as it streams (None: no streaming)
+
+    Returns:
+        The turn's messages: user message, any tool call/result messages, final assistant message
+    """
+    turn = [{"role": "user", "content": user_message}]
+    system_content = state.system_prompt(route.prompt, history, user_message)
+    tools = TOOLS_BY_PROMPT.get(route.prompt) if route.tools else None
+
+    async def complete(messages: List[Dict], tools: Optional[List[Dict]]) -> ChatCompletionMessage:
+        if on_delta is None:
+            return (await create_completion(route, messages, tools=tools)).choices[0].message
+        return await stream_completion(route, messages, tools, on_delta)
+
+    # Each round runs all requested tool calls concurrently; the round after
+    # MAX_TOOL_ROUNDS offers no tools, so the model has to answer
+    for round_number in range(1, MAX_TOOL_ROUNDS + 2):
+        round_tools = tools if round_number <= MAX_TOOL_ROUNDS else None
+        logger.info(f"🤖 Calling OpenAI API (round {round_number}{', no tools' if tools and not round_tools else ''})...")
+        response_message = await complete(build_messages(system_content, history + turn), round_tools)
+
+        if not response_message.tool_calls:
+            break
+
+        tool_calls = response_message.tool_calls
+        logger.info(f"🔧 {len(tool_calls)} tool call(s): {', '.join(tc.function.name for tc in tool_calls)}")
+        turn.append({
+            "role": "assistant",
+            "content": response_message.content or "",
+            "tool_calls": [
+                {
+                    "id": tc.id,
+                    "type": tc.type,
+                    "function": {
+                        "name": tc.function.name,
+                        "arguments": tc.function.arguments
                     }
-                },
-                "required": ["order_id"]
-            }
-        }
-    }
-]
+                } for tc in tool_calls
+            ]
+        })
+        # gather keeps the results in call order; a single call skips the task it would wrap
+        if len(tool_calls) == 1:
+            turn.append(await execute_tool_call(tool_calls[0]))
+        else:
+            turn.extend(await asyncio.gather(*(execute_tool_call(tc) for tc in tool_calls)))
+
+    if round_number == 1:
+        logger.info(f"✅ Direct response (no tools needed)")
 
-def get_conversation_history(session_id: str) -> List[Dict]:
-    """Get or initialize conversation history with full menu in system prompt"""
-    if session_id not in conversations:
-        logger.info(f"🆕 New session: {session_id}")
+    turn.append({"role": "assistant", "content": response_message.content})
+    return turn
 
-        # Build system prompt with full catalog
-        system_content = SYSTEM_PROMPT_NO_VECTOR + "\n\n" + "="*80 + "\nFULL PRODUCT CATALOG:\n" + "="*80 + "\n\n" + json.dumps(FULL_MENU, indent=2)
+async def execute_tool_call(tool_call) -> Dict:
+    """
+    Run one tool call through the registry (which applies the tool's mode,
+    timeout, result cache and size limit)
 
-        conversations[session_id] = [
-            {"role": "system", "content": system_content}
-        ]
+    Returns:
+        The tool message for the call
+    """
+    name = tool_call.function.name
+    try:
+        args = json.loads(tool_call.function.arguments or "{}")
+    except json.JSONDecodeError:
+        result = {"success": False, "error": "Tool arguments were not valid JSON"}
+    else:
+        logger.info(f"   {name}: {args}")
+        try:
+            result = await tool_registry.run(name, args)
+        except asyncio.CancelledError:
+            cancellations.tool_calls += 1
+            raise
+
+    return {
+        "tool_call_id": tool_call.id,
+        "role": "tool",
+        "name": name,
+        "content": json.dumps(result)
+    }
 
-        logger.info(f"📦 Injected {len(FULL_MENU)} products into system prompt")
+def is_admin(x_admin_token: Optional[str]) -> bool:
+    return bool(ADMIN_TOKEN) and x_admin_token == ADMIN_TOKEN
 
-    return conversations[session_id]
+def require_admin(x_admin_token: Optional[str]):
+    if not is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
 
 @app.post("/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest):
+async def chat(request: ChatRequest, response: Response, http_request: Request):
+    # Optional headers (X-Profile, X-Admin-Token, Idempotency-Key) are read directly:
+    # declaring them as Header() parameters costs more per request than the rest of the dispatch
+    headers = http_request.headers
+    key = request.idempotency_key or headers.get("idempotency-key")
+    profiler.requests_in_flight += 1
     try:
-        logger.info(f"\n{'='*60}")
-        logger.info(f"💬 User [{request.session_id}]: {request.message}")
+        trigger = profiler.trigger(requested=bool(headers.get("x-profile")) and is_admin(headers.get("x-admin-token")))
+        if trigger is None:
+            return await cancel_on_disconnect(http_request, answer_idempotent(request, key, response), cancellations)
+
+        with profiler.profile(trigger, request.session_id, request.message) as profile:
+            if profile:
+                response.headers["X-Profile-Id"] = profile.id
+            return await cancel_on_disconnect(http_request, answer_idempotent(request, key, response), cancellations)
+
+    except ClientDisconnected:
+        # Nobody is listening; 499 (client closed request) only shows up in access logs
+        logger.info(f"🛑 Client disconnected [{request.session_id}] - request cancelled")
+        return Response(status_code=499)
+    finally:
+        profiler.requests_in_flight -= 1
+
+async def answer_idempotent(request: ChatRequest, key: Optional[str], response: Response) -> ChatResponse:
+    """
+    Answer a request at most once per idempotency key
+
+    Keyed work is shielded from the client disconnecting: the retry that
+    follows a dropped connection attaches to it or gets its stored result.
+    """
+    if not key:
+        return await answer_chat(request)
 
-        # Get conversation history (includes full menu in system prompt)
-        messages = get_conversation_history(request.session_id)
+    fingerprint = request_fingerprint(request.message, request.retrieval_mode)
+    try:
+        result, replayed = await idempotency.run(f"{request.session_id}:{key}", fingerprint, lambda: answer_chat(request))
+    except IdempotencyConflict:
+        raise HTTPException(status_code=422, detail=f"Idempotency-Key {key!r} was already used for a different request")
 
-        # Add user message
-        messages.append({"role": "user", "content": request.message})
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return result
 
-        # Call OpenAI - single call with full menu already in context
-        logger.info(f"🤖 Calling OpenAI API (full menu in context)...")
+async def answer_chat(request: ChatRequest) -> ChatResponse:
+    """Serialize on the session and map failures to HTTP errors"""
+    try:
+        async with session_locks.hold(request.session_id):
+            return await handle_chat(request)
 
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=messages,
-            tools=TOOLS,
-            tool_choice="auto",
-            temperature=0
-        )
+    except SessionBusyError as e:
+        logger.warning(f"⏳ {str(e)}")
+        raise HTTPException(status_code=409, detail=str(e))
 
-        logger.info(f"📊 Tokens - Prompt: {response.usage.prompt_tokens}, Completion: {response.usage.completion_tokens}, Total: {response.usage.total_tokens}")
-
-        response_message = response.choices[0].message
-
-        # Check if tool calls are needed (shipping status)
-        if response_message.tool_calls:
-            logger.info(f"🔧 Tool call requested: {response_message.tool_calls[0].function.name}")
-
-            # Save assistant message with tool calls
-            assistant_message = {
-                "role": "assistant",
-                "content": response_message.content or "",
-                "tool_calls": [
-                    {
-                        "id": tc.id,
-                        "type": tc.type,
-                        "function": {
-                            "name": tc.function.name,
-                            "arguments": tc.function.arguments
-                        }
-                    } for tc in response_message.tool_calls
-                ]
-            }
-            messages.append(assistant_message)
-
-            # Execute tool calls
-            for tool_call in response_message.tool_calls:
-                function_name = tool_call.function.name
-                function_args = json.loads(tool_call.function.arguments)
-
-                if function_name == "get_shipping_status":
-                    order_id = function_args.get('order_id')
-                    logger.info(f"   Looking up order: {order_id}")
-
-                    function_response = json.dumps(get_shipping_status(order_id))
-
-                    # Add function response to messages
-                    messages.append({
-                        "tool_call_id": tool_call.id,
-                        "role": "tool",
-                        "name": function_name,
-                        "content": function_response
-                    })
-
-            # Get final response after tool execution
-            logger.info(f"🤖 Calling OpenAI API for final response...")
-
-            second_response = client.chat.completions.create(
-                model="gpt-4o",
-                messages=messages,
-                temperature=0
-            )
-
-            logger.info(f"📊 Tokens - Prompt: {second_response.usage.prompt_tokens}, Completion: {second_response.usage.completion_tokens}, Total: {second_response.usage.total_tokens}")
-
-            final_message = second_response.choices[0].message.content
-        else:
-            # Direct response without tools
-            logger.info(f"✅ Direct response (no tools needed)")
-            final_message = response_message.content
+    except asyncio.CancelledError:
+        # Superseded by a newer message on the same session (cancel policy)
+        task = asyncio.current_task()
+        if session_locks.was_superseded(task):
+            task.uncancel()
+            raise HTTPException(status_code=409, detail="Superseded by a newer message on this session")
+        raise
 
-        # Add assistant response to history
-        messages.append({"role": "assistant", "content": final_message})
+    except Exception as e:
+        logger.error(f"❌ Error: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
 
-        logger.info(f"✅ Response sent ({len(final_message)} chars)")
-        logger.info(f"{'='*60}\n")
+async def handle_chat(request: ChatRequest, on_delta: Optional[Callable[[str], Awaitable[None]]] = None) -> ChatResponse:
+    """Answer one message (streaming text to on_delta, if given); callers hold the session lock"""
+    logger.info(f"\n{'='*60}")
+    logger.info(f"💬 User [{request.session_id}]: {request.message}")
+    started = time.perf_counter()
+
+    # Pin the catalog/prompt version for the whole turn (a reload may swap it meanwhile)
+    state = prompt_state
+
+    # Get conversation history and route this turn to a model tier
+    history = await get_conversation_history(request.session_id)
+    route = retrieval.apply(router.route(request.message, has_history=bool(history)), request.retrieval_mode)
+    logger.info(f"🧭 Route: {route.category} → {route.model} (prompt: {route.prompt}, tools: {route.tools})")
+
+    # Stateless questions (no prior context) can be answered from cache.
+    # Order lookups are never cached - their answers depend on live order data.
+    stateless = not history and route.category != ORDER_LOOKUP
+    cache_key = None
+    semantic_embedding = None
+    semantic_hit = None
+    if stateless:
+        cache_namespace = f"{route.model}:{state.prompt_versions[route.prompt]}"
+        cache_key = fingerprint(request.message, cache_namespace, state.catalog_version)
+        cached = response_cache.get(cache_key) if RESPONSE_CACHE_ENABLED else None
+
+        # Paraphrases miss the exact cache; try the semantic cache next.
+        # Audited hits fall through to the model so the answers can be compared.
+        if cached is None and semantic_cache:
+            semantic_embedding = await asyncio.to_thread(semantic_cache.embed, request.message)
+            semantic_hit = semantic_cache.lookup(semantic_embedding, cache_namespace, state.catalog_version)
+            if semantic_hit and not semantic_hit.audit:
+                logger.info(f"🧠 Semantic hit: '{semantic_hit.question}' (sim: {semantic_hit.similarity:.3f})")
+                cached = semantic_hit.response
+
+        if cached is not None:
+            sessions.append(request.session_id, [
+                {"role": "user", "content": request.message},
+                {"role": "assistant", "content": cached},
+            ])
+            logger.info(f"⚡ Cache hit ({(time.perf_counter() - started) * 1000:.1f}ms)")
+            if on_delta:
+                await on_delta(cached)
+            return ChatResponse(response=cached, session_id=request.session_id)
+
+    # The turn reaches history only once complete, so a cancelled turn leaves no partial messages behind
+    try:
+        if stateless and on_delta is None:
+            # Identical first-turn questions in flight share one upstream call
+            turn, shared = await singleflight.do(cache_key, lambda: run_turn(state, route, [], request.message))
+            if shared:
+                # The leader's turn starts with its own wording of the question; followers
+                # record theirs, and get private copies of the tool call/result messages
+                turn = [{"role": "user", "content": request.message}] + copy.deepcopy(turn[1:])
+        else:
+            turn, shared = await run_turn(state, route, history, request.message, on_delta), False
+    except asyncio.CancelledError:
+        cancellations.turns_discarded += 1
+        logger.info(f"🛑 Turn cancelled [{request.session_id}] - history unchanged")
+        raise
+
+    final_message = turn[-1]["content"]
+
+    # Only the caller that made the upstream call populates the caches;
+    # answers that needed tools are not cached
+    if stateless and not shared and len(turn) == 2 and final_message:
+        if RESPONSE_CACHE_ENABLED:
+            response_cache.put(cache_key, final_message)
+
+        if semantic_hit:
+            semantic_cache.record_audit(semantic_hit, request.message, final_message)
+        elif semantic_embedding is not None:
+            semantic_cache.store(semantic_embedding, request.message, final_message, cache_namespace, state.catalog_version)
+
+    # Add the whole turn to history at once (persisted in the background)
+    sessions.append(request.session_id, turn)
+
+    latency_ms = (time.perf_counter() - started) * 1000
+    router.record_request(route, latency_ms)
+
+    logger.info(f"✅ Response sent ({len(final_message)} chars, {latency_ms:.0f}ms, tier: {route.category}{', coalesced' if shared else ''})")
+    logger.info(f"{'='*60}\n")
+
+    return ChatResponse(
+        response=final_message,
+        session_id=request.session_id
+    )
+
+def order_results(history: List[Dict]) -> List[Dict]:
+    """Successful order lookups made during the latest turn of a history"""
+    results = []
+    for message in reversed(history):
+        if message["role"] == "user":
+            break
+        if message["role"] == "tool" and message.get("name") == "get_shipping_status":
+            result = json.loads(message["content"])
+            if result.get("success"):
+                results.append(result)
+    return results
+
+async def answer_socket_message(channel: SocketChannel, session_id: str, data: Dict, watch: Callable[[Dict], None]):
+    """Answer one socket message, streaming the response as delta frames tagged with the message's id"""
+    message_id = data.get("id")
+
+    def frame(frame_type: str, **fields) -> Dict:
+        return {"type": frame_type, "id": message_id, **fields}
 
-        return ChatResponse(
-            response=final_message,
-            session_id=request.session_id
+    try:
+        request = ChatRequest(
+            session_id=session_id,
+            **{key: data[key] for key in ("message", "retrieval_mode") if key in data}
         )
+    except ValidationError as e:
+        await channel.send(frame("error", status=422, detail=e.errors(include_url=False)))
+        return
+
+    socket_stats.messages += 1
+    await channel.send(frame("start"))
+    profiler.requests_in_flight += 1
+    try:
+        async with session_locks.hold(session_id):
+            response = await handle_chat(request, on_delta=lambda text: channel.send(frame("delta", content=text)))
+            for result in order_results(await get_conversation_history(session_id)):
+                watch(result)
+
+    except SlowConsumerError:
+        raise
+
+    except SessionBusyError as e:
+        logger.warning(f"⏳ {str(e)}")
+        await channel.send(frame("error", status=409, detail=str(e)))
+
+    except asyncio.CancelledError:
+        task = asyncio.current_task()
+        if session_locks.was_superseded(task):
+            task.uncancel()
+            await channel.send(frame("error", status=409, detail="Superseded by a newer message on this session"))
+            return
+        raise
 
     except Exception as e:
         logger.error(f"❌ Error: {str(e)}", exc_info=True)
-        raise HTTPException(status_code=500, detail=str(e))
+        await channel.send(frame("error", status=500, detail=str(e)))
+
+    else:
+        await channel.send(frame("done", response=response.response))
+
+    finally:
+        profiler.requests_in_flight -= 1
+
+@app.websocket("/ws/chat")
+async def chat_socket(websocket: WebSocket, session_id: Optional[str] = None):
+    """
+    Chat over one WebSocket bound to one session
+
+    Client frames:
+        {"message": "...", "id": optional, "retrieval_mode": optional}
+        {"type": "cancel"} - stop the answer in progress and drop queued messages
+    Server frames: session, start, delta (streamed text), done, error,
+    cancelled (each echoing the message's id), and order_status pushes for
+    orders looked up on this socket
+    Messages are answered in order; at most WS_MAX_PENDING may wait.
+    Closing the socket cancels the answer in progress.
+    """
+    await websocket.accept()
+    session_id = session_id or f"ws_{uuid.uuid4().hex[:16]}"
+    channel = SocketChannel.from_env(websocket, socket_stats)
+    channel.start()
+    socket_stats.open += 1
+    socket_stats.opened += 1
+    logger.info(f"🔌 Socket opened [{session_id}]")
+
+    inbox: asyncio.Queue = asyncio.Queue(maxsize=WS_MAX_PENDING)
+    watched: Dict[str, Callable[[Dict], None]] = {}
+    current: Optional[asyncio.Task] = None
+    current_id = None
+
+    def watch(result: Dict):
+        order_id = result["order_id"]
+        if order_id not in watched:
+            watched[order_id] = lambda update: channel.push({"type": "order_status", **update})
+            order_feed.subscribe(order_id, watched[order_id], current=result)
+
+    async def answer_messages():
+        nonlocal current, current_id
+        try:
+            while True:
+                data = await inbox.get()
+                current_id = data.get("id")
+                current = asyncio.create_task(answer_socket_message(channel, session_id, data, watch))
+                # wait() (unlike await) leaves `current` running if this worker is cancelled
+                await asyncio.wait([current])
+                if not current.cancelled():
+                    current.result()
+        except SlowConsumerError as e:
+            logger.warning(f"🐢 Closing socket [{session_id}]: {str(e)}")
+            await websocket.close(code=1013)
+
+    async def cancel_current() -> bool:
+        if current is None or current.done():
+            return False
+        current.cancel()
+        await asyncio.gather(current, return_exceptions=True)
+        return True
+
+    worker = asyncio.create_task(answer_messages())
+    try:
+        await channel.send({"type": "session", "session_id": session_id})
+        while True:
+            try:
+                data = json.loads(await websocket.receive_text())
+            except ValueError:
+                data = None
+            if not isinstance(data, dict):
+                await channel.send({"type": "error", "status": 400, "detail": "Expected a JSON object"})
+                continue
+
+            if data.get("type") == "cancel":
+                while not inbox.empty():
+                    inbox.get_nowait()
+                if await cancel_current():
+                    cancellations.client_cancels += 1
+                    logger.info(f"🛑 Client cancelled the answer in progress [{session_id}]")
+                    await channel.send({"type": "cancelled", "id": current_id})
+                continue
+
+            try:
+                inbox.put_nowait(data)
+            except asyncio.QueueFull:
+                socket_stats.rejected_busy += 1
+                await channel.send({"type": "error", "id": data.get("id"), "status": 429, "detail": "Too many messages waiting for an answer"})
+
+    except (WebSocketDisconnect, SlowConsumerError, RuntimeError):
+        # RuntimeError: receiving after the worker closed a slow consumer
+        pass
+
+    finally:
+        worker.cancel()
+        await asyncio.gather(worker, return_exceptions=True)
+        if await cancel_current():
+            cancellations.socket_disconnects += 1
+            logger.info(f"🛑 Socket closed mid-answer [{session_id}] - answer cancelled")
+        for order_id, callback in watched.items():
+            order_feed.unsubscribe(order_id, callback)
+        await channel.close()
+        socket_stats.open -= 1
+        logger.info(f"🔌 Socket closed [{session_id}]")
 
 @app.get("/", response_class=HTMLResponse)
 async def root():
@@ -515,14 +992,26 @@ async def root():
                 sendMessage();
             }
 
-            async function sendMessage() {
-                const message = input.value.trim();
-                if (!message) return;
-
-                sendBtn.disabled = true;
-                addMessage('user', message);
-                input.value = '';
+            // One socket per page: streamed answers and order updates; POST /chat while it's down
+            let socket = null;
+            let reconnectDelay = 1000;
+            let nextId = 1;
+            let pending = null;
+
+            function connect() {
+                const protocol = location.protocol === 'https:' ? 'wss' : 'ws';
+                const ws = new WebSocket(`${protocol}://${location.host}/ws/chat?session_id=${encodeURIComponent(sessionId)}`);
+                ws.onopen = () => { socket = ws; reconnectDelay = 1000; };
+                ws.onmessage = (event) => handleFrame(JSON.parse(event.data));
+                ws.onclose = () => {
+                    socket = null;
+                    if (pending && !pending.controller) finishPending('Sorry, the connection was lost. Please try again.');
+                    setTimeout(connect, reconnectDelay);
+                    reconnectDelay = Math.min(reconnectDelay * 2, 30000);
+                };
+            }
 
+            function showTyping() {
                 const typingWrapper = document.createElement('div');
                 typingWrapper.className = 'message-wrapper assistant';
                 typingWrapper.innerHTML = `
@@ -535,23 +1024,80 @@ async def root():
                 `;
                 messagesDiv.appendChild(typingWrapper);
                 messagesDiv.scrollTop = messagesDiv.scrollHeight;
+                return typingWrapper;
+            }
+
+            function finishPending(errorText) {
+                pending.typing.remove();
+                if (errorText) addMessage('assistant', errorText);
+                pending = null;
+            }
+
+            // A new message replaces the answer still in progress: stop it on the server too
+            function abortPending() {
+                if (!pending) return;
+                if (pending.controller) {
+                    pending.controller.abort();
+                } else if (socket && socket.readyState === WebSocket.OPEN) {
+                    socket.send(JSON.stringify({ type: 'cancel' }));
+                }
+                if (pending.message) pending.message.textContent += ' …';
+                finishPending();
+            }
+
+            function handleFrame(frame) {
+                if (frame.type === 'order_status') {
+                    addMessage('assistant', `📦 Update on order ${frame.order_id}: ${frame.status}`);
+                } else if (!pending || frame.id !== pending.id) {
+                    return;
+                } else if (frame.type === 'delta') {
+                    if (!pending.message) {
+                        pending.typing.remove();
+                        pending.message = addMessage('assistant', '');
+                    }
+                    pending.message.textContent += frame.content;
+                    messagesDiv.scrollTop = messagesDiv.scrollHeight;
+                } else if (frame.type === 'done') {
+                    if (!pending.message) addMessage('assistant', frame.response);
+                    finishPending();
+                } else if (frame.type === 'error') {
+                    finishPending('Sorry, I encountered an error. Please try again.');
+                }
+            }
+
+            async function sendMessage() {
+                const message = input.value.trim();
+                if (!message) return;
+
+                abortPending();
+                addMessage('user', message);
+                input.value = '';
+
+                const current = { id: nextId++, typing: showTyping(), message: null, controller: null };
+                pending = current;
+
+                if (socket && socket.readyState === WebSocket.OPEN) {
+                    socket.send(JSON.stringify({ id: current.id, message }));
+                    return;
+                }
 
+                current.controller = new AbortController();
                 try {
                     const response = await fetch('/chat', {
                         method: 'POST',
                         headers: { 'Content-Type': 'application/json' },
-                        body: JSON.stringify({ message, session_id: sessionId })
+                        body: JSON.stringify({ message, session_id: sessionId }),
+                        signal: current.controller.signal
                     });
 
                     const data = await response.json();
-                    typingWrapper.remove();
+                    if (pending !== current) return;
+                    finishPending();
                     addMessage('assistant', data.response);
                 } catch (error) {
-                    typingWrapper.remove();
-                    addMessage('assistant', 'Sorry, I encountered an error. Please try again.');
+                    if (error.name === 'AbortError' || pending !== current) return;
+                    finishPending('Sorry, I encountered an error. Please try again.');
                 }
-
-                sendBtn.disabled = false;
             }
 
             function addMessage(role, content) {
@@ -574,8 +1120,11 @@ async def root():
                 wrapper.appendChild(messageContainer);
                 messagesDiv.appendChild(wrapper);
                 messagesDiv.scrollTop = messagesDiv.scrollHeight;
+                return message;
             }
 
+            connect();
+
             // Welcome message
             addMessage('assistant', 'Welcome to Nutraley! I can help you with:\\n\\n• Discovering our natural, organic products\\n• Tracking your order status\\n\\nWhat would you like to know?');
         </script>
@@ -585,7 +1134,154 @@ async def root():
 
 @app.get("/health")
 async def health():
-    return {"status": "ok", "mode": "no_vector", "products_loaded": len(FULL_MENU)}
+    return {"status": "ok", "worker": os.getpid(), "mode": retrieval.default, "products_loaded": len(prompt_state.catalog), "catalog_version": prompt_state.catalog_version}
+
+@app.post("/admin/reload-catalog")
+async def admin_reload_catalog(x_admin_token: Optional[str] = Header(None)):
+    """
+    Validate data/products.json and swap it in without restarting
+
+    Only reloads the worker process serving this request. Under gunicorn with
+    several workers, the others pick up the file through the catalog watcher
+    (CATALOG_WATCH_INTERVAL, on by default there - see gunicorn.conf.py).
+    """
+    require_admin(x_admin_token)
+
+    previous_version = prompt_state.catalog_version
+    try:
+        # Parsing, validation and index/prompt building all happen off the event loop
+        catalog, changed = await asyncio.to_thread(reload_catalog)
+    except CatalogError as e:
+        logger.error(f"❌ Catalog reload rejected: {str(e)}")
+        raise HTTPException(status_code=422, detail=str(e))
+
+    return {
+        "changed": changed,
+        "previous_version": previous_version,
+        "catalog_version": catalog.version,
+        "products_loaded": len(catalog),
+    }
+
+def order_status_lines(order_ids: List[str]):
+    """NDJSON chunks of bulk lookup results (one line per requested order)"""
+    chunk = []
+    for result in iter_shipping_statuses(order_ids):
+        chunk.append(json.dumps(result))
+        if len(chunk) >= ORDER_STATUS_CHUNK:
+            yield "\n".join(chunk) + "\n"
+            chunk = []
+    if chunk:
+        yield "\n".join(chunk) + "\n"
+
+@app.post("/orders/status")
+async def bulk_order_status(request: OrderStatusRequest, x_admin_token: Optional[str] = Header(None)):
+    """
+    Status of many orders at once, streamed as NDJSON in request order
+
+    Each line has the same format as the get_shipping_status tool result.
+    """
+    require_admin(x_admin_token)
+    if len(request.order_ids) > ORDER_STATUS_MAX_IDS:
+        raise HTTPException(status_code=413, detail=f"At most {ORDER_STATUS_MAX_IDS} order IDs per request")
+
+    # A sync iterator, so Starlette reads the order store and formats results in its threadpool
+    return StreamingResponse(order_status_lines(request.order_ids), media_type="application/x-ndjson")
+
+@app.get("/admin/orders")
+async def admin_find_orders(
+    customer_name: Optional[str] = None,
+    status: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    limit: int = 100,
+    x_admin_token: Optional[str] = Header(None)
+):
+    """
+    Search orders by customer, status and order date (YYYY-MM-DD, else 422), newest first
+
+    For support staff only - chat users aren't identified, so the model's
+    shipping tool looks orders up by order ID alone.
+    """
+    require_admin(x_admin_token)
+    result = await asyncio.to_thread(
+        find_orders, customer_name, status,
+        date_from.isoformat() if date_from else None,
+        date_to.isoformat() if date_to else None,
+        max(1, limit)
+    )
+    if not result["success"]:
+        raise HTTPException(status_code=422, detail=result["error"])
+
+    await add_live_tracking(result["orders"])
+    return result
+
+@app.get("/debug/profiles")
+async def list_profiles(x_admin_token: Optional[str] = Header(None)):
+    """Stored request profiles, newest first"""
+    require_admin(x_admin_token)
+    return {"profiles": profiler.summaries()}
+
+@app.get("/debug/profiles/{profile_id}")
+async def get_profile(profile_id: str, x_admin_token: Optional[str] = Header(None)):
+    """Top frames and allocation summary of one profile"""
+    require_admin(x_admin_token)
+    profile = profiler.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile.details()
+
+@app.get("/debug/profiles/{profile_id}/collapsed", response_class=PlainTextResponse)
+async def download_profile_stacks(profile_id: str, x_admin_token: Optional[str] = Header(None)):
+    """Collapsed stacks (flamegraph.pl / speedscope format)"""
+    require_admin(x_admin_token)
+    profile = profiler.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(
+        profile.collapsed,
+        headers={"Content-Disposition": f'attachment; filename="{profile.id}.collapsed.txt"'}
+    )
+
+@app.on_event("startup")
+async def start_catalog_watcher():
+    if catalog_watcher and not catalog_watcher.is_alive():
+        catalog_watcher.start()
+
+@app.on_event("shutdown")
+async def stop_catalog_watcher():
+    if catalog_watcher:
+        catalog_watcher.stop()
+
+@app.on_event("shutdown")
+async def close_carrier_client():
+    if carrier:
+        await carrier.close()
+
+@app.on_event("shutdown")
+async def close_session_store():
+    # Flush turns still queued for the durable store
+    await asyncio.to_thread(sessions.close)
+
+@app.get("/metrics")
+async def metrics():
+    return {
+        "routing": router.snapshot(),
+        "retrieval": retrieval.snapshot(),
+        "response_cache": response_cache.snapshot(),
+        "semantic_cache": semantic_cache.snapshot() if semantic_cache else None,
+        "singleflight": singleflight.snapshot(),
+        "session_locks": session_locks.snapshot(),
+        "catalog_selection": prompt_state.selector.snapshot(),
+        "prompt_prefix": prompt_state.prefix_snapshot(),
+        "profiling": profiler.snapshot(),
+        "sessions": sessions.snapshot(),
+        "websocket": socket_stats.snapshot(),
+        "order_updates": order_feed.snapshot(),
+        "cancellations": cancellations.snapshot(),
+        "idempotency": idempotency.snapshot(),
+        "tools": tool_registry.snapshot(),
+        "carrier": carrier.snapshot() if carrier else None,
+    }
 
 if __name__ == "__main__":
     import uvicorn
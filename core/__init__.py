@@ -0,0 +1 @@
+# Core services for Nutraley Chatbot
@@ -0,0 +1,16 @@
+"""
+Answer similarity for comparing two assistant replies
+Kept free of heavy dependencies so offline scripts (scripts/ab_harness.py) can
+use it without faiss/numpy
+"""
+
+from core.response_cache import normalize_message
+
+
+def answer_overlap(a: str, b: str) -> float:
+    """Jaccard overlap of the word sets of two answers (0.0-1.0)"""
+    words_a = set(normalize_message(a).split())
+    words_b = set(normalize_message(b).split())
+    if not words_a and not words_b:
+        return 1.0
+    return len(words_a & words_b) / len(words_a | words_b)
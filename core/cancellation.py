@@ -0,0 +1,83 @@
+"""
+Cancellation of abandoned requests
+Stops the upstream calls and tool calls made on behalf of a client that has
+gone away (closed tab, aborted fetch, closed socket, explicit cancel)
+"""
+
+import asyncio
+from typing import Any, Awaitable
+import logging
+
+from fastapi import Request
+
+logger = logging.getLogger(__name__)
+
+
+class ClientDisconnected(Exception):
+    """Raised when the HTTP client disconnected before its response was ready"""
+
+
+class CancellationStats:
+    """What was cancelled, and why (reported on /metrics)"""
+
+    def __init__(self):
+        # Why: the client went away or asked to stop
+        self.http_disconnects = 0
+        self.socket_disconnects = 0
+        self.client_cancels = 0
+
+        # What: work that was in flight when the request was cancelled
+        self.turns_discarded = 0
+        self.upstream_calls = 0
+        self.tool_calls = 0
+
+    def snapshot(self) -> dict:
+        return {
+            "http_disconnects": self.http_disconnects,
+            "socket_disconnects": self.socket_disconnects,
+            "client_cancels": self.client_cancels,
+            "turns_discarded": self.turns_discarded,
+            "upstream_calls": self.upstream_calls,
+            "tool_calls": self.tool_calls,
+        }
+
+
+async def _wait_for_disconnect(request: Request):
+    # The body has been read, so the next ASGI message is the disconnect
+    while (await request.receive())["type"] != "http.disconnect":
+        pass
+
+
+async def cancel_on_disconnect(request: Request, work: Awaitable, stats: CancellationStats) -> Any:
+    """
+    Await `work`, cancelling it if the client disconnects first
+
+    The work runs in the calling task; only the disconnect watcher gets a
+    task of its own, and it cancels the caller when the client goes away.
+
+    Raises:
+        ClientDisconnected: the client went away and the work was cancelled
+    """
+    caller = asyncio.current_task()
+    disconnected = False
+
+    def on_disconnect(watcher: asyncio.Task):
+        nonlocal disconnected
+        if not watcher.cancelled() and watcher.exception() is None:
+            disconnected = True
+            caller.cancel()
+
+    watcher = asyncio.ensure_future(_wait_for_disconnect(request))
+    watcher.add_done_callback(on_disconnect)
+    try:
+        return await work
+    except asyncio.CancelledError:
+        if not disconnected:
+            # This request itself was cancelled (e.g. server shutdown)
+            raise
+        caller.uncancel()
+        stats.http_disconnects += 1
+        raise ClientDisconnected()
+    finally:
+        watcher.remove_done_callback(on_disconnect)
+        watcher.cancel()
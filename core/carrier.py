@@ -0,0 +1,303 @@
+"""
+Live carrier tracking
+Fetches tracking events for shipped orders through a pluggable carrier
+adapter, with a pooled HTTP client, a per-tracking-number TTL cache,
+request batching and a time budget per lookup, so a slow carrier never
+holds up an order lookup for long.
+"""
+
+import asyncio
+import os
+from abc import ABC, abstractmethod
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Set
+import logging
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class CarrierError(Exception):
+    """Raised when a carrier lookup fails or returns something unusable"""
+
+
+class CarrierAdapter(ABC):
+    """
+    A carrier's tracking API
+    Subclasses fetch many tracking numbers per call (at most `max_batch`).
+    """
+
+    name = "carrier"
+    max_batch = 50
+
+    @abstractmethod
+    async def fetch(self, tracking_numbers: List[str]) -> Dict[str, dict]:
+        """
+        Tracking for each number the carrier knows
+
+        Returns:
+            Tracking number -> {"status": ..., "events": [{"time", "location", "description"}, ...]}
+            (oldest event first; unknown numbers are left out)
+        """
+
+    async def close(self):
+        pass
+
+
+class HttpCarrierAdapter(CarrierAdapter):
+    """
+    JSON tracking API: POST {base_url}/track {"tracking_numbers": [...]}
+    answered with {"results": {number: {"status": ..., "events": [...]}}}
+    Connections are pooled and reused across lookups.
+    """
+
+    name = "http"
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: Optional[str] = None,
+        max_connections: int = 20,
+        timeout: float = 10.0,
+        max_batch: int = 50,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.max_batch = max_batch
+        # Custom transport, e.g. httpx.ASGITransport over the stub carrier in tests
+        self.transport = transport
+        # Created on first use, inside the worker process and its event loop
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={"Authorization": f"Bearer {self.api_key}"} if self.api_key else None,
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections),
+                transport=self.transport,
+            )
+        return self._client
+
+    async def fetch(self, tracking_numbers: List[str]) -> Dict[str, dict]:
+        response = await self._get_client().post("/track", json={"tracking_numbers": tracking_numbers})
+        response.raise_for_status()
+        body = response.json()
+        if not isinstance(body, dict):
+            raise CarrierError(f"Expected a JSON object, got {type(body).__name__}")
+        return body.get("results", {})
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class CarrierTracker:
+    """
+    Tracking lookups on top of a CarrierAdapter
+    - Fresh results are cached per tracking number for `cache_ttl` seconds
+    - Numbers requested within `batch_wait` of each other share one carrier
+      call, and a number already being fetched is not fetched twice
+    - A lookup waits at most `timeout`; numbers without an answer by then get
+      their last known (stale) result, or None. The fetch keeps running and
+      fills the cache for the next lookup.
+    """
+
+    CACHE_SIZE = 10000
+
+    def __init__(self, adapter: CarrierAdapter, cache_ttl: float = 120.0, timeout: float = 1.5, batch_wait: float = 0.01):
+        self.adapter = adapter
+        self.cache_ttl = cache_ttl
+        self.timeout = timeout
+        self.batch_wait = batch_wait
+
+        # Tracking number -> (fresh until, result); expired entries stay as the stale fallback
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._queued: Dict[str, asyncio.Future] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        # Running fetches; the loop only keeps weak references to tasks
+        self._tasks: Set[asyncio.Task] = set()
+
+        self.lookups = 0
+        self.cache_hits = 0
+        self.batches = 0
+        self.fetched = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.stale_served = 0
+        self.unavailable = 0
+
+    @classmethod
+    def from_env(cls) -> Optional["CarrierTracker"]:
+        """Tracker for the carrier at CARRIER_API_URL, or None when live tracking is off"""
+        base_url = os.getenv("CARRIER_API_URL")
+        if not base_url:
+            return None
+
+        adapter = HttpCarrierAdapter(
+            base_url,
+            api_key=os.getenv("CARRIER_API_KEY"),
+            max_connections=int(os.getenv("CARRIER_MAX_CONNECTIONS", "20")),
+            timeout=float(os.getenv("CARRIER_HTTP_TIMEOUT", "10")),
+            max_batch=int(os.getenv("CARRIER_BATCH_SIZE", "50")),
+        )
+        return cls(
+            adapter,
+            cache_ttl=float(os.getenv("CARRIER_CACHE_TTL", "120")),
+            timeout=float(os.getenv("CARRIER_TIMEOUT", "1.5")),
+            batch_wait=float(os.getenv("CARRIER_BATCH_WAIT_MS", "10")) / 1000,
+        )
+
+    async def track(self, tracking_numbers: Iterable[str]) -> Dict[str, Optional[dict]]:
+        """
+        Live tracking for each number
+
+        Returns:
+            Tracking number -> carrier result ("stale": True when it is an
+            expired cached result), or None when nothing arrived in time
+        """
+        results: Dict[str, Optional[dict]] = {}
+        waiting: Dict[str, asyncio.Future] = {}
+        now = time.monotonic()
+
+        for number in dict.fromkeys(tracking_numbers):
+            self.lookups += 1
+            entry = self._cache.get(number)
+            if entry is not None and entry[0] > now:
+                self.cache_hits += 1
+                self._cache.move_to_end(number)
+                results[number] = entry[1]
+            else:
+                waiting[number] = self._future(number)
+
+        if waiting:
+            # Not cancelled on timeout: late answers still land in the cache
+            await asyncio.wait(waiting.values(), timeout=self.timeout)
+
+        for number, future in waiting.items():
+            # Failed fetches resolve with a CarrierError; unknown numbers with None
+            if future.done() and future.exception() is None and future.result() is not None:
+                results[number] = future.result()
+                continue
+
+            if not future.done():
+                self.timeouts += 1
+            entry = self._cache.get(number)
+            if entry is not None:
+                self.stale_served += 1
+                results[number] = dict(entry[1], stale=True)
+            else:
+                self.unavailable += 1
+                results[number] = None
+
+        return results
+
+    def _future(self, number: str) -> asyncio.Future:
+        """The pending fetch for a number, queueing one if there is none"""
+        future = self._in_flight.get(number) or self._queued.get(number)
+        if future is not None:
+            return future
+
+        loop = asyncio.get_running_loop()
+        future = self._queued[number] = loop.create_future()
+        if len(self._queued) >= self.adapter.max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_wait, self._flush)
+        return future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        queued, self._queued = self._queued, {}
+        numbers = list(queued)
+        for start in range(0, len(numbers), self.adapter.max_batch):
+            batch = {number: queued[number] for number in numbers[start:start + self.adapter.max_batch]}
+            self._in_flight.update(batch)
+            task = asyncio.ensure_future(self._fetch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _fetch(self, batch: Dict[str, asyncio.Future]):
+        """Fetch one batch; every future in it is resolved, whatever happens"""
+        self.batches += 1
+        self.fetched += len(batch)
+        try:
+            found = await self.adapter.fetch(list(batch))
+            if not isinstance(found, dict):
+                raise CarrierError(f"Expected tracking results by number, got {type(found).__name__}")
+        except asyncio.CancelledError:
+            self._fail(batch, CarrierError("Tracking lookup cancelled"))
+            raise
+        except Exception as e:
+            # Failures aren't cached; waiters fall back to stale results
+            self.errors += 1
+            logger.warning(f"⚠️ Carrier {self.adapter.name} tracking failed for {len(batch)} numbers: {str(e) or type(e).__name__}")
+            self._fail(batch, e if isinstance(e, CarrierError) else CarrierError(str(e) or type(e).__name__))
+            return
+
+        fresh_until = time.monotonic() + self.cache_ttl
+        for number, future in batch.items():
+            self._in_flight.pop(number, None)
+            result = found.get(number)
+            # Malformed entries count as unknown numbers
+            if not isinstance(result, dict):
+                result = None
+            if result is not None:
+                self._store(number, fresh_until, result)
+            if not future.done():
+                future.set_result(result)
+
+    def _fail(self, batch: Dict[str, asyncio.Future], error: CarrierError):
+        for number, future in batch.items():
+            self._in_flight.pop(number, None)
+            if not future.done():
+                future.set_exception(error)
+                # Mark it retrieved: its waiters may already have given up
+                future.exception()
+
+    def _store(self, number: str, fresh_until: float, result: dict):
+        self._cache[number] = (fresh_until, result)
+        self._cache.move_to_end(number)
+        while len(self._cache) > self.CACHE_SIZE:
+            self._cache.popitem(last=False)
+
+    async def close(self):
+        """Cancel running fetches and close the adapter's connections"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        self._fail(self._queued, CarrierError("Carrier tracker closed"))
+        self._queued = {}
+
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.adapter.close()
+
+    def snapshot(self) -> dict:
+        return {
+            "carrier": self.adapter.name,
+            "lookups": self.lookups,
+            "cache_hits": self.cache_hits,
+            "cache_hit_rate": round(self.cache_hits / self.lookups, 3) if self.lookups else None,
+            "cached_numbers": len(self._cache),
+            "in_flight": len(self._in_flight),
+            "batches": self.batches,
+            "avg_batch_size": round(self.fetched / self.batches, 1) if self.batches else None,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "stale_served": self.stale_served,
+            "unavailable": self.unavailable,
+        }
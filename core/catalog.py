@@ -0,0 +1,295 @@
+"""
+Compiled product catalog
+Built once from data/products.json and shared by prompt building, catalog
+selection, product lookup and caching; can be hot-reloaded without a restart
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+PRODUCTS_PATH = Path(__file__).parent.parent / "data" / "products.json"
+
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+
+# Key order of rendered products and variants; unknown keys follow alphabetically.
+# Pinned so prompt text stays byte-identical when the file's key order changes
+# (upstream prompt caching needs an identical prefix).
+PRODUCT_KEY_ORDER = (
+    "name", "category", "subcategory", "variants", "description",
+    "key_features", "ingredients", "serving_ideas", "alternative_names",
+)
+VARIANT_KEY_ORDER = ("size", "price")
+
+
+class CatalogError(ValueError):
+    """Raised when a catalog file fails validation"""
+
+
+def validate_products(products) -> None:
+    """
+    Check that a products payload is safe to serve
+
+    Raises:
+        CatalogError: describing the first problems found
+    """
+    if not isinstance(products, list) or not products:
+        raise CatalogError("Catalog must be a non-empty JSON list of products")
+
+    problems = []
+    for i, product in enumerate(products):
+        label = f"product #{i}"
+        if not isinstance(product, dict):
+            problems.append(f"{label}: not an object")
+            continue
+
+        for field in ("name", "category"):
+            if not isinstance(product.get(field), str) or not product[field].strip():
+                problems.append(f"{label}: missing or empty '{field}'")
+        label = product.get("name") or label
+
+        variants = product.get("variants")
+        if not isinstance(variants, list) or not variants:
+            problems.append(f"{label}: 'variants' must be a non-empty list")
+            continue
+        for variant in variants:
+            if not isinstance(variant, dict) or not isinstance(variant.get("size"), str):
+                problems.append(f"{label}: variant without a 'size'")
+            elif not isinstance(variant.get("price"), (int, float)) or isinstance(variant["price"], bool) or variant["price"] < 0:
+                problems.append(f"{label} {variant['size']}: invalid price {variant.get('price')!r}")
+
+        for field in ("alternative_names", "key_features", "serving_ideas"):
+            value = product.get(field)
+            if value is not None and (not isinstance(value, list) or not all(isinstance(item, str) for item in value)):
+                problems.append(f"{label}: '{field}' must be a list of strings")
+
+        for field in ("subcategory", "description", "ingredients"):
+            if product.get(field) is not None and not isinstance(product[field], str):
+                problems.append(f"{label}: '{field}' must be a string")
+
+    if problems:
+        shown = "; ".join(problems[:10])
+        more = f" (+{len(problems) - 10} more)" if len(problems) > 10 else ""
+        raise CatalogError(f"Invalid catalog: {shown}{more}")
+
+
+def _ordered(item: dict, key_order) -> dict:
+    keys = [k for k in key_order if k in item] + sorted(k for k in item if k not in key_order)
+    return {k: item[k] for k in keys}
+
+
+def canonical_product(product: dict) -> dict:
+    """Copy of a product with keys in PRODUCT_KEY_ORDER / VARIANT_KEY_ORDER"""
+    product = _ordered(product, PRODUCT_KEY_ORDER)
+    if isinstance(product.get("variants"), list):
+        product["variants"] = [_ordered(v, VARIANT_KEY_ORDER) for v in product["variants"]]
+    return product
+
+
+def normalize_name(text: str) -> str:
+    """Lowercase and collapse punctuation ("Little Millet Rice (Samai Arisi)" -> "little millet rice samai arisi")"""
+    return _NON_ALNUM_RE.sub(" ", text.lower()).strip()
+
+
+class Catalog:
+    """
+    Immutable, precomputed view of the product catalog
+    - by_name: normalized name / alternative name -> product indexes
+    - by_category: normalized category / subcategory -> product indexes
+    - categories: category -> product indexes (catalog order)
+    - price_ranges: (min, max) variant price per product
+    - version: content hash of the catalog, used to key caches
+    - product_json / compact_text: pre-rendered text per product (canonical key order)
+    """
+
+    def __init__(self, products: List[dict]):
+        self.products = products
+
+        self.by_name: Dict[str, List[int]] = {}
+        self.by_category: Dict[str, List[int]] = {}
+        self.categories: "OrderedDict[str, List[int]]" = OrderedDict()
+        self.price_ranges: List[Optional[Tuple[float, float]]] = []
+
+        for i, product in enumerate(products):
+            for name in [product["name"]] + (product.get("alternative_names") or []):
+                self.by_name.setdefault(normalize_name(name), []).append(i)
+            for category in (product.get("category"), product.get("subcategory")):
+                if category:
+                    self.by_category.setdefault(normalize_name(category), []).append(i)
+            self.categories.setdefault(product["category"], []).append(i)
+
+            prices = [v["price"] for v in product.get("variants") or []]
+            self.price_ranges.append((min(prices), max(prices)) if prices else None)
+
+        self.version = hashlib.sha256(
+            json.dumps(products, sort_keys=True, separators=(",", ":")).encode("utf-8")
+        ).hexdigest()[:12]
+
+        canonical = [canonical_product(p) for p in products]
+        self.full_json = json.dumps(canonical, indent=2)
+        self.product_json = [json.dumps(p, indent=2) for p in canonical]
+        self.compact_text = [self._render_compact(p) for p in products]
+        self.index_text = self._render_index()
+
+    @classmethod
+    def load(cls, path: Path = PRODUCTS_PATH) -> "Catalog":
+        """Load, validate and compile a catalog from a products JSON file"""
+        try:
+            with open(path, 'r') as f:
+                products = json.load(f)
+        except json.JSONDecodeError as e:
+            raise CatalogError(f"Catalog is not valid JSON: {e}")
+        except (OSError, UnicodeDecodeError) as e:
+            raise CatalogError(f"Catalog could not be read: {e}")
+
+        validate_products(products)
+        return cls(products)
+
+    def __len__(self) -> int:
+        return len(self.products)
+
+    @staticmethod
+    def _render_compact(product: dict) -> str:
+        variants = ", ".join(f"{v['size']} ${v['price']:.2f}" for v in product.get("variants") or [])
+        aka = f" (aka {', '.join(product['alternative_names'])})" if product.get("alternative_names") else ""
+        return f"{product['name']}{aka} [{product['category']}] - {variants}"
+
+    def _render_index(self) -> str:
+        """Compact index of every product name, grouped by category"""
+        lines = []
+        for category, ids in self.categories.items():
+            names: List[str] = []
+            for i in ids:
+                product = self.products[i]
+                label = product["name"] if not product.get("subcategory") else f"{product['name']} ({product['subcategory']})"
+                if label not in names:
+                    names.append(label)
+            lines.append(f"- {category}: {'; '.join(names)}")
+        return "\n".join(lines)
+
+
+_catalog: Optional[Catalog] = None
+_listeners: List[Callable[[Catalog], Optional[Callable[[], None]]]] = []
+_reload_lock = threading.Lock()
+
+
+def get_catalog() -> Catalog:
+    """Get or load the shared Catalog instance"""
+    global _catalog
+
+    if _catalog is None:
+        logger.info("Loading full product catalog...")
+        _catalog = Catalog.load()
+        logger.info(f"✅ Loaded {len(_catalog)} products from catalog (version {_catalog.version})")
+
+    return _catalog
+
+
+def on_catalog_change(listener: Callable[[Catalog], Optional[Callable[[], None]]]):
+    """
+    Register a listener for catalog reloads (runs off the request path)
+
+    The listener gets the new, validated catalog and builds whatever it derives
+    from it without touching live state, then returns a function that swaps that
+    state in (or None). Swap functions only run once every listener has built
+    successfully, so they should just assign and clear - not fail.
+    """
+    _listeners.append(listener)
+
+
+def reload_catalog(path: Optional[Path] = None) -> Tuple[Catalog, bool]:
+    """
+    Load, validate and compile the catalog, then swap it in atomically
+
+    Every listener builds its derived state first; the catalog and that state
+    are only swapped in once all of them succeed, so a failure anywhere leaves
+    the current catalog and everything derived from it in place.
+
+    Blocking - call from a worker thread, not the event loop.
+
+    Returns:
+        (catalog, changed) - changed is False when the content hash is unchanged
+
+    Raises:
+        CatalogError: the new catalog is invalid or derived state couldn't be built;
+            the current one stays in place
+    """
+    global _catalog
+
+    with _reload_lock:
+        new_catalog = Catalog.load(path or PRODUCTS_PATH)
+        current = get_catalog()
+        if new_catalog.version == current.version:
+            return current, False
+
+        swaps = []
+        for listener in _listeners:
+            try:
+                swap = listener(new_catalog)
+            except Exception as e:
+                raise CatalogError(f"Catalog rejected while building derived state: {type(e).__name__}: {e}") from e
+            if swap is not None:
+                swaps.append(swap)
+
+        _catalog = new_catalog
+        for swap in swaps:
+            try:
+                swap()
+            except Exception as e:
+                # Keep going: the rest of the state must still move to the new catalog
+                logger.error(f"❌ Catalog swap step failed: {str(e)}", exc_info=True)
+
+    logger.info(f"🔄 Catalog reloaded: {current.version} → {new_catalog.version} ({len(new_catalog)} products)")
+    return new_catalog, True
+
+
+class CatalogWatcher(threading.Thread):
+    """
+    Polls the catalog file's mtime and reloads it when it changes
+    Invalid files are logged and ignored until they are fixed.
+    """
+
+    def __init__(self, path: Path = PRODUCTS_PATH, interval: float = 5.0):
+        super().__init__(name="catalog-watcher", daemon=True)
+        self.path = Path(path)
+        self.interval = interval
+        self._stop_event = threading.Event()
+        self._mtime = self._current_mtime()
+
+    @classmethod
+    def from_env(cls) -> Optional["CatalogWatcher"]:
+        """Watcher polling every CATALOG_WATCH_INTERVAL seconds, or None when unset/0"""
+        interval = float(os.getenv("CATALOG_WATCH_INTERVAL", "0"))
+        return cls(interval=interval) if interval > 0 else None
+
+    def _current_mtime(self) -> Optional[float]:
+        try:
+            return self.path.stat().st_mtime
+        except FileNotFoundError:
+            return None
+
+    def run(self):
+        logger.info(f"👀 Watching {self.path} for catalog changes (every {self.interval}s)")
+        while not self._stop_event.wait(self.interval):
+            mtime = self._current_mtime()
+            if mtime is None or mtime == self._mtime:
+                continue
+            self._mtime = mtime
+
+            try:
+                reload_catalog(self.path)
+            except CatalogError as e:
+                logger.error(f"❌ Catalog reload rejected: {str(e)}")
+            except Exception as e:
+                logger.error(f"❌ Catalog reload failed: {str(e)}", exc_info=True)
+
+    def stop(self):
+        self._stop_event.set()
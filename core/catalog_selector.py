@@ -0,0 +1,201 @@
+"""
+Relevance-pruned catalog injection for the full-menu prompt
+Picks the products relevant to the current turn; a compact index of every
+product name is always included, and the full catalog details only when needed
+"""
+
+import re
+import threading
+from typing import Dict, List, Optional
+import logging
+
+from core.catalog import Catalog
+
+logger = logging.getLogger(__name__)
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+STOP_WORDS = {
+    "a", "an", "and", "any", "are", "about", "can", "do", "does", "for", "from", "have", "how",
+    "i", "in", "is", "it", "me", "my", "of", "on", "or", "please", "show", "some", "tell", "that",
+    "the", "this", "to", "what", "which", "with", "you", "your", "we", "want", "need", "like",
+    "something", "options", "option", "products", "product", "best", "good", "nutraley", "there",
+    "cold", "pressed", "whole", "instant",
+}
+
+# Phrases that ask for the whole catalog
+EXPAND_RE = re.compile(
+    r"\b(all (your |the )?products|everything|entire|full (catalog|menu|list)|whole (catalog|menu|range)|"
+    r"what (else )?do you (sell|offer|have)|every product)\b"
+)
+
+
+def _stem(word: str) -> str:
+    """Very small suffix stripper (oils -> oil, frying -> fry, lentils -> lentil)"""
+    for suffix in ("ing", "ies", "es", "ed", "s"):
+        if len(word) > len(suffix) + 3 and word.endswith(suffix):
+            return word[: -len(suffix)] + ("y" if suffix == "ies" else "")
+    return word
+
+
+def terms(text: str) -> List[str]:
+    """Stemmed, stop-word-free terms of a text"""
+    return [_stem(w) for w in _WORD_RE.findall(text.lower()) if w not in STOP_WORDS]
+
+
+class CatalogSelector:
+    """
+    Chooses which products to detail in the system prompt for one turn
+    - Strong matches: product names, alternative names, categories, subcategories
+    - Weak matches: descriptions, key features, serving ideas (e.g. "gluten", "frying"),
+      used to rank strong matches or on their own when nothing is named
+    - Products named in the previous assistant reply are kept for follow-ups
+    - Falls back to the full catalog for catalog-wide or unmatched questions
+    """
+
+    # Above this many matched products, detail the whole catalog instead
+    MAX_PRODUCTS = 12
+
+    # Weight of earlier user messages relative to the current one
+    HISTORY_WEIGHT = 0.5
+
+    # Drop matches scoring at or below this fraction of the best match
+    RELATIVE_CUTOFF = 0.5
+
+    # Name/category terms shared by more than this fraction of the catalog
+    # ("millet" names 23 of 32 products) only count as weak matches
+    GENERIC_TERM_SHARE = 0.25
+
+    def __init__(self, catalog: Catalog):
+        self.catalog = catalog
+        self.products = catalog.products
+        self._strong: Dict[str, set] = {}
+        self._weak: Dict[str, set] = {}
+
+        for i, product in enumerate(self.products):
+            strong_text = " ".join(
+                [product["name"], product.get("category") or "", product.get("subcategory") or ""]
+                + (product.get("alternative_names") or [])
+            )
+            weak_text = " ".join(
+                [product.get("description") or "", product.get("ingredients") or ""]
+                + (product.get("key_features") or []) + (product.get("serving_ideas") or [])
+            )
+            for term in terms(strong_text):
+                self._strong.setdefault(term, set()).add(i)
+            for term in terms(weak_text):
+                self._weak.setdefault(term, set()).add(i)
+
+        # Generic name terms still rank products, but don't make them "named"
+        generic_limit = max(3, int(len(self.products) * self.GENERIC_TERM_SHARE))
+        self.generic_terms = {term for term, ids in self._strong.items() if len(ids) > generic_limit}
+
+        self.full_text = catalog.full_json
+        self.index_text = catalog.index_text
+        self.index_section = "PRODUCT INDEX (every product we sell):\n" + self.index_text + "\n\n"
+
+        self._lock = threading.Lock()
+        self.selections = 0
+        self.full_expansions = 0
+        self.products_injected = 0
+        self.chars_injected = 0
+
+    def select(self, message: str, previous_user_messages: Optional[List[str]] = None, last_reply: str = "") -> Optional[List[int]]:
+        """
+        Pick product indexes to detail for a turn
+
+        Returns:
+            Sorted product indexes, or None when the full catalog should be injected
+        """
+        if EXPAND_RE.search(message.lower()):
+            return None
+
+        scores: Dict[int, float] = {}
+        strong = set()
+
+        def score(text: str, weight: float):
+            for term in set(terms(text)):
+                if term in self.generic_terms:
+                    for i in self._strong[term] | self._weak.get(term, set()):
+                        scores[i] = scores.get(i, 0) + weight
+                    continue
+                for i in self._strong.get(term, ()):
+                    scores[i] = scores.get(i, 0) + 3 * weight
+                    strong.add(i)
+                for i in self._weak.get(term, ()):
+                    scores[i] = scores.get(i, 0) + weight
+
+        score(message, 1.0)
+        for previous in (previous_user_messages or [])[-2:]:
+            score(previous, self.HISTORY_WEIGHT)
+
+        # Products the assistant just talked about ("the second one", "how much is it?")
+        reply = last_reply.lower()
+        for i, product in enumerate(self.products):
+            if product["name"].lower() in reply:
+                scores[i] = scores.get(i, 0) + 2
+                strong.add(i)
+
+        # Named products/categories win; attribute-only matches are used as-is
+        ranked = sorted(strong or scores, key=lambda i: -scores[i])
+        if not ranked:
+            return None
+
+        # "peanut oil" names one product and the whole oil category - keep the leaders
+        if strong:
+            top = scores[ranked[0]]
+            ranked = [i for i in ranked if scores[i] > top * self.RELATIVE_CUTOFF]
+
+        if len(ranked) > self.MAX_PRODUCTS:
+            if not strong:
+                return None
+            # Keep the clearly relevant head if there is one, otherwise expand
+            cutoff = scores[ranked[self.MAX_PRODUCTS]]
+            ranked = [i for i in ranked[: self.MAX_PRODUCTS] if scores[i] > cutoff]
+            if not ranked:
+                return None
+
+        return sorted(ranked)
+
+    def section(self, selected: Optional[List[int]]) -> str:
+        """
+        Catalog section for a selection (None = every product)
+
+        The product index always comes first, so every catalog prompt shares the
+        same prefix up to the product details and upstream prompt caching can reuse it.
+        """
+        if selected is None:
+            details = "PRODUCT DETAILS (every product):\n" + self.full_text
+        else:
+            details = (
+                "PRODUCT DETAILS (only the products relevant to this question; "
+                + "if the customer asks about another indexed product, its details will be provided when they name it):\n"
+                + "[\n" + ",\n".join(self.catalog.product_json[i] for i in selected) + "\n]"
+            )
+        return self.index_section + details
+
+    def render(self, message: str, previous_user_messages: Optional[List[str]] = None, last_reply: str = "") -> str:
+        """Catalog section of the system prompt for one turn"""
+        selected = self.select(message, previous_user_messages, last_reply)
+        section = self.section(selected)
+        count = len(self.products) if selected is None else len(selected)
+
+        with self._lock:
+            self.selections += 1
+            self.products_injected += count
+            self.chars_injected += len(section)
+            if selected is None:
+                self.full_expansions += 1
+
+        logger.info(f"📦 Injected {count}/{len(self.products)} products ({len(section)} chars{', full catalog' if selected is None else ''})")
+        return section
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "selections": self.selections,
+                "full_expansions": self.full_expansions,
+                "avg_products": round(self.products_injected / self.selections, 1) if self.selections else None,
+                "avg_chars": round(self.chars_injected / self.selections) if self.selections else None,
+                "full_catalog_chars": len(self.full_text),
+            }
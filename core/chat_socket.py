@@ -0,0 +1,112 @@
+"""
+Per-connection outbound channel for the chat WebSocket
+Frames go through a bounded queue drained by one sender task, so a slow
+client slows down (and eventually disconnects) only its own connection.
+"""
+
+import asyncio
+import os
+from typing import Optional
+import logging
+
+from fastapi import WebSocket
+
+logger = logging.getLogger(__name__)
+
+
+class SlowConsumerError(Exception):
+    """Raised when a client stops reading and its send queue stays full"""
+
+
+class SocketStats:
+    """Counters shared by every chat socket (reported on /metrics)"""
+
+    def __init__(self):
+        self.open = 0
+        self.opened = 0
+        self.messages = 0
+        self.frames_sent = 0
+        self.pushes = 0
+        self.pushes_dropped = 0
+        self.rejected_busy = 0
+        self.slow_consumers = 0
+
+    def snapshot(self) -> dict:
+        return {
+            "open": self.open,
+            "opened": self.opened,
+            "messages": self.messages,
+            "frames_sent": self.frames_sent,
+            "pushes": self.pushes,
+            "pushes_dropped": self.pushes_dropped,
+            "rejected_busy": self.rejected_busy,
+            "slow_consumers": self.slow_consumers,
+        }
+
+
+class SocketChannel:
+    """
+    Outbound side of one WebSocket
+    - send(): for response frames; waits while the queue is full (backpressure
+      reaches the upstream stream), and gives up after `send_timeout`
+    - push(): for unsolicited frames (order updates); never waits, drops when full
+    """
+
+    def __init__(self, websocket: WebSocket, stats: SocketStats, max_frames: int = 64, send_timeout: float = 10.0):
+        self.websocket = websocket
+        self.stats = stats
+        self.send_timeout = send_timeout
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_frames)
+        self._sender: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_env(cls, websocket: WebSocket, stats: SocketStats) -> "SocketChannel":
+        return cls(
+            websocket,
+            stats,
+            max_frames=int(os.getenv("WS_SEND_QUEUE", "64")),
+            send_timeout=float(os.getenv("WS_SEND_TIMEOUT", "10")),
+        )
+
+    def start(self):
+        self._sender = asyncio.create_task(self._send_loop())
+
+    async def _send_loop(self):
+        while True:
+            frame = await self._queue.get()
+            await self.websocket.send_json(frame)
+            self.stats.frames_sent += 1
+
+    async def send(self, frame: dict):
+        if self._sender is not None and self._sender.done():
+            raise SlowConsumerError("Connection is closed")
+        try:
+            await asyncio.wait_for(self._queue.put(frame), self.send_timeout)
+        except asyncio.TimeoutError:
+            self.stats.slow_consumers += 1
+            raise SlowConsumerError(f"Client did not read for {self.send_timeout}s")
+
+    def push(self, frame: dict) -> bool:
+        try:
+            self._queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            self.stats.pushes_dropped += 1
+            return False
+        self.stats.pushes += 1
+        return True
+
+    async def close(self, flush_timeout: float = 1.0):
+        """Stop the sender, giving queued frames a moment to go out"""
+        if self._sender is None:
+            return
+        try:
+            if not self._sender.done():
+                await asyncio.wait_for(self._drain(), flush_timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._sender.cancel()
+        await asyncio.gather(self._sender, return_exceptions=True)
+
+    async def _drain(self):
+        while not self._queue.empty() and not self._sender.done():
+            await asyncio.sleep(0.01)
@@ -0,0 +1,138 @@
+"""
+Idempotency keys for chat requests
+A retried request carrying the same key gets the original's result instead of
+running the turn (and its upstream calls) again and appending a duplicate.
+
+Keys live in this process only: under several workers a retry is deduplicated
+only if it reaches the worker that ran the original (see gunicorn.conf.py).
+"""
+
+import asyncio
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class IdempotencyConflict(Exception):
+    """Raised when a key is reused for a different request"""
+
+
+def request_fingerprint(*parts: Optional[str]) -> str:
+    return hashlib.sha256("\x00".join(part or "" for part in parts).encode()).hexdigest()
+
+
+class _Entry:
+    def __init__(self, fingerprint: str, task: asyncio.Task):
+        self.fingerprint = fingerprint
+        self.task: Optional[asyncio.Task] = task
+        self.result: Any = None
+        self.expires_at: Optional[float] = None
+
+
+class IdempotencyStore:
+    """
+    Key → in-flight task or completed result
+    - First request with a key runs the work as a task
+    - Retries while it runs await the same task
+    - Retries after it completes get the stored result for `ttl_seconds`
+    - Failed or cancelled work is forgotten, so a retry runs it again
+    - At most `max_entries` completed results are kept (oldest evicted first)
+    The work runs to completion even if the client that started it goes away,
+    so a retry after a dropped connection can still collect the answer.
+    """
+
+    def __init__(self, ttl_seconds: float = 3600, max_entries: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._in_flight: Dict[str, _Entry] = {}
+        # Completed results in completion order, so expiry and eviction pop from the front
+        self._results: "OrderedDict[str, _Entry]" = OrderedDict()
+
+        self.executed = 0
+        self.replayed = 0
+        self.attached = 0
+        self.conflicts = 0
+        self.failures = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_env(cls) -> "IdempotencyStore":
+        return cls(
+            ttl_seconds=float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "3600")),
+            max_entries=int(os.getenv("IDEMPOTENCY_MAX_KEYS", "10000")),
+        )
+
+    async def run(self, key: str, fingerprint: str, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Run fn() at most once per key
+
+        Args:
+            key: Idempotency key (scoped by the caller, e.g. per session)
+            fingerprint: Hash of the request; a different request under the same key is a conflict
+            fn: Coroutine factory doing the work
+
+        Returns:
+            (result, replayed) - replayed is True when the result came from an earlier request
+        """
+        self._expire()
+        entry = self._in_flight.get(key) or self._results.get(key)
+        if entry is not None:
+            if entry.fingerprint != fingerprint:
+                self.conflicts += 1
+                raise IdempotencyConflict(f"Idempotency key {key!r} was already used for a different request")
+
+            if entry.task is None:
+                self.replayed += 1
+                logger.info(f"♻️ Idempotent replay for key {key!r}")
+                return entry.result, True
+
+            self.attached += 1
+            logger.info(f"🔗 Retry attached to in-flight request for key {key!r}")
+            return await asyncio.shield(entry.task), True
+
+        self.executed += 1
+        entry = _Entry(fingerprint, asyncio.ensure_future(fn()))
+        self._in_flight[key] = entry
+        entry.task.add_done_callback(lambda task, k=key, e=entry: self._done(k, e, task))
+        return await asyncio.shield(entry.task), False
+
+    def _done(self, key: str, entry: _Entry, task: asyncio.Task):
+        if self._in_flight.get(key) is entry:
+            del self._in_flight[key]
+
+        if task.cancelled() or task.exception() is not None:
+            self.failures += 1
+            return
+
+        entry.result = task.result()
+        entry.task = None
+        entry.expires_at = time.time() + self.ttl_seconds
+        self._results[key] = entry
+        while len(self._results) > self.max_entries:
+            self._results.popitem(last=False)
+            self.evictions += 1
+
+    def _expire(self):
+        now = time.time()
+        while self._results:
+            key, entry = next(iter(self._results.items()))
+            if entry.expires_at > now:
+                break
+            del self._results[key]
+
+    def snapshot(self) -> dict:
+        return {
+            "in_flight": len(self._in_flight),
+            "stored_results": len(self._results),
+            "executed": self.executed,
+            "replayed": self.replayed,
+            "attached": self.attached,
+            "conflicts": self.conflicts,
+            "failures": self.failures,
+            "evictions": self.evictions,
+        }
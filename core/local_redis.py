@@ -0,0 +1,230 @@
+"""
+Local, durable stand-in for the Redis list commands used by the session store
+Backed by SQLite in WAL mode: pushes append to a log table, and each list is
+periodically compacted into a snapshot row. Safe to share between processes.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import List, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS log (
+    key TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (key, seq)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS snapshots (
+    key TEXT PRIMARY KEY,
+    seq INTEGER NOT NULL,
+    items TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS expiry (
+    key TEXT PRIMARY KEY,
+    expires_at REAL NOT NULL
+);
+"""
+
+
+class LocalRedis:
+    """
+    Redis-compatible subset: rpush, lrange, llen, delete, expire, ping, pipeline
+    - rpush appends rows to an append-only log (one row per item)
+    - after SNAPSHOT_EVERY logged items a list is folded into its snapshot row
+      and the log rows are dropped
+    - lrange reads the snapshot plus the log tail
+    - expired keys are removed on read and swept periodically on write
+    Values are strings (like redis-py with decode_responses=True).
+    """
+
+    SNAPSHOT_EVERY = 50
+
+    # Minimum seconds between sweeps of expired keys
+    PURGE_INTERVAL = 60.0
+
+    def __init__(self, path: str):
+        self.path = str(path)
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._last_purge = 0.0
+
+        self.compactions = 0
+
+        # executescript manages its own transaction
+        self._connection().executescript(SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread and process (connections don't survive fork)
+        db = getattr(self._local, "db", None)
+        if db is None or self._local.pid != os.getpid():
+            db = sqlite3.connect(self.path, isolation_level=None, timeout=30.0)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+            self._local.pid = os.getpid()
+        return db
+
+    class _Transaction:
+        def __init__(self, db: sqlite3.Connection):
+            self.db = db
+
+        def __enter__(self) -> sqlite3.Connection:
+            # IMMEDIATE takes the write lock up front, so seq numbers can't race across processes
+            self.db.execute("BEGIN IMMEDIATE")
+            return self.db
+
+        def __exit__(self, exc_type, exc, tb):
+            self.db.execute("ROLLBACK" if exc_type else "COMMIT")
+
+    def _transaction(self) -> "_Transaction":
+        return self._Transaction(self._connection())
+
+    # Redis commands
+
+    def ping(self) -> bool:
+        self._connection().execute("SELECT 1")
+        return True
+
+    def rpush(self, key: str, *values: str) -> int:
+        with self._transaction() as db:
+            return self._rpush(db, key, values)
+
+    def lrange(self, key: str, start: int, stop: int) -> List[str]:
+        items = self._items(self._connection(), key)
+        # Redis semantics: inclusive stop, negative indexes count from the end
+        stop = len(items) + stop if stop < 0 else stop
+        return items[start if start >= 0 else max(0, len(items) + start): stop + 1]
+
+    def llen(self, key: str) -> int:
+        db = self._connection()
+        if self._expired(db, key):
+            return 0
+        # Lists only grow, so the last seq is the length (no need to read the items)
+        return self._last_seq(db, key)[0]
+
+    def delete(self, *keys: str) -> int:
+        with self._transaction() as db:
+            return sum(self._delete(db, key) for key in keys)
+
+    def expire(self, key: str, seconds: int) -> bool:
+        with self._transaction() as db:
+            return self._expire(db, key, seconds)
+
+    def pipeline(self) -> "LocalPipeline":
+        return LocalPipeline(self)
+
+    # Implementation
+
+    def _last_seq(self, db: sqlite3.Connection, key: str) -> Tuple[int, int]:
+        """(last logged seq, snapshot seq) for a key"""
+        row = db.execute("SELECT seq FROM snapshots WHERE key = ?", (key,)).fetchone()
+        snapshot_seq = row[0] if row else 0
+        row = db.execute("SELECT MAX(seq) FROM log WHERE key = ?", (key,)).fetchone()
+        return (row[0] if row and row[0] is not None else snapshot_seq), snapshot_seq
+
+    def _rpush(self, db: sqlite3.Connection, key: str, values) -> int:
+        if self._expired(db, key):
+            self._delete(db, key)
+
+        last_seq, snapshot_seq = self._last_seq(db, key)
+        db.executemany(
+            "INSERT INTO log (key, seq, value) VALUES (?, ?, ?)",
+            [(key, last_seq + i + 1, value) for i, value in enumerate(values)]
+        )
+        last_seq += len(values)
+
+        if last_seq - snapshot_seq >= self.SNAPSHOT_EVERY:
+            self._compact(db, key, last_seq)
+        self._maybe_purge(db)
+
+        # Lists only grow (no pops/trims), so the last seq is the length
+        return last_seq
+
+    def _compact(self, db: sqlite3.Connection, key: str, last_seq: int):
+        """Fold the log into the key's snapshot row"""
+        items = self._items(db, key, check_expiry=False)
+        db.execute(
+            "INSERT INTO snapshots (key, seq, items) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET seq = excluded.seq, items = excluded.items",
+            (key, last_seq, json.dumps(items))
+        )
+        db.execute("DELETE FROM log WHERE key = ? AND seq <= ?", (key, last_seq))
+        self.compactions += 1
+
+    def _items(self, db: sqlite3.Connection, key: str, check_expiry: bool = True) -> List[str]:
+        if check_expiry and self._expired(db, key):
+            return []
+
+        row = db.execute("SELECT seq, items FROM snapshots WHERE key = ?", (key,)).fetchone()
+        snapshot_seq, items = (row[0], json.loads(row[1])) if row else (0, [])
+        items.extend(value for (value,) in db.execute(
+            "SELECT value FROM log WHERE key = ? AND seq > ? ORDER BY seq", (key, snapshot_seq)
+        ))
+        return items
+
+    def _delete(self, db: sqlite3.Connection, key: str) -> int:
+        existed = db.execute(
+            "SELECT EXISTS(SELECT 1 FROM log WHERE key = ?) OR EXISTS(SELECT 1 FROM snapshots WHERE key = ?)", (key, key)
+        ).fetchone()[0]
+        db.execute("DELETE FROM log WHERE key = ?", (key,))
+        db.execute("DELETE FROM snapshots WHERE key = ?", (key,))
+        db.execute("DELETE FROM expiry WHERE key = ?", (key,))
+        return int(existed)
+
+    def _expire(self, db: sqlite3.Connection, key: str, seconds: int) -> bool:
+        db.execute(
+            "INSERT INTO expiry (key, expires_at) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET expires_at = excluded.expires_at",
+            (key, time.time() + seconds)
+        )
+        return True
+
+    @staticmethod
+    def _expired(db: sqlite3.Connection, key: str) -> bool:
+        row = db.execute("SELECT expires_at FROM expiry WHERE key = ?", (key,)).fetchone()
+        return bool(row) and row[0] <= time.time()
+
+    def _maybe_purge(self, db: sqlite3.Connection):
+        now = time.time()
+        if now - self._last_purge < self.PURGE_INTERVAL:
+            return
+        self._last_purge = now
+
+        expired = [key for (key,) in db.execute("SELECT key FROM expiry WHERE expires_at <= ?", (now,))]
+        for key in expired:
+            self._delete(db, key)
+        if expired:
+            logger.info(f"🧹 Purged {len(expired)} expired session keys")
+
+
+class LocalPipeline:
+    """Buffers commands and runs them in one transaction on execute() (like a MULTI/EXEC pipeline)"""
+
+    def __init__(self, redis: LocalRedis):
+        self.redis = redis
+        self._commands = []
+
+    def rpush(self, key: str, *values: str) -> "LocalPipeline":
+        self._commands.append((self.redis._rpush, key, values))
+        return self
+
+    def expire(self, key: str, seconds: int) -> "LocalPipeline":
+        self._commands.append((self.redis._expire, key, seconds))
+        return self
+
+    def delete(self, key: str) -> "LocalPipeline":
+        self._commands.append((self.redis._delete, key))
+        return self
+
+    def execute(self) -> list:
+        commands, self._commands = self._commands, []
+        with self.redis._transaction() as db:
+            return [command(db, *args) for command, *args in commands]
@@ -0,0 +1,104 @@
+"""
+Order-status push feed
+Polls the status of orders that connected clients are watching and notifies
+their subscribers when it changes. One poller serves every connection.
+"""
+
+import asyncio
+import os
+from typing import Callable, Dict, Optional, Set
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Fields whose change is worth telling a watching customer about
+TRACKED_FIELDS = ("status", "shipped_date", "estimated_delivery", "actual_delivery")
+
+
+class OrderStatusFeed:
+    """
+    Order id → subscriber callbacks, with a shared poller
+    - The poller runs only while at least one order is watched
+    - Each watched order is looked up once per `interval`, however many
+      connections watch it
+    - Callbacks are plain functions (e.g. a connection's non-blocking push)
+    """
+
+    def __init__(self, lookup: Callable[[str], dict], interval: float = 30.0):
+        self.lookup = lookup
+        self.interval = interval
+
+        self._subscribers: Dict[str, Set[Callable[[dict], None]]] = {}
+        self._last_seen: Dict[str, tuple] = {}
+        self._task: Optional[asyncio.Task] = None
+
+        self.polls = 0
+        self.notifications = 0
+        self.errors = 0
+
+    @classmethod
+    def from_env(cls, lookup: Callable[[str], dict]) -> "OrderStatusFeed":
+        return cls(lookup, interval=float(os.getenv("ORDER_PUSH_INTERVAL", "30")))
+
+    def subscribe(self, order_id: str, callback: Callable[[dict], None], current: Optional[dict] = None):
+        """
+        Watch an order
+
+        Args:
+            order_id: Order to watch
+            callback: Called with the new lookup result when the order changes
+            current: The result the subscriber already has (so it isn't pushed back)
+        """
+        self._subscribers.setdefault(order_id, set()).add(callback)
+        if current is not None and current.get("success"):
+            self._last_seen[order_id] = self._fingerprint(current)
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._poll_loop())
+
+    def unsubscribe(self, order_id: str, callback: Callable[[dict], None]):
+        callbacks = self._subscribers.get(order_id)
+        if callbacks is None:
+            return
+        callbacks.discard(callback)
+        if not callbacks:
+            del self._subscribers[order_id]
+            self._last_seen.pop(order_id, None)
+
+    @staticmethod
+    def _fingerprint(result: dict) -> tuple:
+        return tuple(result.get(field) for field in TRACKED_FIELDS)
+
+    async def _poll_loop(self):
+        while self._subscribers:
+            await asyncio.sleep(self.interval)
+            for order_id in list(self._subscribers):
+                try:
+                    result = await asyncio.to_thread(self.lookup, order_id)
+                except Exception as e:
+                    self.errors += 1
+                    logger.error(f"❌ Order status poll failed for {order_id}: {str(e)}")
+                    continue
+                self.polls += 1
+
+                if not result.get("success"):
+                    continue
+                fingerprint = self._fingerprint(result)
+                previous = self._last_seen.get(order_id)
+                self._last_seen[order_id] = fingerprint
+                if previous is None or previous == fingerprint:
+                    continue
+
+                logger.info(f"📦 Order {order_id} changed: {result.get('status')}")
+                for callback in list(self._subscribers.get(order_id, ())):
+                    callback(result)
+                    self.notifications += 1
+
+    def snapshot(self) -> dict:
+        return {
+            "watched_orders": len(self._subscribers),
+            "subscriptions": sum(len(callbacks) for callbacks in self._subscribers.values()),
+            "polls": self.polls,
+            "notifications": self.notifications,
+            "errors": self.errors,
+        }
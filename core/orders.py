@@ -0,0 +1,167 @@
+"""
+Indexed order store
+Compiled from data/orders.json with order-id normalization and secondary
+indexes (customer name, status, order date), so fuzzy order references
+resolve in one lookup; recompiled when the file changes
+"""
+
+import bisect
+import json
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+import logging
+
+from core.catalog import normalize_name
+
+logger = logging.getLogger(__name__)
+
+ORDERS_PATH = Path(__file__).parent.parent / "data" / "orders.json"
+
+ORDER_ID_PREFIX = "ORD-"
+
+# "ORD-1001", "ord1001", "ORD 1001", "order 1001", "order #1001", "order no. 1001", "#1001", "1001"
+_ORDER_ID_RE = re.compile(
+    r"(?:ord(?:er)?)?\s*(?:no\.?|num(?:ber)?)?\s*[-#:_]?\s*(\d{3,})",
+    re.IGNORECASE,
+)
+
+
+def normalize_order_id(text: str) -> Optional[str]:
+    """
+    Canonical order ID for the ways customers write one
+
+    Returns:
+        "ORD-<digits>", or None when the text isn't an order reference
+    """
+    match = _ORDER_ID_RE.fullmatch(text.strip())
+    return f"{ORDER_ID_PREFIX}{match.group(1)}" if match else None
+
+
+class OrderBook:
+    """
+    Immutable, indexed view of the order store
+    - by_id: canonical order ID -> order index
+    - by_customer: normalized customer name -> order indexes
+    - by_name_word: word of a customer name -> order indexes (partial names)
+    - by_status: normalized status -> order indexes
+    - dates / by_date: order dates sorted ascending, with the matching order indexes
+    """
+
+    def __init__(self, orders: List[dict]):
+        self.orders = orders
+
+        self.by_id: Dict[str, int] = {}
+        self.by_customer: Dict[str, List[int]] = {}
+        self.by_name_word: Dict[str, Set[int]] = {}
+        self.by_status: Dict[str, List[int]] = {}
+
+        for i, order in enumerate(orders):
+            order_id = normalize_order_id(order["order_id"]) or order["order_id"].upper()
+            self.by_id[order_id] = i
+
+            name = normalize_name(order.get("customer_name") or "")
+            if name:
+                self.by_customer.setdefault(name, []).append(i)
+                for word in name.split():
+                    self.by_name_word.setdefault(word, set()).add(i)
+
+            if order.get("status"):
+                self.by_status.setdefault(normalize_name(order["status"]), []).append(i)
+
+        dated = sorted((order["order_date"], i) for i, order in enumerate(orders) if order.get("order_date"))
+        self.dates = [date for date, _ in dated]
+        self.by_date = [i for _, i in dated]
+
+    @classmethod
+    def load(cls, path: Path = ORDERS_PATH) -> "OrderBook":
+        with open(path, 'r') as f:
+            return cls(json.load(f))
+
+    def __len__(self) -> int:
+        return len(self.orders)
+
+    def get(self, order_id: str) -> Optional[dict]:
+        """Order for an ID in any accepted spelling (see normalize_order_id)"""
+        i = self.by_id.get(order_id)
+        if i is None:
+            i = self.by_id.get(normalize_order_id(order_id) or order_id.strip().upper())
+        return self.orders[i] if i is not None else None
+
+    def find(
+        self,
+        customer_name: Optional[str] = None,
+        status: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None
+    ) -> List[dict]:
+        """
+        Orders matching every given filter, newest first
+
+        Args:
+            customer_name: Full or partial customer name ("John Smith", "smith")
+            status: Order status, case-insensitive ("in transit")
+            date_from: Earliest order date, inclusive (YYYY-MM-DD)
+            date_to: Latest order date, inclusive (YYYY-MM-DD)
+        """
+        matches: Optional[Set[int]] = None
+
+        def narrow(ids):
+            nonlocal matches
+            matches = set(ids) if matches is None else matches & set(ids)
+
+        if customer_name:
+            narrow(self._match_customer(normalize_name(customer_name)))
+        if status:
+            narrow(self.by_status.get(normalize_name(status), ()))
+        if date_from or date_to:
+            lo = bisect.bisect_left(self.dates, date_from) if date_from else 0
+            hi = bisect.bisect_right(self.dates, date_to) if date_to else len(self.dates)
+            narrow(self.by_date[lo:hi])
+
+        if matches is None:
+            return []
+        return sorted((self.orders[i] for i in matches), key=lambda order: order.get("order_date") or "", reverse=True)
+
+    def _match_customer(self, name: str) -> Set[int]:
+        # Exact full name, then orders whose name contains every given word
+        if name in self.by_customer:
+            return set(self.by_customer[name])
+
+        found: Optional[Set[int]] = None
+        for word in name.split():
+            ids = self.by_name_word.get(word, set())
+            found = set(ids) if found is None else found & ids
+        return found or set()
+
+
+_book: Optional[OrderBook] = None
+_book_mtime: Optional[float] = None
+_lock = threading.Lock()
+
+
+def order_book_is_current() -> bool:
+    """True when get_order_book() can answer without re-reading the order file"""
+    return _book is not None and ORDERS_PATH.stat().st_mtime == _book_mtime
+
+
+def get_order_book() -> OrderBook:
+    """
+    Get the shared OrderBook, recompiling it when the order file has changed
+
+    Order status is live data, so the file's mtime is checked on every call
+    (a stat, instead of the full parse each lookup used to do).
+    """
+    global _book, _book_mtime
+
+    mtime = ORDERS_PATH.stat().st_mtime
+    if _book is not None and mtime == _book_mtime:
+        return _book
+
+    with _lock:
+        if _book is None or mtime != _book_mtime:
+            _book = OrderBook.load(ORDERS_PATH)
+            _book_mtime = mtime
+            logger.info(f"📦 Indexed {len(_book)} orders")
+    return _book
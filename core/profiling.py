@@ -0,0 +1,245 @@
+"""
+On-demand request profiling
+Samples the event-loop thread's stack (collapsed stacks for flame graphs) and
+traces allocations (tracemalloc) while selected requests run, keeping the results
+in a small in-memory store. Costs a branch and a counter per request when off.
+
+Both profilers are process-wide: a profile covers everything the worker did
+while the request was in flight, including other concurrent requests. Each
+profile reports how many other requests were in flight so mixed profiles can
+be recognised (profile on an otherwise idle worker for a clean one).
+"""
+
+import itertools
+import os
+import random
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+ROOT = str(Path(__file__).resolve().parent.parent) + os.sep
+
+HEADER = "header"
+SAMPLED = "sampled"
+
+# Leave the profiler's own bookkeeping out of allocation reports
+_ALLOCATION_FILTERS = [tracemalloc.Filter(False, __file__), tracemalloc.Filter(False, tracemalloc.__file__)]
+
+
+def _short_path(filename: str) -> str:
+    """Repo-relative path for our code, basename for libraries"""
+    return filename[len(ROOT):] if filename.startswith(ROOT) else os.path.basename(filename)
+
+
+def _frame_label(frame) -> str:
+    return f"{_short_path(frame.f_code.co_filename)}:{frame.f_code.co_name}"
+
+
+class _StackSampler(threading.Thread):
+    """
+    Counts the collapsed stack of one thread every `interval` seconds
+    Also records the most requests seen in flight (`in_flight()`) at a sample.
+    """
+
+    def __init__(self, thread_id: int, interval: float, in_flight):
+        super().__init__(name="profile-sampler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.in_flight = in_flight
+        self.stacks = Counter()
+        self.max_in_flight = in_flight()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self.max_in_flight = max(self.max_in_flight, self.in_flight())
+            frame = sys._current_frames().get(self.thread_id)
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            if labels:
+                self.stacks[";".join(reversed(labels))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+class Profile:
+    """Result of one profiled request"""
+
+    def __init__(self, profile_id: str, trigger: str, session_id: str, message: str):
+        self.id = profile_id
+        self.trigger = trigger
+        self.session_id = session_id
+        self.message = message[:80]
+        self.started_at = time.time()
+        self.duration_ms = None
+        self.samples = 0
+        self.other_requests = 0
+        self.collapsed = ""
+        self.top_frames = []
+        self.allocations = []
+        self.alloc_peak_kib = None
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "trigger": self.trigger,
+            "session_id": self.session_id,
+            "message": self.message,
+            "started_at": self.started_at,
+            "duration_ms": self.duration_ms,
+            "samples": self.samples,
+            # Samples and allocations are process-wide: they include these other requests' work
+            "other_requests": self.other_requests,
+        }
+
+    def details(self) -> dict:
+        return {
+            **self.summary(),
+            "top_frames": self.top_frames,
+            "alloc_peak_kib": self.alloc_peak_kib,
+            "allocations": self.allocations,
+        }
+
+
+class RequestProfiler:
+    """
+    Profiles requests picked by an admin header or by random sampling
+    - Stack samples of the event-loop thread every `interval` seconds (wall clock,
+      so time spent waiting on upstream calls shows up under the selector)
+    - tracemalloc statistics by source line for allocations made while it ran
+    - Both cover the whole process, not just the profiled request: work of
+      requests running concurrently is included. `other_requests` (most other
+      requests in flight at once, from `requests_in_flight`) says how mixed it is
+    - One request is profiled at a time (profilers are process-global); others
+      run unprofiled while one is in progress
+    - The last `max_profiles` results are kept
+
+    Callers maintain `requests_in_flight` around each request.
+    """
+
+    TOP_N = 25
+
+    def __init__(self, sample_rate: float = 0.0, max_profiles: int = 20, interval: float = 0.001):
+        self.sample_rate = sample_rate
+        self.max_profiles = max_profiles
+        self.interval = interval
+
+        self._profiles: "OrderedDict[str, Profile]" = OrderedDict()
+        self._active = threading.Lock()
+        self._ids = itertools.count(1)
+
+        self.profiled = 0
+        self.skipped_busy = 0
+        self.requests_in_flight = 0
+
+    @classmethod
+    def from_env(cls) -> "RequestProfiler":
+        return cls(
+            sample_rate=float(os.getenv("PROFILE_SAMPLE_RATE", "0")),
+            max_profiles=int(os.getenv("PROFILE_STORE_SIZE", "20")),
+            interval=float(os.getenv("PROFILE_INTERVAL_MS", "1")) / 1000,
+        )
+
+    def trigger(self, requested: bool) -> Optional[str]:
+        """Why this request should be profiled, or None (the common, free path)"""
+        if requested:
+            return HEADER
+        if self.sample_rate and random.random() < self.sample_rate:
+            return SAMPLED
+        return None
+
+    @contextmanager
+    def profile(self, trigger: str, session_id: str, message: str):
+        """
+        Profile the enclosed block (run on the event-loop thread)
+
+        Yields the Profile, or None when another request is already being profiled.
+        """
+        if not self._active.acquire(blocking=False):
+            self.skipped_busy += 1
+            yield None
+            return
+
+        profile = Profile(f"p{next(self._ids)}-{int(time.time())}", trigger, session_id, message)
+        sampler = _StackSampler(threading.get_ident(), self.interval, lambda: self.requests_in_flight)
+        owns_tracemalloc = not tracemalloc.is_tracing()
+        if owns_tracemalloc:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.take_snapshot().filter_traces(_ALLOCATION_FILTERS)
+        before = tracemalloc.get_traced_memory()[0]
+
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            yield profile
+        finally:
+            sampler.stop()
+            # Minus the profiled request itself
+            profile.other_requests = max(sampler.max_in_flight, self.requests_in_flight) - 1
+            profile.duration_ms = round((time.perf_counter() - started) * 1000, 1)
+
+            profile.alloc_peak_kib = round((tracemalloc.get_traced_memory()[1] - before) / 1024, 1)
+            stats = tracemalloc.take_snapshot().filter_traces(_ALLOCATION_FILTERS).compare_to(baseline, "lineno")
+            if owns_tracemalloc:
+                tracemalloc.stop()
+            self._finish(profile, sampler.stacks, stats)
+            self._active.release()
+
+    def _finish(self, profile: Profile, stacks: Counter, stats):
+        profile.samples = sum(stacks.values())
+        profile.collapsed = "\n".join(f"{stack} {count}" for stack, count in stacks.most_common())
+
+        # Self time per frame (leaf of each sampled stack)
+        leaves = Counter()
+        for stack, count in stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        profile.top_frames = [
+            {"frame": frame, "samples": count, "pct": round(100 * count / profile.samples, 1)}
+            for frame, count in leaves.most_common(self.TOP_N)
+        ]
+
+        profile.allocations = [
+            {
+                "where": f"{_short_path(stat.traceback[0].filename)}:{stat.traceback[0].lineno}",
+                "size_kib": round(stat.size_diff / 1024, 1),
+                "count": stat.count_diff,
+            }
+            for stat in sorted(stats, key=lambda s: -s.size_diff)[: self.TOP_N]
+            if stat.size_diff > 0
+        ]
+
+        self._profiles[profile.id] = profile
+        while len(self._profiles) > self.max_profiles:
+            self._profiles.popitem(last=False)
+        self.profiled += 1
+
+        logger.info(f"🔬 Profiled request {profile.id} ({profile.trigger}): {profile.duration_ms}ms, {profile.samples} samples, "
+                    f"peak {profile.alloc_peak_kib} KiB, {profile.other_requests} other requests in flight")
+
+    def get(self, profile_id: str) -> Optional[Profile]:
+        return self._profiles.get(profile_id)
+
+    def summaries(self) -> list:
+        return [profile.summary() for profile in reversed(self._profiles.values())]
+
+    def snapshot(self) -> dict:
+        return {
+            "sample_rate": self.sample_rate,
+            "profiled": self.profiled,
+            "skipped_busy": self.skipped_busy,
+            "stored": len(self._profiles),
+            "requests_in_flight": self.requests_in_flight,
+        }
@@ -0,0 +1,77 @@
+"""
+Catalog-derived system prompts
+Everything built from one catalog version, replaced as a whole on catalog reload
+"""
+
+from typing import Dict, List
+
+from core.catalog import Catalog
+from core.catalog_selector import CatalogSelector
+from core.response_cache import content_version
+from prompts.system_prompt_no_vector import SYSTEM_PROMPT_NO_VECTOR
+from prompts.system_prompt_tiers import GREETING_PROMPT, ORDER_PROMPT
+from prompts.system_prompt_lookup import SYSTEM_PROMPT_LOOKUP
+from prompts.system_prompt import SYSTEM_PROMPT
+from prompts.system_prompt_hybrid import HYBRID_SEARCH_PROMPT
+
+CATALOG_HEADER = "\n\n" + "="*80 + "\nPRODUCT CATALOG:\n" + "="*80 + "\n\n"
+
+
+class PromptState:
+    """
+    System prompts for one catalog version
+    - minimal / orders: static prompts for the cheap tiers
+    - lookup: product index only; facts come from get_product_details
+    - catalog: full-menu prompt, relevance-pruned per turn when pruning is on
+    - vector: no catalog; facts come from vector_search
+    - hybrid: catalog prompt plus vector_search for products not detailed
+    """
+
+    def __init__(self, catalog: Catalog, pruning: bool = True):
+        self.catalog = catalog
+        self.selector = CatalogSelector(catalog)
+        self.pruning = pruning
+
+        # Instructions ahead of the catalog for the variants that carry it
+        self.catalog_instructions = {
+            "catalog": SYSTEM_PROMPT_NO_VECTOR,
+            "hybrid": SYSTEM_PROMPT_NO_VECTOR + HYBRID_SEARCH_PROMPT,
+        }
+
+        # System prompt per prompt variant (built once; the catalog variants are the big ones)
+        self.system_prompts = {
+            "minimal": GREETING_PROMPT,
+            "orders": ORDER_PROMPT,
+            "lookup": SYSTEM_PROMPT_LOOKUP + "\n\nPRODUCT INDEX:\n" + catalog.index_text,
+            "vector": SYSTEM_PROMPT,
+        }
+        for name, instructions in self.catalog_instructions.items():
+            self.system_prompts[name] = instructions + CATALOG_HEADER + self.selector.section(None)
+
+        # Static head of each variant's system prompt - identical for every request,
+        # so upstream prompt caching can reuse it. Only the catalog variants vary after it.
+        self.prefixes = dict(self.system_prompts)
+        for name, instructions in self.catalog_instructions.items():
+            self.prefixes[name] = instructions + CATALOG_HEADER + self.selector.index_section
+
+        # Versions used to key cached responses
+        self.catalog_version = catalog.version
+        self.prompt_versions = {name: content_version(prompt) for name, prompt in self.system_prompts.items()}
+
+    def system_prompt(self, variant: str, history: List[Dict], user_message: str) -> str:
+        """System prompt for one turn: the variant, with only the relevant catalog products"""
+        if variant not in self.catalog_instructions or not self.pruning:
+            return self.system_prompts[variant]
+
+        previous_user_messages = [m["content"] for m in history if m["role"] == "user"]
+        last_reply = next((m["content"] for m in reversed(history) if m["role"] == "assistant" and m.get("content")), "")
+        catalog_section = self.selector.render(user_message, previous_user_messages, last_reply)
+
+        return self.catalog_instructions[variant] + CATALOG_HEADER + catalog_section
+
+    def prefix_snapshot(self) -> dict:
+        """Hash and size of each variant's static prefix (compare across workers/deploys)"""
+        return {
+            name: {"hash": content_version(prefix), "chars": len(prefix)}
+            for name, prefix in self.prefixes.items()
+        }
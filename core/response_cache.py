@@ -0,0 +1,115 @@
+"""
+Exact-match response cache for stateless (first-turn) questions
+Keyed by normalized message + prompt version + catalog version, with TTL and LRU eviction
+"""
+
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+_PUNCT_RE = re.compile(r"[^\w\s-]")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_message(message: str) -> str:
+    """
+    Normalize a user message for cache lookups
+    Lowercases, drops punctuation and collapses whitespace
+    ("What oils do you have?" == "what oils do you have")
+    """
+    text = _PUNCT_RE.sub(" ", message.lower())
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+def content_version(text: str) -> str:
+    """Short, stable version hash for a prompt or catalog payload"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:12]
+
+
+def fingerprint(message: str, prompt_version: str, catalog_version: str) -> str:
+    """Cache / coalescing key for a stateless question"""
+    raw = "\x1f".join([normalize_message(message), prompt_version, catalog_version])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Thread-safe TTL + LRU cache of final assistant responses
+    - Entries expire after ttl_seconds
+    - Least recently used entries are evicted beyond max_entries
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: float = 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @classmethod
+    def from_env(cls) -> "ResponseCache":
+        return cls(
+            max_entries=int(os.getenv("RESPONSE_CACHE_SIZE", "1000")),
+            ttl_seconds=float(os.getenv("RESPONSE_CACHE_TTL", "3600"))
+        )
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for key, or None on miss/expiry"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires_at = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: str):
+        """Store a response, evicting least recently used entries if full"""
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop all entries (e.g. after a catalog or prompt change)"""
+        with self._lock:
+            self._entries.clear()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
@@ -0,0 +1,65 @@
+"""
+Switchable retrieval strategies for product questions
+- full: catalog in the system prompt (relevance-pruned when pruning is on)
+- vector: no catalog in context; facts come from the vector_search tool
+- hybrid: relevance-pruned catalog in context plus vector_search for the rest
+"""
+
+import os
+import threading
+from dataclasses import replace
+from typing import Optional
+import logging
+
+from core.router import Route
+
+logger = logging.getLogger(__name__)
+
+FULL = "full"
+VECTOR = "vector"
+HYBRID = "hybrid"
+
+RETRIEVAL_MODES = (FULL, VECTOR, HYBRID)
+
+# Prompt variant substituted for each product prompt variant, per mode
+# (greeting and order prompts never carry product data, so every mode keeps them)
+PROMPT_OVERRIDES = {
+    FULL: {},
+    VECTOR: {"lookup": "vector", "catalog": "vector"},
+    HYBRID: {"catalog": "hybrid"},
+}
+
+
+class RetrievalModes:
+    """
+    Applies the configured (or per-request) retrieval mode to routed turns
+    and counts requests per mode
+    """
+
+    def __init__(self, default: str = FULL):
+        if default not in RETRIEVAL_MODES:
+            raise ValueError(f"Unknown retrieval mode: {default} (expected one of {RETRIEVAL_MODES})")
+
+        self.default = default
+        self._requests = {mode: 0 for mode in RETRIEVAL_MODES}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "RetrievalModes":
+        return cls(default=os.getenv("RETRIEVAL_MODE", FULL).lower())
+
+    def apply(self, route: Route, requested: Optional[str] = None) -> Route:
+        """Route with its prompt variant swapped for the retrieval mode (requested or default)"""
+        mode = requested or self.default
+        if mode not in RETRIEVAL_MODES:
+            raise ValueError(f"Unknown retrieval mode: {mode} (expected one of {RETRIEVAL_MODES})")
+
+        with self._lock:
+            self._requests[mode] += 1
+
+        prompt = PROMPT_OVERRIDES[mode].get(route.prompt)
+        return replace(route, prompt=prompt) if prompt else route
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"default": self.default, "requests": dict(self._requests)}
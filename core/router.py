@@ -0,0 +1,238 @@
+"""
+Model tiering router
+Classifies each incoming message locally and picks a model tier and prompt variant
+"""
+
+import json
+import os
+import re
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Message categories, cheapest first
+GREETING = "greeting"
+ORDER_LOOKUP = "order_lookup"
+SIMPLE_CATALOG = "simple_catalog"
+COMPLEX_ADVICE = "complex_advice"
+
+CATEGORIES = [GREETING, ORDER_LOOKUP, SIMPLE_CATALOG, COMPLEX_ADVICE]
+
+# Route per category
+# - model: upstream model for this tier
+# - prompt: prompt variant ("minimal", "orders", "lookup", "catalog")
+# - tools: whether tools are offered on the first call
+# - max_tokens: completion cap (None = model default)
+DEFAULT_ROUTES = {
+    GREETING: {"model": "gpt-4o-mini", "prompt": "minimal", "tools": False, "max_tokens": 150},
+    ORDER_LOOKUP: {"model": "gpt-4o-mini", "prompt": "orders", "tools": True, "max_tokens": None},
+    SIMPLE_CATALOG: {"model": "gpt-4o-mini", "prompt": "lookup", "tools": True, "max_tokens": None},
+    COMPLEX_ADVICE: {"model": "gpt-4o", "prompt": "catalog", "tools": True, "max_tokens": None},
+}
+
+# USD per 1M tokens (input, output)
+MODEL_PRICING = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+}
+
+# Prompt tokens served from the upstream prompt cache are billed at this fraction of the input price
+CACHED_INPUT_DISCOUNT = 0.5
+
+_ORDER_ID_RE = re.compile(r"\bORD[-\s]?\d{3,}\b", re.IGNORECASE)
+# Bare "order"/"deliver"/"shipping" also show up in product questions ("can I order
+# ragi?", "do you deliver to Pune?"), so without an order ID it takes phrasing about
+# the customer's own order ("my order", "where is my ...", "has our parcel shipped")
+_ORDER_PHRASE_RE = re.compile(
+    r"\b(my|our)\s+(\w+\s+){0,2}(order|orders|package|packages|parcel|parcels|shipment|shipments|delivery|deliveries)\b"
+    r"|\bwhere(\s+is|\s+are|'s)?\s+(my|our)\b"
+    r"|\b(my|our)\b.*\b(arrive|arrived|arriving|ship|shipped|deliver|delivered|dispatched)\b"
+    r"|\b(order|tracking)\s+(status|number|id)\b",
+    re.IGNORECASE
+)
+_GREETING_RE = re.compile(
+    r"^(hi|hii+|hello|hey|hey there|good (morning|afternoon|evening)|thanks|thank you|thank you so much|"
+    r"thx|ty|cool|great|awesome|nice|bye|goodbye|see you|cheers)[\s!.,:)]*$",
+    re.IGNORECASE
+)
+_ACK_RE = re.compile(
+    r"^(yes|yeah|yep|sure|please|yes please|go on|tell me more|more|ok|okay)[\s!.,]*$",
+    re.IGNORECASE
+)
+_ADVICE_RE = re.compile(
+    r"\b(recommend|suggest|best|better|compare|comparison|vs|versus|difference|should i|which one|"
+    r"healthy|health|diabet\w*|cholesterol|weight|diet|pregnan\w*|kids|children|allerg\w*|"
+    r"recipe|plan|why|how should|advice)\b",
+    re.IGNORECASE
+)
+_SIMPLE_CATALOG_RE = re.compile(
+    r"^(do you (have|sell|carry)|what .* do you have|show me|list|is there|are there|"
+    r"how much|price|what sizes|what is the price|tell me about|browse)\b",
+    re.IGNORECASE
+)
+
+
+def classify_message(message: str, has_history: bool = False) -> str:
+    """
+    Classify a user message into a routing category using local rules only
+
+    Args:
+        message: The incoming user message
+        has_history: Whether the session already has prior turns
+
+    Returns:
+        One of GREETING, ORDER_LOOKUP, SIMPLE_CATALOG, COMPLEX_ADVICE
+    """
+    text = message.strip()
+
+    if _GREETING_RE.match(text):
+        return GREETING
+
+    # Bare acknowledgements continue the previous topic, so they need context
+    if _ACK_RE.match(text):
+        return SIMPLE_CATALOG if has_history else GREETING
+
+    if _ORDER_ID_RE.search(text) or _ORDER_PHRASE_RE.search(text):
+        return ORDER_LOOKUP
+
+    if _ADVICE_RE.search(text):
+        return COMPLEX_ADVICE
+
+    if _SIMPLE_CATALOG_RE.match(text) and len(text.split()) <= 12:
+        return SIMPLE_CATALOG
+
+    return COMPLEX_ADVICE
+
+
+@dataclass(frozen=True)
+class Route:
+    category: str
+    model: str
+    prompt: str
+    tools: bool
+    max_tokens: Optional[int] = None
+
+
+class TierStats:
+    """Rolling cost and latency counters for one routing category"""
+
+    LATENCY_WINDOW = 500
+
+    def __init__(self):
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        self.completion_tokens = 0
+        self.cost_usd = 0.0
+        self.latencies = deque(maxlen=self.LATENCY_WINDOW)
+
+    def snapshot(self) -> dict:
+        latencies = sorted(self.latencies)
+
+        def pct(p):
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))], 1)
+
+        return {
+            "requests": self.requests,
+            "prompt_tokens": self.prompt_tokens,
+            "cached_tokens": self.cached_tokens,
+            "prompt_cache_hit_rate": round(self.cached_tokens / self.prompt_tokens, 3) if self.prompt_tokens else None,
+            "completion_tokens": self.completion_tokens,
+            "cost_usd": round(self.cost_usd, 6),
+            "avg_cost_usd": round(self.cost_usd / self.requests, 6) if self.requests else None,
+            "latency_ms_p50": pct(0.50),
+            "latency_ms_p95": pct(0.95),
+        }
+
+
+class ModelRouter:
+    """
+    Routes each message to a model tier and prompt variant
+    - Routes come from DEFAULT_ROUTES, overridable via a JSON file (ROUTER_CONFIG)
+    - ROUTER_ENABLED=false sends everything to the complex_advice tier
+    - Tracks tokens, cost and latency per category
+    """
+
+    def __init__(self, routes: Optional[Dict[str, dict]] = None, enabled: bool = True):
+        self.routes = {name: dict(route) for name, route in DEFAULT_ROUTES.items()}
+        for name, override in (routes or {}).items():
+            if name not in self.routes:
+                raise ValueError(f"Unknown routing category: {name}")
+            self.routes[name].update(override)
+
+        self.enabled = enabled
+        self._stats = {name: TierStats() for name in CATEGORIES}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "ModelRouter":
+        """Build a router from ROUTER_ENABLED / ROUTER_CONFIG environment variables"""
+        enabled = os.getenv("ROUTER_ENABLED", "true").lower() not in ("0", "false", "no")
+        routes = None
+
+        config_path = os.getenv("ROUTER_CONFIG")
+        if config_path:
+            with open(config_path, 'r') as f:
+                routes = json.load(f)
+            logger.info(f"🧭 Loaded router config from: {config_path}")
+
+        return cls(routes=routes, enabled=enabled)
+
+    def validate_prompts(self, known_prompts: Iterable[str]):
+        """
+        Check that every route names an existing prompt variant
+
+        Raises:
+            ValueError: listing the routes with unknown prompt variants (e.g. a ROUTER_CONFIG typo)
+        """
+        known = set(known_prompts)
+        unknown = {name: route["prompt"] for name, route in self.routes.items() if route["prompt"] not in known}
+        if unknown:
+            routes = ", ".join(f"{name} -> {prompt!r}" for name, prompt in unknown.items())
+            raise ValueError(f"Unknown prompt variant in router config: {routes} (expected one of {sorted(known)})")
+
+    def route(self, message: str, has_history: bool = False) -> Route:
+        """Pick the route for a message"""
+        category = classify_message(message, has_history) if self.enabled else COMPLEX_ADVICE
+        config = self.routes[category]
+        return Route(
+            category=category,
+            model=config["model"],
+            prompt=config["prompt"],
+            tools=config["tools"],
+            max_tokens=config.get("max_tokens")
+        )
+
+    def record(self, route: Route, model: str, prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0):
+        """Record token usage for one upstream call made on behalf of a route"""
+        input_price, output_price = MODEL_PRICING.get(model, MODEL_PRICING["gpt-4o"])
+        input_cost = (prompt_tokens - cached_tokens) * input_price + cached_tokens * input_price * CACHED_INPUT_DISCOUNT
+        cost = (input_cost + completion_tokens * output_price) / 1_000_000
+
+        with self._lock:
+            stats = self._stats[route.category]
+            stats.prompt_tokens += prompt_tokens
+            stats.cached_tokens += cached_tokens
+            stats.completion_tokens += completion_tokens
+            stats.cost_usd += cost
+
+    def record_request(self, route: Route, latency_ms: float):
+        """Record one completed request (all upstream calls) for a route"""
+        with self._lock:
+            stats = self._stats[route.category]
+            stats.requests += 1
+            stats.latencies.append(latency_ms)
+
+    def snapshot(self) -> dict:
+        """Per-category routing config and stats"""
+        with self._lock:
+            return {
+                name: {**self.routes[name], **self._stats[name].snapshot()}
+                for name in CATEGORIES
+            }
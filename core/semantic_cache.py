@@ -0,0 +1,212 @@
+"""
+Semantic response cache for first-turn questions
+Reuses the OpenAI embedding pipeline from tools/vector_search.py and keeps
+past question embeddings in a small in-memory FAISS index
+"""
+
+import os
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import List, Optional
+import logging
+
+import faiss
+import numpy as np
+from openai import OpenAI
+
+from core.answer_overlap import answer_overlap
+from core.response_cache import normalize_message
+from tools.vector_search import EMBEDDING_MODEL, embed_texts
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SemanticHit:
+    question: str
+    response: str
+    similarity: float
+    # Sampled for false-hit auditing: serve a fresh answer and compare
+    audit: bool = False
+
+
+class SemanticCache:
+    """
+    Embedding-similarity cache of final assistant responses
+    - Cosine similarity over normalized question embeddings (FAISS inner product)
+    - Entries are scoped by namespace (model + prompt version) and catalog version
+    - A catalog version change drops the whole index
+    - A sample of hits is audited against a fresh answer to estimate the false-hit rate
+    """
+
+    # Similarity threshold for serving a cached answer (cosine, 0.0-1.0)
+    SIMILARITY_THRESHOLD = 0.92
+
+    # Answers overlapping less than this with the fresh answer count as false hits
+    FALSE_HIT_OVERLAP = 0.5
+
+    # Neighbours inspected per lookup (other namespaces / expired entries are skipped)
+    SEARCH_K = 5
+
+    def __init__(
+        self,
+        client: OpenAI,
+        threshold: float = SIMILARITY_THRESHOLD,
+        max_entries: int = 500,
+        ttl_seconds: float = 3600,
+        audit_rate: float = 0.05,
+        embedding_model: str = EMBEDDING_MODEL
+    ):
+        self.client = client
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.audit_rate = audit_rate
+        self.embedding_model = embedding_model
+
+        self.catalog_version = None
+        self._index = None
+        self._vectors: List[np.ndarray] = []
+        self._entries: List[dict] = []
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.audited = 0
+        self.false_hits = 0
+        self.recent_audits = deque(maxlen=50)
+
+    @classmethod
+    def from_env(cls, client: OpenAI) -> "SemanticCache":
+        return cls(
+            client,
+            threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", str(cls.SIMILARITY_THRESHOLD))),
+            max_entries=int(os.getenv("SEMANTIC_CACHE_SIZE", "500")),
+            ttl_seconds=float(os.getenv("SEMANTIC_CACHE_TTL", "3600")),
+            audit_rate=float(os.getenv("SEMANTIC_CACHE_AUDIT_RATE", "0.05"))
+        )
+
+    def embed(self, message: str) -> np.ndarray:
+        """Unit-length embedding of a normalized question"""
+        vector = embed_texts(self.client, [normalize_message(message)], self.embedding_model)[0]
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def lookup(self, embedding: np.ndarray, namespace: str, catalog_version: str) -> Optional[SemanticHit]:
+        """Return the closest cached answer above the threshold, if any"""
+        with self._lock:
+            if catalog_version != self.catalog_version:
+                self._reset(catalog_version)
+
+            if self._index is None or self._index.ntotal == 0:
+                self.misses += 1
+                return None
+
+            k = min(self.SEARCH_K, self._index.ntotal)
+            scores, indices = self._index.search(embedding.reshape(1, -1), k)
+
+            now = time.monotonic()
+            for score, idx in zip(scores[0], indices[0]):
+                if idx < 0 or score < self.threshold:
+                    break
+                entry = self._entries[idx]
+                if entry["namespace"] != namespace or entry["expires_at"] <= now:
+                    continue
+
+                self.hits += 1
+                return SemanticHit(
+                    question=entry["question"],
+                    response=entry["response"],
+                    similarity=float(score),
+                    audit=random.random() < self.audit_rate
+                )
+
+            self.misses += 1
+            return None
+
+    def store(self, embedding: np.ndarray, question: str, response: str, namespace: str, catalog_version: str):
+        """Add a question/answer pair to the index"""
+        with self._lock:
+            if catalog_version != self.catalog_version:
+                self._reset(catalog_version)
+
+            if self._index is None:
+                self._index = faiss.IndexFlatIP(len(embedding))
+
+            self._vectors.append(embedding.astype('float32'))
+            self._entries.append({
+                "question": question,
+                "response": response,
+                "namespace": namespace,
+                "expires_at": time.monotonic() + self.ttl_seconds,
+            })
+            self._index.add(embedding.reshape(1, -1).astype('float32'))
+
+            if len(self._entries) > self.max_entries:
+                self._compact()
+
+    def record_audit(self, hit: SemanticHit, question: str, fresh_response: str):
+        """Compare a sampled hit with the freshly generated answer"""
+        overlap = answer_overlap(hit.response, fresh_response)
+        false_hit = overlap < self.FALSE_HIT_OVERLAP
+
+        with self._lock:
+            self.audited += 1
+            if false_hit:
+                self.false_hits += 1
+            self.recent_audits.append({
+                "question": question,
+                "cached_question": hit.question,
+                "similarity": round(hit.similarity, 4),
+                "answer_overlap": round(overlap, 3),
+                "false_hit": false_hit,
+            })
+
+        if false_hit:
+            logger.warning(f"⚠️ Semantic cache false hit: '{question}' ~ '{hit.question}' (sim: {hit.similarity:.3f}, overlap: {overlap:.2f})")
+
+    def invalidate(self):
+        """Drop all entries"""
+        with self._lock:
+            self._reset(self.catalog_version)
+
+    def _reset(self, catalog_version: Optional[str]):
+        if self._entries:
+            self.invalidations += 1
+            logger.info(f"🧹 Semantic cache cleared ({len(self._entries)} entries)")
+        self.catalog_version = catalog_version
+        self._index = None
+        self._vectors = []
+        self._entries = []
+
+    def _compact(self):
+        """Rebuild the index without expired entries and the oldest overflow"""
+        now = time.monotonic()
+        keep = [i for i, e in enumerate(self._entries) if e["expires_at"] > now][-self.max_entries:]
+
+        self._vectors = [self._vectors[i] for i in keep]
+        self._entries = [self._entries[i] for i in keep]
+        self._index = faiss.IndexFlatIP(self._index.d)
+        if self._vectors:
+            self._index.add(np.vstack(self._vectors))
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "threshold": self.threshold,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+                "invalidations": self.invalidations,
+                "audit_rate": self.audit_rate,
+                "audited": self.audited,
+                "false_hits": self.false_hits,
+                "false_hit_rate": round(self.false_hits / self.audited, 3) if self.audited else None,
+                "recent_audits": list(self.recent_audits)[-10:],
+            }
@@ -0,0 +1,123 @@
+"""
+Per-session serialization of chat requests
+Keeps two concurrent requests on one session_id from interleaving their turns
+
+Locks are per process: they serialize a session's requests within one worker,
+not across workers (see gunicorn.conf.py).
+"""
+
+import asyncio
+import os
+import weakref
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+WAIT = "wait"
+REJECT = "reject"
+CANCEL = "cancel"
+
+POLICIES = (WAIT, REJECT, CANCEL)
+
+
+class SessionBusyError(Exception):
+    """Raised when a session already has a request in progress (reject policy / wait timeout)"""
+
+
+class _SessionEntry:
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.holder: Optional[asyncio.Task] = None
+        # Requests holding or waiting for the lock; the entry is dropped at zero
+        self.users = 0
+
+
+class SessionLocks:
+    """
+    One asyncio.Lock per active session
+    - wait: queue behind the in-progress request (optionally with a timeout)
+    - reject: fail fast with SessionBusyError
+    - cancel: cancel the older in-progress request and take over
+    Entries exist only while a session has requests in flight, and different
+    sessions never share a lock.
+    """
+
+    def __init__(self, policy: str = WAIT, wait_timeout: Optional[float] = None):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown session lock policy: {policy} (expected one of {POLICIES})")
+
+        self.policy = policy
+        self.wait_timeout = wait_timeout
+        self._entries: Dict[str, _SessionEntry] = {}
+        self._superseded = weakref.WeakSet()
+
+        self.acquired = 0
+        self.waited = 0
+        self.rejected = 0
+        self.cancelled = 0
+        self.timeouts = 0
+
+    @classmethod
+    def from_env(cls) -> "SessionLocks":
+        timeout = os.getenv("SESSION_LOCK_TIMEOUT")
+        return cls(
+            policy=os.getenv("SESSION_LOCK_POLICY", WAIT).lower(),
+            wait_timeout=float(timeout) if timeout else None
+        )
+
+    @asynccontextmanager
+    async def hold(self, session_id: str):
+        """Serialize the enclosed block per session according to the policy"""
+        entry = self._entries.get(session_id)
+        if entry is None:
+            entry = self._entries[session_id] = _SessionEntry()
+
+        entry.users += 1
+        try:
+            if entry.lock.locked():
+                if self.policy == REJECT:
+                    self.rejected += 1
+                    raise SessionBusyError(f"Session {session_id} already has a request in progress")
+
+                if self.policy == CANCEL and entry.holder is not None:
+                    logger.info(f"✂️ Cancelling older request on session {session_id}")
+                    self.cancelled += 1
+                    self._superseded.add(entry.holder)
+                    entry.holder.cancel()
+
+                self.waited += 1
+
+            try:
+                await asyncio.wait_for(entry.lock.acquire(), self.wait_timeout)
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                raise SessionBusyError(f"Timed out waiting for session {session_id}")
+
+            entry.holder = asyncio.current_task()
+            self.acquired += 1
+            try:
+                yield
+            finally:
+                entry.holder = None
+                entry.lock.release()
+        finally:
+            entry.users -= 1
+            if entry.users == 0 and self._entries.get(session_id) is entry:
+                del self._entries[session_id]
+
+    def was_superseded(self, task: Optional[asyncio.Task]) -> bool:
+        """True if the task was cancelled by a newer request on the same session (cancel policy)"""
+        return task is not None and task in self._superseded
+
+    def snapshot(self) -> dict:
+        return {
+            "policy": self.policy,
+            "active_sessions": len(self._entries),
+            "acquired": self.acquired,
+            "waited": self.waited,
+            "rejected": self.rejected,
+            "cancelled": self.cancelled,
+            "timeouts": self.timeouts,
+        }
@@ -0,0 +1,266 @@
+"""
+Conversation storage with optional durable persistence
+Sessions live in memory and are loaded lazily from a Redis-compatible store
+(real Redis, or the SQLite-backed LocalRedis) on first access; new turns are
+written behind the request path by a background writer thread.
+"""
+
+import asyncio
+import json
+import os
+import queue
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+MEMORY = "memory"
+SQLITE = "sqlite"
+REDIS = "redis"
+
+BACKENDS = (MEMORY, SQLITE, REDIS)
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "sessions.db")
+
+
+class SessionStore:
+    """
+    Per-session message history (user/assistant/tool turns)
+    - memory: in-process only (lost on restart)
+    - sqlite / redis: durable; each message is one list item under "session:<id>"
+    In-memory copies are kept in an LRU of `cache_size` sessions. Sessions with
+    writes still queued are never evicted, so a reload can't miss a turn.
+    With `shared` (several workers on one durable store) a cached session is
+    checked against the store's list length and catches up on turns another
+    worker appended.
+    A session whose write failed no longer matches the store (the memory copy
+    has turns the log lacks, which would also throw off the catch-up offsets),
+    so it is reloaded from the store once its queued writes have drained.
+    """
+
+    # Max queued messages written per batch (one pipeline / transaction)
+    BATCH_SIZE = 200
+
+    def __init__(self, client=None, ttl_seconds: int = 7 * 24 * 3600, cache_size: int = 10000, key_prefix: str = "session:", shared: bool = False):
+        self.client = client
+        self.shared = shared and client is not None
+        self.ttl_seconds = ttl_seconds
+        self.cache_size = cache_size
+        self.key_prefix = key_prefix
+
+        self._sessions: "OrderedDict[str, List[Dict]]" = OrderedDict()
+        self._pending: Dict[str, int] = {}
+        self._pending_lock = threading.Lock()
+        # Sessions with a failed write, to reload from the store (guarded by _pending_lock)
+        self._dirty: set = set()
+        self._queue: "queue.Queue" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._writer_pid = None
+
+        self.loads = 0
+        self.catch_ups = 0
+        self.created = 0
+        self.evictions = 0
+        self.writes = 0
+        self.write_batches = 0
+        self.write_errors = 0
+        self.resyncs = 0
+
+    @classmethod
+    def from_env(cls) -> "SessionStore":
+        """
+        SESSION_STORE=memory (default) / sqlite (SESSION_DB_PATH) / redis (REDIS_URL)
+        SESSION_SHARED=false skips cross-worker catch-up for single-process deployments
+        """
+        backend = os.getenv("SESSION_STORE", MEMORY).lower()
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown session store: {backend} (expected one of {BACKENDS})")
+
+        client = None
+        if backend == SQLITE:
+            from core.local_redis import LocalRedis
+            client = LocalRedis(os.getenv("SESSION_DB_PATH", DEFAULT_DB_PATH))
+        elif backend == REDIS:
+            try:
+                import redis
+            except ImportError:
+                raise ImportError("SESSION_STORE=redis needs the redis package (pip install redis)")
+            client = redis.Redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0"), decode_responses=True)
+
+        store = cls(
+            client=client,
+            ttl_seconds=int(os.getenv("SESSION_TTL_SECONDS", str(7 * 24 * 3600))),
+            cache_size=int(os.getenv("SESSION_CACHE_SIZE", "10000")),
+            shared=os.getenv("SESSION_SHARED", "true").lower() == "true",
+        )
+        logger.info(f"💾 Session store: {backend}{' (shared)' if store.shared else ''}")
+        return store
+
+    @property
+    def durable(self) -> bool:
+        return self.client is not None
+
+    def _key(self, session_id: str) -> str:
+        return self.key_prefix + session_id
+
+    async def get(self, session_id: str) -> List[Dict]:
+        """History of a session, loading it from the durable store on first access"""
+        history = self._sessions.get(session_id)
+        if history is not None and session_id in self._dirty:
+            with self._pending_lock:
+                resync = not self._pending.get(session_id)
+                if resync:
+                    self._dirty.discard(session_id)
+            if resync:
+                # Start over from what the store actually has
+                del self._sessions[session_id]
+                history = None
+                self.resyncs += 1
+                logger.warning(f"🔁 Reloading session {session_id} from the store after a failed write")
+
+        if history is not None:
+            self._sessions.move_to_end(session_id)
+            if self.shared and not self._pending.get(session_id):
+                await self._catch_up(session_id, history)
+            return history
+
+        if self.durable:
+            with self._pending_lock:
+                self._dirty.discard(session_id)
+            items = await asyncio.to_thread(self.client.lrange, self._key(session_id), 0, -1)
+            # Another request may have loaded it while this one waited
+            history = self._sessions.get(session_id)
+            if history is None:
+                history = [json.loads(item) for item in items]
+                self.loads += bool(history)
+        if not history:
+            history = []
+            self.created += 1
+            logger.info(f"🆕 New session: {session_id}")
+
+        self._sessions[session_id] = history
+        self._evict()
+        return history
+
+    async def _catch_up(self, session_id: str, history: List[Dict]):
+        """Pull turns another worker appended since this one cached the session"""
+        key = self._key(session_id)
+        length = await asyncio.to_thread(self.client.llen, key)
+        if length <= len(history):
+            return
+        items = await asyncio.to_thread(self.client.lrange, key, len(history), -1)
+        history.extend(json.loads(item) for item in items)
+        self.catch_ups += 1
+
+    def append(self, session_id: str, messages: List[Dict]):
+        """Add messages to a session; durable stores are written in the background"""
+        history = self._sessions.get(session_id)
+        if history is None:
+            history = self._sessions[session_id] = []
+        history.extend(messages)
+
+        if self.durable and messages:
+            with self._pending_lock:
+                self._pending[session_id] = self._pending.get(session_id, 0) + 1
+            self._ensure_writer()
+            self._queue.put((session_id, [json.dumps(m) for m in messages]))
+
+    def forget(self, session_id: str):
+        """Drop a session's in-memory copy (the durable copy, if any, is kept)"""
+        with self._pending_lock:
+            if self._pending.get(session_id):
+                return
+        self._sessions.pop(session_id, None)
+
+    def _evict(self):
+        if len(self._sessions) <= self.cache_size:
+            return
+        with self._pending_lock:
+            for session_id in list(self._sessions):
+                if len(self._sessions) <= self.cache_size:
+                    break
+                if self.durable and self._pending.get(session_id):
+                    continue
+                # Without a durable store an evicted session is gone, as before with an unbounded dict
+                if not self.durable:
+                    break
+                del self._sessions[session_id]
+                self.evictions += 1
+
+    def _ensure_writer(self):
+        # Started lazily and per process: threads don't survive a fork (gunicorn --preload)
+        if self._writer is not None and self._writer.is_alive() and self._writer_pid == os.getpid():
+            return
+        self._writer_pid = os.getpid()
+        self._writer = threading.Thread(target=self._write_loop, name="session-writer", daemon=True)
+        self._writer.start()
+
+    def _write_loop(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                return
+
+            batch = [item]
+            while len(batch) < self.BATCH_SIZE:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None)
+                    break
+                batch.append(item)
+
+            try:
+                pipe = self.client.pipeline()
+                for session_id, payloads in batch:
+                    pipe.rpush(self._key(session_id), *payloads)
+                    pipe.expire(self._key(session_id), self.ttl_seconds)
+                pipe.execute()
+                self.writes += len(batch)
+                self.write_batches += 1
+            except Exception as e:
+                self.write_errors += len(batch)
+                with self._pending_lock:
+                    self._dirty.update(session_id for session_id, _ in batch)
+                logger.error(f"❌ Session write failed ({len(batch)} turns not persisted): {str(e)}", exc_info=True)
+            finally:
+                with self._pending_lock:
+                    for session_id, _ in batch:
+                        self._pending[session_id] -= 1
+                        if not self._pending[session_id]:
+                            del self._pending[session_id]
+                for _ in batch:
+                    self._queue.task_done()
+
+    def flush(self):
+        """Block until every queued write has been attempted"""
+        if self.durable:
+            self._queue.join()
+
+    def close(self):
+        """Flush queued writes and stop the writer"""
+        if self._writer is not None and self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+        self._writer = None
+
+    def snapshot(self) -> dict:
+        return {
+            "backend": type(self.client).__name__ if self.client is not None else MEMORY,
+            "cached_sessions": len(self._sessions),
+            "pending_writes": self._queue.qsize(),
+            "shared": self.shared,
+            "loads": self.loads,
+            "catch_ups": self.catch_ups,
+            "created": self.created,
+            "evictions": self.evictions,
+            "writes": self.writes,
+            "write_batches": self.write_batches,
+            "write_errors": self.write_errors,
+            "resyncs": self.resyncs,
+        }
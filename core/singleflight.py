@@ -0,0 +1,82 @@
+"""
+Single-flight coalescing of identical in-flight requests
+Concurrent callers with the same key share one upstream call
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    """One in-flight call and the number of callers awaiting it"""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key
+    - The first caller (leader) starts the work as a task
+    - Later callers with the same key await the same task
+    - The task is only cancelled once every waiter has gone away
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, _Call] = {}
+
+        self.leaders = 0
+        self.coalesced = 0
+        self.failures = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Run fn() once per key among concurrent callers
+
+        Args:
+            key: Coalescing key (e.g. the response cache fingerprint)
+            fn: Coroutine factory doing the actual work
+
+        Returns:
+            (result, shared) - shared is True when the result came from another caller's call
+        """
+        call = self._inflight.get(key)
+        shared = call is not None
+
+        if shared:
+            self.coalesced += 1
+            logger.info(f"🔗 Coalesced with in-flight request ({call.waiters} already waiting)")
+        else:
+            self.leaders += 1
+            call = _Call(asyncio.ensure_future(fn()))
+            self._inflight[key] = call
+            call.task.add_done_callback(lambda t, k=key, c=call: self._done(k, c))
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task), shared
+        except asyncio.CancelledError:
+            # Only cancel the shared work when nobody else is waiting for it
+            if call.waiters == 1 and not call.task.done():
+                call.task.cancel()
+            raise
+        finally:
+            call.waiters -= 1
+
+    def _done(self, key: str, call: _Call):
+        if self._inflight.get(key) is call:
+            del self._inflight[key]
+        if not call.task.cancelled() and call.task.exception() is not None:
+            self.failures += 1
+
+    def snapshot(self) -> dict:
+        return {
+            "in_flight": len(self._inflight),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "failures": self.failures,
+        }
@@ -0,0 +1,50 @@
+"""
+Local token counting
+Uses tiktoken when it (and its encoding files) are available, otherwise a ~4 chars/token estimate.
+Callers that report token counts should check is_exact() and label or refuse estimates.
+"""
+
+import math
+from functools import lru_cache
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Rough average for English prose and JSON with the GPT-4o tokenizer
+CHARS_PER_TOKEN = 4
+
+
+@lru_cache(maxsize=None)
+def _get_encoding(model: str):
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        # tiktoken downloads encoding files on first use; offline hosts fall back
+        logger.warning(f"⚠️ tiktoken encoding unavailable ({type(e).__name__}), using ~{CHARS_PER_TOKEN} chars/token estimate")
+        return None
+
+
+def count_tokens(text: str, model: str = "gpt-4o") -> int:
+    """Count (or estimate) the tokens in text for a model"""
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return math.ceil(len(text) / CHARS_PER_TOKEN)
+    return len(encoding.encode(text))
+
+
+def is_exact(model: str = "gpt-4o") -> bool:
+    """Whether count_tokens uses the real tokenizer for a model rather than the chars/token estimate"""
+    return _get_encoding(model) is not None
+
+
+def tokenizer_name(model: str = "gpt-4o") -> str:
+    """Which tokenizer count_tokens uses for a model"""
+    encoding = _get_encoding(model)
+    return f"tiktoken:{encoding.name}" if encoding is not None else f"estimate:{CHARS_PER_TOKEN}-chars-per-token"
@@ -0,0 +1,68 @@
+"""
+Gunicorn configuration for multi-worker deployments
+    gunicorn -c gunicorn.conf.py application:app
+
+- Uvicorn workers (the app is async)
+- The app is preloaded in the master, so the catalog, prompts and vector index
+  are built once and shared copy-on-write by the forked workers
+- More than one worker needs a shared session tier: SESSION_STORE defaults to
+  sqlite here (set SESSION_STORE=redis for several hosts)
+- Each worker holds its own copy of the catalog, and POST /admin/reload-catalog
+  only reloads the worker that serves it. With more than one worker the catalog
+  file watcher is on by default (CATALOG_WATCH_INTERVAL=5), so every worker
+  picks up a changed data/products.json within that interval. Setting it to 0
+  leaves the other workers on the old catalog (prompts and cached answers
+  included) until they restart.
+- Idempotency keys and per-session locks are per worker (in-process state).
+  They hold when a session's requests reach the same worker. Across workers,
+  two concurrent requests on one session can interleave their turns, and a
+  retry that lands on another worker runs the turn again. Route each session
+  to one worker at the load balancer (sticky sessions), or run one worker per
+  host, when those guarantees matter. Conversation history itself is shared
+  through SESSION_STORE.
+
+Environment:
+    WEB_CONCURRENCY   worker processes (default 1)
+    PORT              listen port (default 8000)
+    GUNICORN_TIMEOUT  worker timeout in seconds (default 120)
+"""
+
+import gc
+import os
+
+workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+worker_class = "uvicorn.workers.UvicornWorker"
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+preload_app = True
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = 30
+keepalive = 5
+
+# Per-process conversation dicts can't follow a session from worker to worker
+if workers > 1:
+    os.environ.setdefault("SESSION_STORE", "sqlite")
+    if os.environ["SESSION_STORE"] == "memory":
+        raise RuntimeError("SESSION_STORE=memory only works with a single worker (WEB_CONCURRENCY=1)")
+
+    # Catalog reloads reach every worker through the file watcher, not the admin endpoint
+    os.environ.setdefault("CATALOG_WATCH_INTERVAL", "5")
+
+
+def when_ready(server):
+    """Runs in the master after the app is loaded, before workers are forked"""
+    import application
+    from tools.vector_search import get_vector_search
+
+    # Build the vector index once in the master rather than once per worker
+    if application.retrieval.default != "full":
+        try:
+            get_vector_search()
+        except Exception as e:
+            server.log.warning(f"⚠️ Vector index not preloaded ({e}) - workers will build it on first use")
+
+    # Keep the preloaded objects out of GC passes, so collections in the
+    # workers don't write to (and un-share) their pages
+    gc.freeze()
+    server.log.info(f"🚀 Preloaded app; starting {workers} worker(s)")
+    if workers > 1:
+        server.log.warning("⚠️ Idempotency keys and session locks are per worker - route sessions to one worker for them to hold")
@@ -0,0 +1,16 @@
+"""
+Search instructions for the hybrid retrieval mode
+Appended to the full-menu prompt, ahead of the (relevance-pruned) catalog
+"""
+
+HYBRID_SEARCH_PROMPT = """
+
+PRODUCT SEARCH (overrides "Do NOT call tools when the question is about products" above):
+
+The catalog below details only the products most relevant to this question; the PRODUCT INDEX names every product we sell.
+
+Call vector_search when:
+→ The customer asks about a product or attribute that is not detailed below
+→ The question spans products beyond those detailed (e.g. "anything else without gluten?")
+
+Answer from the catalog below, without searching, when it already contains the facts."""
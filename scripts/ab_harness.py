@@ -0,0 +1,155 @@
+"""
+A/B harness for retrieval modes
+Replays a conversation set through each retrieval mode (full / vector / hybrid)
+of a running server and compares latency, token usage and answer overlap
+
+Token usage comes from /metrics deltas, so run it against a server with no
+other traffic, and with RESPONSE_CACHE_ENABLED=false / SEMANTIC_CACHE_ENABLED=false
+so every mode pays for its own answers.
+
+Usage:
+    python scripts/ab_harness.py [--url http://localhost:8001] [--modes full,vector,hybrid]
+                                 [--conversations conversations.json] [--json]
+
+conversations.json: [{"name": "frying", "messages": ["Best oil for deep frying?", "What sizes?"]}, ...]
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.answer_overlap import answer_overlap
+from core.retrieval import RETRIEVAL_MODES, FULL
+from measure_catalog_pruning import SAMPLE_QUESTIONS
+
+# Single-turn sample questions plus a few follow-up conversations
+DEFAULT_CONVERSATIONS = [{"name": question, "messages": [question]} for question in SAMPLE_QUESTIONS] + [
+    {"name": "oil follow-up", "messages": ["Best oil for deep frying?", "What sizes does it come in?", "And the price of the biggest one?"]},
+    {"name": "kids breakfast", "messages": ["Something healthy for my kids' breakfast", "Is it gluten-free?"]},
+    {"name": "order then product", "messages": ["Where is my order ORD-1001?", "Do you also sell jaggery?"]},
+]
+
+
+def usage_totals(client: httpx.Client) -> dict:
+    """Prompt / cached / completion tokens and cost summed over all routing tiers"""
+    routing = client.get("/metrics").json()["routing"]
+    return {
+        key: sum(tier.get(key) or 0 for tier in routing.values())
+        for key in ("prompt_tokens", "cached_tokens", "completion_tokens", "cost_usd")
+    }
+
+
+def percentile(values, p):
+    values = sorted(values)
+    if not values:
+        return None
+    return values[min(len(values) - 1, int(p * len(values)))]
+
+
+def run_mode(client: httpx.Client, mode: str, conversations: list) -> dict:
+    """Replay every conversation in one mode; answers are kept per conversation and turn"""
+    before = usage_totals(client)
+    latencies, answers, errors = [], {}, 0
+
+    for conversation in conversations:
+        session_id = f"ab-{mode}-{uuid.uuid4().hex[:8]}"
+        replies = []
+        for message in conversation["messages"]:
+            started = time.perf_counter()
+            response = client.post("/chat", json={"message": message, "session_id": session_id, "retrieval_mode": mode})
+            latencies.append((time.perf_counter() - started) * 1000)
+
+            if response.status_code != 200:
+                errors += 1
+                replies.append(None)
+                print(f"  ❌ [{mode}] {conversation['name']}: HTTP {response.status_code} {response.text[:120]}", file=sys.stderr)
+                continue
+            replies.append(response.json()["response"])
+        answers[conversation["name"]] = replies
+
+    after = usage_totals(client)
+    requests = len(latencies)
+    usage = {key: after[key] - before[key] for key in before}
+
+    return {
+        "requests": requests,
+        "errors": errors,
+        "latency_ms_avg": round(statistics.mean(latencies), 1) if latencies else None,
+        "latency_ms_p50": round(percentile(latencies, 0.50), 1) if latencies else None,
+        "latency_ms_p95": round(percentile(latencies, 0.95), 1) if latencies else None,
+        "prompt_tokens_per_request": round(usage["prompt_tokens"] / requests) if requests else None,
+        "cached_tokens_per_request": round(usage["cached_tokens"] / requests) if requests else None,
+        "completion_tokens_per_request": round(usage["completion_tokens"] / requests) if requests else None,
+        "cost_usd_per_request": round(usage["cost_usd"] / requests, 6) if requests else None,
+        "answers": answers,
+    }
+
+
+def overlap_with(results: dict, mode: str, baseline: str) -> float:
+    """Mean word overlap between a mode's answers and the baseline mode's, turn by turn"""
+    scores = []
+    for name, replies in results[mode]["answers"].items():
+        for reply, baseline_reply in zip(replies, results[baseline]["answers"][name]):
+            if reply is not None and baseline_reply is not None:
+                scores.append(answer_overlap(reply, baseline_reply))
+    return round(statistics.mean(scores), 3) if scores else None
+
+
+def print_report(results: dict, baseline: str):
+    columns = [
+        ("requests", "reqs"), ("errors", "errs"), ("latency_ms_p50", "p50_ms"), ("latency_ms_p95", "p95_ms"),
+        ("prompt_tokens_per_request", "prompt_tok"), ("cached_tokens_per_request", "cached_tok"),
+        ("completion_tokens_per_request", "compl_tok"), ("cost_usd_per_request", "usd/req"), ("overlap", f"vs_{baseline}"),
+    ]
+    print(f"{'mode':<8}" + "".join(f"{label:>12}" for _, label in columns))
+    for mode, result in results.items():
+        print(f"{mode:<8}" + "".join(f"{str(result.get(key)):>12}" for key, _ in columns))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare retrieval modes on a replayed conversation set")
+    parser.add_argument("--url", default="http://localhost:8001", help="Base URL of a running server")
+    parser.add_argument("--modes", default=",".join(RETRIEVAL_MODES), help="Comma-separated modes to compare")
+    parser.add_argument("--baseline", default=FULL, help="Mode the others' answers are compared against")
+    parser.add_argument("--conversations", help="JSON file of conversations (see module docstring)")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-request timeout in seconds")
+    parser.add_argument("--json", action="store_true", help="Print the results (including answers) as JSON")
+    args = parser.parse_args()
+
+    modes = [mode.strip() for mode in args.modes.split(",") if mode.strip()]
+    unknown = [mode for mode in modes + [args.baseline] if mode not in RETRIEVAL_MODES]
+    if unknown:
+        parser.error(f"Unknown retrieval modes: {', '.join(unknown)} (expected {', '.join(RETRIEVAL_MODES)})")
+    if args.baseline not in modes:
+        modes.insert(0, args.baseline)
+
+    conversations = DEFAULT_CONVERSATIONS
+    if args.conversations:
+        with open(args.conversations, 'r') as f:
+            conversations = json.load(f)
+
+    results = {}
+    with httpx.Client(base_url=args.url, timeout=args.timeout) as client:
+        for mode in modes:
+            print(f"▶️  {mode}: replaying {len(conversations)} conversations...", file=sys.stderr)
+            results[mode] = run_mode(client, mode, conversations)
+
+    for mode in modes:
+        results[mode]["overlap"] = overlap_with(results, mode, args.baseline)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_report(results, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
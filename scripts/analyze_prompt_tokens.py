@@ -0,0 +1,197 @@
+"""
+Prompt-token analyzer for system prompts and catalog payloads
+Counts tokens per prompt section, per product and per catalog serialization
+with a local tokenizer, and reports the fixed per-request overhead of each
+prompt configuration
+
+Usage:
+    python scripts/analyze_prompt_tokens.py [--model gpt-4o] [--json] [--sections] [--allow-estimate]
+"""
+
+import argparse
+import importlib
+import json
+import re
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from core.catalog import Catalog
+from core.prompt_state import PromptState
+from core.tokens import count_tokens, is_exact, tokenizer_name
+from tools.definitions import TOOLS_BY_PROMPT
+from measure_catalog_pruning import SAMPLE_QUESTIONS
+
+# Chat format overhead per message (role markers etc.) and per request (reply priming)
+TOKENS_PER_MESSAGE = 3
+TOKENS_PER_REQUEST = 3
+
+# Section headings: "CORE OPERATING PRINCIPLES:", "1. TRUTH OVER CONVENIENCE", "PURPOSE:"
+_HEADING_RE = re.compile(r"^(\d+\.\s+)?[A-Z][A-Z0-9 /&()'\",\-]{2,}:?$")
+
+
+def prompt_constants():
+    """(module, name, text) for every string constant in prompts/"""
+    for path in sorted((ROOT / "prompts").glob("*.py")):
+        if path.name == "__init__.py":
+            continue
+        module = importlib.import_module(f"prompts.{path.stem}")
+        for name, value in vars(module).items():
+            if name.isupper() and isinstance(value, str):
+                yield path.name, name, value
+
+
+def split_sections(text: str):
+    """Split a prompt into (heading, text) sections at all-caps heading lines"""
+    sections = []
+    heading, lines = "(preamble)", []
+    for line in text.splitlines():
+        if _HEADING_RE.match(line.strip()) and lines:
+            sections.append((heading, "\n".join(lines)))
+            heading, lines = line.strip().rstrip(":"), [line]
+        else:
+            if _HEADING_RE.match(line.strip()):
+                heading = line.strip().rstrip(":")
+            lines.append(line)
+    if lines:
+        sections.append((heading, "\n".join(lines)))
+    return sections
+
+
+def catalog_formats(catalog: Catalog) -> dict:
+    """Serializations of the whole catalog"""
+    return {
+        "json_indent2 (current)": catalog.full_json,
+        "json_minified": json.dumps(catalog.products, separators=(",", ":")),
+        "compact_text (name, sizes, prices)": "\n".join(catalog.compact_text),
+        "index_only (names by category)": catalog.index_text,
+    }
+
+
+def request_overhead(system_prompt: str, tools, model: str) -> dict:
+    """Fixed tokens paid by every request with this system prompt and tool list"""
+    system = count_tokens(system_prompt, model) + TOKENS_PER_MESSAGE
+    tool_tokens = count_tokens(json.dumps(tools), model) if tools else 0
+    return {
+        "system_prompt": system,
+        "tools": tool_tokens,
+        "total": system + tool_tokens + TOKENS_PER_REQUEST,
+    }
+
+
+def analyze(model: str) -> dict:
+    catalog = Catalog.load()
+    state = PromptState(catalog, pruning=True)
+
+    prompts = []
+    for filename, name, text in prompt_constants():
+        prompts.append({
+            "file": filename,
+            "name": name,
+            "tokens": count_tokens(text, model),
+            "sections": [
+                {"heading": heading, "tokens": count_tokens(section, model)}
+                for heading, section in split_sections(text)
+            ],
+        })
+
+    products = [
+        {
+            "name": product["name"],
+            "json_indent2": count_tokens(catalog.product_json[i], model),
+            "json_minified": count_tokens(json.dumps(product, separators=(",", ":")), model),
+            "compact_text": count_tokens(catalog.compact_text[i], model),
+        }
+        for i, product in enumerate(catalog.products)
+    ]
+
+    formats = {name: count_tokens(text, model) for name, text in catalog_formats(catalog).items()}
+
+    configurations = {}
+    for variant, system_prompt in state.system_prompts.items():
+        label = f"{variant} (full menu)" if variant in state.catalog_instructions else variant
+        configurations[label] = request_overhead(system_prompt, TOOLS_BY_PROMPT.get(variant), model)
+
+    for variant in state.catalog_instructions:
+        pruned = [
+            request_overhead(state.system_prompt(variant, [], question), TOOLS_BY_PROMPT[variant], model)["total"]
+            for question in SAMPLE_QUESTIONS
+        ]
+        configurations[f"{variant} (pruned, sample avg)"] = {
+            "total": round(sum(pruned) / len(pruned)),
+            "min": min(pruned),
+            "max": max(pruned),
+        }
+
+    tool_schemas = {
+        tool["function"]["name"]: count_tokens(json.dumps(tool), model)
+        for tools in TOOLS_BY_PROMPT.values() for tool in tools
+    }
+
+    return {
+        "tokenizer": tokenizer_name(model),
+        "estimated": not is_exact(model),
+        "model": model,
+        "catalog_version": catalog.version,
+        "prompts": prompts,
+        "products": products,
+        "catalog_formats": formats,
+        "tool_schemas": tool_schemas,
+        "configurations": configurations,
+    }
+
+
+def print_report(report: dict, show_sections: bool):
+    print(f"Tokenizer: {report['tokenizer']} (model {report['model']}, catalog {report['catalog_version']})")
+    if report["estimated"]:
+        print("⚠️ ESTIMATE: tiktoken encoding unavailable, every count below is a chars/token approximation")
+
+    print("\nPROMPTS")
+    for prompt in report["prompts"]:
+        print(f"  {prompt['file'] + ':' + prompt['name']:<58} {prompt['tokens']:>7}")
+        if show_sections:
+            for section in prompt["sections"]:
+                print(f"      {section['heading'][:52]:<54} {section['tokens']:>7}")
+
+    print("\nTOOL SCHEMAS (JSON, approximate)")
+    for name, tokens in report["tool_schemas"].items():
+        print(f"  {name:<58} {tokens:>7}")
+
+    print("\nCATALOG SERIALIZATIONS")
+    for name, tokens in report["catalog_formats"].items():
+        print(f"  {name:<58} {tokens:>7}")
+
+    print("\nPRODUCTS (json_indent2 / json_minified / compact_text)")
+    for product in sorted(report["products"], key=lambda p: -p["json_indent2"]):
+        print(f"  {product['name'][:46]:<46} {product['json_indent2']:>7} {product['json_minified']:>7} {product['compact_text']:>7}")
+
+    print("\nFIXED PER-REQUEST OVERHEAD")
+    for name, overhead in report["configurations"].items():
+        detail = ", ".join(f"{k}={v}" for k, v in overhead.items() if k != "total")
+        print(f"  {name:<36} {overhead['total']:>7}  ({detail})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Count prompt and catalog tokens per section, product and configuration")
+    parser.add_argument("--model", default="gpt-4o", help="Model whose tokenizer to use")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    parser.add_argument("--sections", action="store_true", help="Break each prompt down by section")
+    parser.add_argument("--allow-estimate", action="store_true",
+                        help="Report chars/token estimates when the tiktoken encoding is unavailable instead of failing")
+    args = parser.parse_args()
+
+    if not is_exact(args.model) and not args.allow_estimate:
+        parser.exit(1, f"❌ tiktoken encoding for {args.model} is unavailable (install requirements-dev.txt and allow "
+                       f"the encoding download, or pass --allow-estimate for approximate counts)\n")
+
+    report = analyze(args.model)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report, args.sections)
+
+
+if __name__ == "__main__":
+    main()
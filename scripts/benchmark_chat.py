@@ -0,0 +1,306 @@
+"""
+Cassette-replay regression benchmark for the chat pipeline
+Upstream completions are recorded once into a cassette and replayed with a
+zero-latency fake, so the numbers measure only our own per-request overhead:
+routing, prompt building, history handling, JSON (de)serialization, tool
+dispatch, logging and the FastAPI request/response path
+
+Usage:
+    # Record (against OpenAI, or OPENAI_BASE_URL, e.g. scripts/fake_llm_server.py)
+    python scripts/benchmark_chat.py --record
+
+    # Replay and compare with the baseline; exits 1 on regression
+    python scripts/benchmark_chat.py [--iterations 10] [--rounds 7] [--attempts 2]
+
+    # Accept the current numbers as the new baseline
+    python scripts/benchmark_chat.py --update-baseline
+
+The baseline is the pipeline as of the commit that added this gate; later
+changes are measured against it rather than against themselves, so don't
+regenerate it to make a regression pass. Timings depend on the machine:
+re-record it (from that baseline's code) when the benchmark host changes.
+Allocation numbers (tracemalloc) are stable across hosts and runs.
+
+tests/test_benchmark.py runs the same gate under pytest.
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from types import SimpleNamespace
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# Measure the uncached pipeline with a fixed configuration
+os.environ["RESPONSE_CACHE_ENABLED"] = "false"
+os.environ["SEMANTIC_CACHE_ENABLED"] = "false"
+os.environ["RETRIEVAL_MODE"] = "full"
+os.environ["CATALOG_WATCH_INTERVAL"] = "0"
+os.environ.setdefault("OPENAI_API_KEY", "cassette")
+
+import application
+from openai.types.chat import ChatCompletion
+
+BENCHMARKS = ROOT / "benchmarks"
+CONVERSATIONS_PATH = BENCHMARKS / "conversations.jsonl"
+CASSETTE_PATH = BENCHMARKS / "cassettes" / "conversations.json"
+BASELINE_PATH = BENCHMARKS / "baseline.json"
+
+# Regression when current > baseline * (1 + relative) + absolute
+# Timings are medians over rounds and a regression must repeat (--attempts); the
+# absolute floor keeps sub-50us jitter on a ~1ms request from failing the gate
+THRESHOLDS = {
+    "server_us_p50": (0.15, 50.0),
+    "server_us_p95": (0.20, 100.0),
+    "alloc_peak_kib_p50": (0.10, 4.0),
+    "retained_kib_per_conversation": (0.10, 2.0),
+}
+
+
+class CassetteMiss(Exception):
+    """Raised when the pipeline makes a call the cassette has no recording for"""
+
+
+def last_user_message(messages: list) -> str:
+    return next((m["content"] for m in reversed(messages) if m["role"] == "user"), "")
+
+
+def load_conversations(path: Path = CONVERSATIONS_PATH) -> list:
+    """Chat-only conversations (non-chat replay steps are skipped)"""
+    with open(path, 'r') as f:
+        conversations = [json.loads(line) for line in f if line.strip()]
+    return [
+        {"name": c["name"], "messages": [m for m in c["messages"] if isinstance(m, str)]}
+        for c in conversations
+    ]
+
+
+class _RecordingCompletions:
+    def __init__(self, upstream):
+        self.upstream = upstream
+        self.conversation = None
+        self.recorded = {}
+
+    async def create(self, **kwargs):
+        response = await self.upstream.chat.completions.create(**kwargs)
+        self.recorded.setdefault(self.conversation, []).append({
+            "user": last_user_message(kwargs["messages"]),
+            "tools": bool(kwargs.get("tools")),
+            "response": response.model_dump(),
+        })
+        return response
+
+
+class _ReplayCompletions:
+    def __init__(self, cassette: dict):
+        # Parsed once up front, so replay costs nothing per call
+        self.calls = {
+            name: [(call["user"], ChatCompletion.model_validate(call["response"])) for call in calls]
+            for name, calls in cassette["conversations"].items()
+        }
+        self.conversation = None
+        self.position = 0
+
+    async def create(self, **kwargs):
+        calls = self.calls.get(self.conversation, [])
+        if self.position >= len(calls):
+            raise CassetteMiss(f"{self.conversation}: no recorded call #{self.position + 1}")
+
+        user, response = calls[self.position]
+        self.position += 1
+        if user != last_user_message(kwargs["messages"]):
+            raise CassetteMiss(f"{self.conversation}: call #{self.position} was recorded for {user!r} - re-record the cassette")
+        return response
+
+
+class CassetteClient:
+    """Stand-in for AsyncOpenAI that records or replays chat completions per conversation"""
+
+    def __init__(self, completions):
+        self.chat = SimpleNamespace(completions=completions)
+
+    def start(self, conversation: str):
+        self.chat.completions.conversation = conversation
+        self.chat.completions.position = 0
+
+
+async def run_conversations(conversations: list, client: CassetteClient, iterations: int, trace: bool = False) -> dict:
+    """Replay every conversation `iterations` times through the ASGI app"""
+    timings_us, peaks_kib, retained_kib = [], [], []
+    transport = httpx.ASGITransport(app=application.app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as http:
+        for iteration in range(iterations):
+            for conversation in conversations:
+                client.start(conversation["name"])
+                session_id = f"bench-{iteration}-{conversation['name']}"
+                if trace:
+                    # Collect cycles left by earlier requests, so only this conversation's garbage counts
+                    gc.collect()
+                conversation_start = tracemalloc.get_traced_memory()[0] if trace else 0
+
+                for message in conversation["messages"]:
+                    if trace:
+                        tracemalloc.reset_peak()
+                        before = tracemalloc.get_traced_memory()[0]
+
+                    started = time.perf_counter()
+                    response = await http.post("/chat", json={"message": message, "session_id": session_id})
+                    elapsed_us = (time.perf_counter() - started) * 1_000_000
+
+                    if response.status_code != 200:
+                        raise RuntimeError(f"{conversation['name']}: HTTP {response.status_code} {response.text[:200]}")
+
+                    if trace:
+                        peaks_kib.append((tracemalloc.get_traced_memory()[1] - before) / 1024)
+                    else:
+                        timings_us.append(elapsed_us)
+
+                # Dropping the session should release everything the conversation allocated
+                application.sessions.forget(session_id)
+                if trace:
+                    gc.collect()
+                    retained_kib.append((tracemalloc.get_traced_memory()[0] - conversation_start) / 1024)
+
+    return {"timings_us": timings_us, "peaks_kib": peaks_kib, "retained_kib": retained_kib}
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p * len(values)))]
+
+
+async def measure(conversations: list, client: CassetteClient, iterations: int, rounds: int) -> dict:
+    # Warm up imports, lazy singletons and caches in the interpreter
+    await run_conversations(conversations, client, 1)
+
+    # Median of several rounds - one lucky or unlucky round doesn't move it
+    rounds_us = [(await run_conversations(conversations, client, iterations))["timings_us"] for _ in range(rounds)]
+
+    # Allocation pass separately - tracemalloc slows everything down. Collect first and
+    # let the tasks finalizers schedule run (the replaced OpenAI client closes its pool
+    # that way), so garbage from the timing rounds isn't charged to the traced pass
+    gc.collect()
+    await asyncio.sleep(0.05)
+    tracemalloc.start()
+    traced = await run_conversations(conversations, client, max(1, iterations // 4), trace=True)
+    tracemalloc.stop()
+
+    return {
+        "requests": sum(len(timings) for timings in rounds_us),
+        "server_us_mean": round(statistics.median(statistics.mean(timings) for timings in rounds_us), 1),
+        "server_us_p50": round(statistics.median(percentile(timings, 0.50) for timings in rounds_us), 1),
+        "server_us_p95": round(statistics.median(percentile(timings, 0.95) for timings in rounds_us), 1),
+        "alloc_peak_kib_p50": round(percentile(traced["peaks_kib"], 0.50), 1),
+        "alloc_peak_kib_max": round(max(traced["peaks_kib"]), 1),
+        "retained_kib_per_conversation": round(statistics.mean(traced["retained_kib"]), 1),
+    }
+
+
+def compare(current: dict, baseline: dict) -> list:
+    """Metrics that regressed past their threshold"""
+    regressions = []
+    for metric, (relative, absolute) in THRESHOLDS.items():
+        limit = baseline[metric] * (1 + relative) + absolute
+        if current[metric] > limit:
+            regressions.append(f"{metric}: {current[metric]} > {round(limit, 1)} (baseline {baseline[metric]})")
+    return regressions
+
+
+async def record(conversations: list) -> dict:
+    """Run the conversations against the real upstream and capture every completion"""
+    recorder = _RecordingCompletions(application.client)
+    client = CassetteClient(recorder)
+    application.client = client
+
+    for conversation in conversations:
+        client.start(conversation["name"])
+        session_id = f"record-{conversation['name']}"
+        for message in conversation["messages"]:
+            await application.answer_chat(application.ChatRequest(message=message, session_id=session_id))
+        application.sessions.forget(session_id)
+
+    return {"recorded_at": time.strftime("%Y-%m-%d"), "conversations": recorder.recorded}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded completions and check per-request overhead against a baseline")
+    parser.add_argument("--record", action="store_true", help="Record the cassette against the configured upstream")
+    parser.add_argument("--update-baseline", action="store_true", help="Write the current results as the baseline")
+    parser.add_argument("--iterations", type=int, default=10, help="Replays of the conversation set per timing round")
+    parser.add_argument("--rounds", type=int, default=7, help="Timing rounds; the median round is reported")
+    parser.add_argument("--attempts", type=int, default=2, help="Measurements before a regression is reported")
+    parser.add_argument("--cassette", default=str(CASSETTE_PATH))
+    parser.add_argument("--baseline", default=str(BASELINE_PATH))
+    args = parser.parse_args()
+
+    conversations = load_conversations()
+
+    if args.record:
+        cassette = asyncio.run(record(conversations))
+        Path(args.cassette).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.cassette, 'w') as f:
+            json.dump(cassette, f, indent=1, sort_keys=True)
+        calls = sum(len(c) for c in cassette["conversations"].values())
+        print(f"📼 Recorded {calls} completions for {len(conversations)} conversations → {args.cassette}")
+        return
+
+    with open(args.cassette, 'r') as f:
+        client = CassetteClient(_ReplayCompletions(json.load(f)))
+    application.client = client
+
+    # Keep log formatting in the measurement, but don't let terminal I/O dominate it
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, logging.StreamHandler):
+            handler.setStream(open(os.devnull, 'w'))
+
+    host = {"python": platform.python_version(), "machine": platform.machine(), "platform": platform.system()}
+
+    if args.update_baseline:
+        results = {**asyncio.run(measure(conversations, client, args.iterations, args.rounds)), "host": host}
+        print(json.dumps(results, indent=2))
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+        print(f"📌 Baseline written to {args.baseline}")
+        return
+
+    if not Path(args.baseline).exists():
+        print(f"No baseline at {args.baseline} - run with --update-baseline first", file=sys.stderr)
+        sys.exit(2)
+
+    with open(args.baseline, 'r') as f:
+        baseline = json.load(f)
+    if baseline.get("host") != host:
+        print(f"⚠️ Baseline was recorded on {baseline.get('host')} - timings may not be comparable", file=sys.stderr)
+
+    # A regression has to show up in every attempt: a burst of load from a
+    # neighbour on a shared host shouldn't fail the gate on its own
+    for attempt in range(1, args.attempts + 1):
+        results = {**asyncio.run(measure(conversations, client, args.iterations, args.rounds)), "host": host}
+        print(json.dumps(results, indent=2))
+        regressions = compare(results, baseline)
+        if not regressions:
+            break
+        if attempt < args.attempts:
+            print(f"🔁 Over threshold ({'; '.join(regressions)}) - measuring again", file=sys.stderr)
+
+    if regressions:
+        print("❌ Regressions:\n  " + "\n  ".join(regressions), file=sys.stderr)
+        sys.exit(1)
+    print("✅ Within baseline thresholds")
+
+if __name__ == "__main__":
+    main()
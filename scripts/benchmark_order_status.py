@@ -0,0 +1,161 @@
+"""
+Throughput benchmark for bulk order-status lookups
+Compares one get_shipping_status call per id with get_shipping_statuses and
+the streaming POST /orders/status endpoint (served in-process)
+
+Runs against a synthetic order store (written to a temp file) with unique
+order ids, so each requested id is a distinct lookup: repeats would be
+answered from the bulk path's per-request memo and flatter it.
+
+Usage:
+    python scripts/benchmark_order_status.py [--orders 50000] [--ids 10000] [--missing 0.1] [--rounds 3]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+os.environ["CATALOG_WATCH_INTERVAL"] = "0"
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("ADMIN_TOKEN", "benchmark")
+
+import application
+import core.orders
+import tools.shipping_tracker
+from tools.shipping_tracker import get_shipping_status, get_shipping_statuses
+
+STATUSES = ["Processing", "Shipped", "In Transit", "Out for Delivery", "Delivered"]
+
+
+def make_orders(count: int, seed: int = 7) -> list:
+    """`count` synthetic orders with unique ids, in the data/orders.json format"""
+    rng = random.Random(seed)
+    start = date(2025, 1, 1)
+    orders = []
+    for i in range(count):
+        ordered = start + timedelta(days=rng.randrange(400))
+        status = rng.choice(STATUSES)
+        order = {
+            "order_id": f"ORD-{100000 + i}",
+            "customer_name": f"Customer {rng.randrange(count // 3 + 1)}",
+            "product_name": rng.choice(["Ragi Flour 2 LBS", "Cold Pressed Sesame Oil 2L", "Foxtail Millet Whole 2 LBS"]),
+            "quantity": rng.randint(1, 5),
+            "order_date": ordered.isoformat(),
+            "status": status,
+            "shipping_method": rng.choice(["Standard", "Express"]),
+        }
+        if status != "Processing":
+            order["shipped_date"] = (ordered + timedelta(days=1)).isoformat()
+            order["estimated_delivery"] = (ordered + timedelta(days=6)).isoformat()
+        if status == "Delivered":
+            order["actual_delivery"] = (ordered + timedelta(days=5)).isoformat()
+        orders.append(order)
+    return orders
+
+
+def use_order_store(orders: list) -> Path:
+    """Point the order index at a temp file holding `orders`"""
+    path = Path(tempfile.mkdtemp()) / "orders.json"
+    with open(path, 'w') as f:
+        json.dump(orders, f)
+    core.orders.ORDERS_PATH = path
+    tools.shipping_tracker.ORDERS_PATH = path
+    return path
+
+
+def make_ids(orders: list, count: int, missing: float, seed: int = 7) -> list:
+    """`count` distinct ids from the order store, with a `missing` fraction of unknown ids"""
+    rng = random.Random(seed)
+    unknown = round(count * missing)
+    known = [order["order_id"] for order in rng.sample(orders, count - unknown)]
+    order_ids = known + [f"ORD-X{i}" for i in range(unknown)]
+    rng.shuffle(order_ids)
+    return order_ids
+
+
+def time_per_id(order_ids: list) -> float:
+    started = time.perf_counter()
+    results = [get_shipping_status(order_id) for order_id in order_ids]
+    elapsed = time.perf_counter() - started
+    assert len(results) == len(order_ids)
+    return elapsed
+
+
+def time_bulk(order_ids: list) -> float:
+    started = time.perf_counter()
+    results = get_shipping_statuses(order_ids)
+    elapsed = time.perf_counter() - started
+    # Same per-order results as the single lookup
+    assert results[:100] == [get_shipping_status(order_id) for order_id in order_ids[:100]]
+    return elapsed
+
+
+async def time_endpoint(order_ids: list) -> float:
+    transport = httpx.ASGITransport(app=application.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        lines = 0
+        async with client.stream(
+            "POST", "/orders/status",
+            json={"order_ids": order_ids},
+            headers={"X-Admin-Token": os.environ["ADMIN_TOKEN"]},
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if line:
+                    json.loads(line)
+                    lines += 1
+        elapsed = time.perf_counter() - started
+    assert lines == len(order_ids), f"expected {len(order_ids)} lines, got {lines}"
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark bulk order-status lookup throughput")
+    parser.add_argument("--orders", type=int, default=50000, help="Orders in the synthetic store")
+    parser.add_argument("--ids", type=int, default=10000, help="Distinct order ids per lookup")
+    parser.add_argument("--missing", type=float, default=0.1, help="Fraction of unknown ids")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.ids > args.orders:
+        parser.error("--ids can't exceed --orders (ids are distinct)")
+
+    orders = make_orders(args.orders)
+    use_order_store(orders)
+    started = time.perf_counter()
+    core.orders.get_order_book()
+    print(f"Indexed {args.orders} synthetic orders in {(time.perf_counter() - started) * 1000:.0f}ms")
+
+    order_ids = make_ids(orders, args.ids, args.missing)
+    print(f"{args.ids} distinct ids ({args.missing:.0%} unknown), best of {args.rounds} rounds\n")
+
+    timings = {
+        "per-id get_shipping_status": [time_per_id(order_ids) for _ in range(args.rounds)],
+        "get_shipping_statuses": [time_bulk(order_ids) for _ in range(args.rounds)],
+        "POST /orders/status": [asyncio.run(time_endpoint(order_ids)) for _ in range(args.rounds)],
+    }
+
+    baseline = min(timings["per-id get_shipping_status"])
+    print(f"{'method':<28} {'best_ms':>9} {'median_ms':>10} {'ids/s':>11} {'speedup':>8}")
+    for name, runs in timings.items():
+        best = min(runs)
+        print(f"{name:<28} {best * 1000:>9.1f} {statistics.median(runs) * 1000:>10.1f} "
+              f"{args.ids / best:>11,.0f} {baseline / best:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
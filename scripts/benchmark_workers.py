@@ -0,0 +1,148 @@
+"""
+Throughput scaling across gunicorn worker counts
+Starts the fake LLM server, then for each worker count starts the app under
+gunicorn (gunicorn.conf.py, shared sqlite session store), replays the
+conversation set for a fixed duration and reports throughput and latency
+
+Usage:
+    python scripts/benchmark_workers.py [--workers 1,2,4,8] [--concurrency 64] [--duration 30]
+                                        [--latency constant:50] [--json]
+
+Upstream latency is simulated, so the numbers show our own per-worker
+capacity: with a slow upstream every worker mostly waits, and scaling only
+shows once CPU (prompt building, JSON, logging) becomes the bottleneck.
+Lower --latency to stress the app itself.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from replay_load_test import DEFAULT_CONVERSATIONS, load_conversations, run
+
+
+def wait_until_up(url: str, process: subprocess.Popen, timeout: float = 60.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{process.args[0]} exited with code {process.returncode}")
+        try:
+            httpx.get(url, timeout=1.0)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout}s")
+
+
+def stop(process: subprocess.Popen):
+    process.terminate()
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def start_app(workers: int, port: int, llm_port: int, session_db: str, log) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "WEB_CONCURRENCY": str(workers),
+        "PORT": str(port),
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{llm_port}/v1",
+        "OPENAI_API_KEY": os.getenv("OPENAI_API_KEY", "fake"),
+        "SESSION_STORE": "sqlite",
+        "SESSION_DB_PATH": session_db,
+        "CATALOG_WATCH_INTERVAL": "0",
+    }
+    return subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "application:app"],
+        cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT
+    )
+
+
+def benchmark(args) -> list:
+    conversations = load_conversations(Path(args.conversations))
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp, open(Path(tmp) / "server.log", 'w') as log:
+        llm = subprocess.Popen(
+            [sys.executable, str(ROOT / "scripts" / "fake_llm_server.py"), "--port", str(args.llm_port),
+             "--latency", args.latency, "--seed", "1"],
+            stdout=log, stderr=subprocess.STDOUT
+        )
+        try:
+            wait_until_up(f"http://127.0.0.1:{args.llm_port}/stats", llm)
+
+            for workers in args.workers:
+                app = start_app(workers, args.port, args.llm_port, str(Path(tmp) / f"sessions-{workers}.db"), log)
+                try:
+                    url = f"http://127.0.0.1:{args.port}"
+                    wait_until_up(f"{url}/health", app)
+                    print(f"▶️ {workers} worker(s): {args.duration}s at concurrency {args.concurrency}", file=sys.stderr)
+                    report = asyncio.run(run(url, conversations, args.concurrency, 0, args.duration, args.timeout))
+                finally:
+                    stop(app)
+
+                chat = report["endpoints"].get("POST /chat", report["total"])
+                results.append({
+                    "workers": workers,
+                    "throughput_rps": report["total"]["throughput_rps"],
+                    "chat_p50_ms": chat["latency_ms_p50"],
+                    "chat_p95_ms": chat["latency_ms_p95"],
+                    "error_rate": report["total"]["error_rate"],
+                })
+        finally:
+            stop(llm)
+
+    base = results[0]["throughput_rps"] / results[0]["workers"] if results and results[0]["throughput_rps"] else None
+    for result in results:
+        result["speedup"] = round(result["throughput_rps"] / results[0]["throughput_rps"], 2) if base else None
+        result["efficiency"] = round(result["throughput_rps"] / (base * result["workers"]), 2) if base else None
+    return results
+
+
+def print_report(results: list):
+    print(f"CPUs: {os.cpu_count()}\n")
+    columns = ["workers", "throughput_rps", "speedup", "efficiency", "chat_p50_ms", "chat_p95_ms", "error_rate"]
+    labels = ["workers", "req/s", "speedup", "effic.", "p50_ms", "p95_ms", "err_rate"]
+    print("".join(f"{label:>10}" for label in labels))
+    for result in results:
+        print("".join(f"{str(result[key]):>10}" for key in columns))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark throughput across gunicorn worker counts")
+    parser.add_argument("--workers", default="1,2,4", help="Comma-separated worker counts")
+    parser.add_argument("--concurrency", type=int, default=64, help="Conversations in flight at once")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds per worker count")
+    parser.add_argument("--latency", default="constant:50", help="Fake upstream latency distribution in ms")
+    parser.add_argument("--conversations", default=str(DEFAULT_CONVERSATIONS), help="JSONL file of conversations")
+    parser.add_argument("--port", type=int, default=8010)
+    parser.add_argument("--llm-port", type=int, default=9110)
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout in seconds")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args()
+    args.workers = [int(w) for w in args.workers.split(",")]
+    if max(args.workers) > (os.cpu_count() or 1):
+        print(f"⚠️ Only {os.cpu_count()} CPU(s) - worker counts above that can't scale", file=sys.stderr)
+
+    results = benchmark(args)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_report(results)
+
+
+if __name__ == "__main__":
+    main()
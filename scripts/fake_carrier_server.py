@@ -0,0 +1,150 @@
+"""
+Local carrier tracking stub for offline tests
+Serves POST /track with deterministic tracking events per tracking number,
+configurable latency and injected errors - the API HttpCarrierAdapter expects
+
+Point the app at it:
+    CARRIER_API_URL=http://localhost:9200 uvicorn application:app --port 8001
+
+Usage:
+    python scripts/fake_carrier_server.py [--port 9200] [--latency lognormal:150,0.5]
+                                          [--error-rate 0.01] [--max-batch 50]
+
+Latency specs are the same as scripts/fake_llm_server.py (milliseconds per request).
+Tracking numbers of orders in data/orders.json follow the order's status; other
+numbers get a made-up in-transit history, except ones ending in "0", which are unknown.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from fake_llm_server import LatencyModel
+
+ROOT = Path(__file__).resolve().parent.parent
+
+HUBS = ["Chicago, IL", "Memphis, TN", "Louisville, KY", "Dallas, TX", "Ontario, CA", "Newark, NJ"]
+
+STEPS = [
+    ("Shipped", "Shipment picked up"),
+    ("In Transit", "Departed facility"),
+    ("In Transit", "Arrived at facility"),
+    ("Out for Delivery", "Out for delivery"),
+    ("Delivered", "Delivered"),
+]
+
+
+class FakeCarrier:
+    """Deterministic tracking histories plus request counters"""
+
+    def __init__(self, latency: LatencyModel, error_rate: float = 0.0, max_batch: int = 50):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.max_batch = max_batch
+        self.orders = self._load_orders()
+
+        self.stats: Dict[str, int] = {"requests": 0, "numbers": 0, "errors": 0, "max_concurrent": 0}
+        self._concurrent = 0
+
+    @staticmethod
+    def _load_orders() -> Dict[str, dict]:
+        try:
+            with open(ROOT / "data" / "orders.json", 'r') as f:
+                orders = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return {order.get("tracking_number") or order["order_id"]: order for order in orders}
+
+    def track(self, number: str) -> Optional[dict]:
+        order = self.orders.get(number)
+        if order is None and number.endswith("0"):
+            return None
+
+        seed = int(hashlib.sha256(number.encode()).hexdigest()[:8], 16)
+        rng = random.Random(seed)
+        if order is not None:
+            status = order["status"]
+            start = datetime.fromisoformat(order.get("shipped_date") or order["order_date"])
+        else:
+            status = rng.choice(["Shipped", "In Transit", "Out for Delivery"])
+            start = datetime(2026, 1, 1) + timedelta(days=seed % 60)
+
+        # Walk the steps up to the current status
+        last = max((i for i, (step, _) in enumerate(STEPS) if step == status), default=1)
+        events = []
+        when = start.replace(hour=9)
+        for i, (_, description) in enumerate(STEPS[:last + 1]):
+            events.append({
+                "time": when.isoformat(),
+                "location": rng.choice(HUBS),
+                "description": description,
+            })
+            when += timedelta(hours=rng.randint(6, 30))
+        return {"status": status, "events": events}
+
+
+def create_app(carrier: FakeCarrier) -> FastAPI:
+    app = FastAPI(title="Fake carrier")
+
+    @app.post("/track")
+    async def track(request: Request):
+        body = await request.json()
+        numbers: List[str] = body.get("tracking_numbers") or []
+        if len(numbers) > carrier.max_batch:
+            return JSONResponse({"error": f"At most {carrier.max_batch} tracking numbers per request"}, status_code=413)
+
+        carrier.stats["requests"] += 1
+        carrier.stats["numbers"] += len(numbers)
+        carrier._concurrent += 1
+        carrier.stats["max_concurrent"] = max(carrier.stats["max_concurrent"], carrier._concurrent)
+        try:
+            await asyncio.sleep(carrier.latency.sample() / 1000)
+        finally:
+            carrier._concurrent -= 1
+
+        if carrier.error_rate and random.random() < carrier.error_rate:
+            carrier.stats["errors"] += 1
+            return JSONResponse({"error": "Tracking temporarily unavailable"}, status_code=503)
+
+        results = {}
+        for number in numbers:
+            tracking = carrier.track(number)
+            if tracking is not None:
+                results[number] = tracking
+        return {"results": results}
+
+    @app.get("/stats")
+    async def stats():
+        return {"latency": carrier.latency.spec, "error_rate": carrier.error_rate, **carrier.stats}
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Carrier tracking stub server for offline tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9200)
+    parser.add_argument("--latency", default="lognormal:150,0.5", help="Response latency distribution in ms")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument("--max-batch", type=int, default=50, help="Tracking numbers accepted per request")
+    parser.add_argument("--seed", type=int, help="Random seed for reproducible latency/error sequences")
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    carrier = FakeCarrier(LatencyModel(args.latency), args.error_rate, args.max_batch)
+    uvicorn.run(create_app(carrier), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+"""
+Local OpenAI-compatible stub server for offline load tests
+Serves /v1/chat/completions (plain and streaming) and /v1/embeddings with
+configurable latency, scripted tool calls and injected errors - no network, no cost
+
+Point the app at it:
+    OPENAI_BASE_URL=http://localhost:9100/v1 OPENAI_API_KEY=fake uvicorn application:app --port 8001
+
+Usage:
+    python scripts/fake_llm_server.py [--port 9100] [--latency lognormal:400,0.5]
+                                      [--token-ms 5] [--tool-script tools.json] [--error-rate 0.01]
+
+Latency specs (milliseconds, applied before the first byte of every completion):
+    constant:300 | uniform:100,500 | normal:300,80 | lognormal:400,0.5 (median, sigma)
+
+Tool script: JSON list of rules, first match wins, only applied when the tool is
+offered and the last message is from the user. "$0" / "$1".. are regex groups;
+"each": true emits one call per match (parallel tool calls).
+    [{"pattern": "ORD-?\\\\d+", "tool": "get_shipping_status", "arguments": {"order_id": "$0"}, "each": true}]
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import re
+import time
+import uuid
+from typing import Dict, List, Optional
+
+import numpy as np
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+EMBEDDING_DIM = 1536
+
+DEFAULT_TOOL_SCRIPT = [
+    {"pattern": r"\bORD-?\d+\b", "tool": "get_shipping_status", "arguments": {"order_id": "$0"}, "each": True},
+    {"pattern": r"\b(oil|dal|flour|jaggery|noodles|millet|rice)\b", "tool": "get_product_details", "arguments": {"name": "$0", "fields": ["variants"]}},
+    {"pattern": r"\b(recommend|suggest|best|compare)\b", "tool": "vector_search", "arguments": {"query": "$message"}},
+]
+
+
+class LatencyModel:
+    """Samples per-request latency (ms) from a distribution spec like "lognormal:400,0.5" """
+
+    def __init__(self, spec: str):
+        kind, _, params = spec.partition(":")
+        values = [float(v) for v in params.split(",") if v]
+        samplers = {
+            "constant": lambda: values[0],
+            "uniform": lambda: random.uniform(values[0], values[1]),
+            "normal": lambda: random.gauss(values[0], values[1]),
+            "lognormal": lambda: values[0] * random.lognormvariate(0, values[1]),
+        }
+        if kind not in samplers:
+            raise ValueError(f"Unknown latency distribution: {kind} (expected one of {', '.join(samplers)})")
+
+        self.spec = spec
+        self._sample = samplers[kind]
+
+    def sample(self) -> float:
+        return max(0.0, self._sample())
+
+
+class FakeLLM:
+    """Deterministic completions and embeddings plus request counters"""
+
+    def __init__(self, latency: LatencyModel, token_ms: float = 0.0, tool_script: Optional[List[dict]] = None,
+                 error_rate: float = 0.0, reply_words: int = 60):
+        self.latency = latency
+        self.token_ms = token_ms
+        self.tool_script = [dict(rule, regex=re.compile(rule["pattern"], re.IGNORECASE)) for rule in (tool_script or DEFAULT_TOOL_SCRIPT)]
+        self.error_rate = error_rate
+        self.reply_words = reply_words
+
+        self.stats: Dict[str, int] = {"completions": 0, "streams": 0, "tool_calls": 0, "embeddings": 0, "errors": 0}
+
+    def tool_calls(self, body: dict) -> List[dict]:
+        """Scripted tool calls for a request (empty when none apply)"""
+        messages = body.get("messages") or []
+        offered = {tool["function"]["name"] for tool in body.get("tools") or []}
+        if not offered or not messages or messages[-1].get("role") != "user":
+            return []
+
+        message = messages[-1].get("content") or ""
+        for rule in self.tool_script:
+            if rule["tool"] not in offered:
+                continue
+            matches = list(rule["regex"].finditer(message))
+            if not matches:
+                continue
+
+            calls = []
+            for match in matches if rule.get("each") else matches[:1]:
+                arguments = {key: self._substitute(value, match, message) for key, value in rule.get("arguments", {}).items()}
+                calls.append({
+                    "id": f"call_{uuid.uuid4().hex[:24]}",
+                    "type": "function",
+                    "function": {"name": rule["tool"], "arguments": json.dumps(arguments)},
+                })
+            return calls
+        return []
+
+    @staticmethod
+    def _substitute(value, match: re.Match, message: str):
+        if not isinstance(value, str):
+            return value
+        if value == "$message":
+            return message
+        return re.sub(r"\$(\d)", lambda m: match.group(int(m.group(1))) or "", value)
+
+    def reply(self, body: dict) -> str:
+        """Canned reply that mentions the question, so answers differ per conversation"""
+        messages = body.get("messages") or []
+        question = next((m.get("content") or "" for m in reversed(messages) if m.get("role") == "user"), "")
+        tool_results = sum(1 for m in messages[-8:] if m.get("role") == "tool")
+        words = (f"Here is what I found about {question}." + (f" ({tool_results} tool results)" if tool_results else "")).split()
+        filler = ["Nutraley", "products", "are", "natural", "and", "wholesome."]
+        while len(words) < self.reply_words:
+            words.extend(filler)
+        return " ".join(words[: max(self.reply_words, 1)])
+
+    @staticmethod
+    def usage(body: dict, completion: str) -> dict:
+        prompt_chars = len(json.dumps(body.get("messages") or [])) + len(json.dumps(body.get("tools") or []))
+        prompt_tokens = prompt_chars // 4
+        completion_tokens = max(1, len(completion) // 4)
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "prompt_tokens_details": {"cached_tokens": 0},
+        }
+
+    @staticmethod
+    def embed(text: str) -> List[float]:
+        """Deterministic unit vector from word hashes (similar texts share dimensions)"""
+        vector = np.zeros(EMBEDDING_DIM, dtype="float32")
+        for word in re.findall(r"[a-z0-9]+", text.lower()):
+            vector[int(hashlib.md5(word.encode()).hexdigest(), 16) % EMBEDDING_DIM] += 1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+
+def create_app(llm: FakeLLM) -> FastAPI:
+    app = FastAPI(title="Fake OpenAI API")
+
+    def maybe_error() -> Optional[JSONResponse]:
+        if llm.error_rate and random.random() < llm.error_rate:
+            llm.stats["errors"] += 1
+            status = random.choice([429, 500, 503])
+            return JSONResponse(status_code=status, content={"error": {"message": f"Injected error {status}", "type": "fake_error"}})
+        return None
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        await asyncio.sleep(llm.latency.sample() / 1000)
+
+        error = maybe_error()
+        if error:
+            return error
+
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+        model = body.get("model", "gpt-4o")
+        tool_calls = llm.tool_calls(body)
+        content = None if tool_calls else llm.reply(body)
+
+        llm.stats["completions"] += 1
+        llm.stats["tool_calls"] += len(tool_calls)
+
+        if not body.get("stream"):
+            message = {"role": "assistant", "content": content}
+            if tool_calls:
+                message["tool_calls"] = tool_calls
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "message": message, "finish_reason": "tool_calls" if tool_calls else "stop"}],
+                "usage": llm.usage(body, content or json.dumps(tool_calls)),
+            }
+
+        llm.stats["streams"] += 1
+
+        async def events():
+            def chunk(delta: dict, finish_reason: Optional[str] = None) -> str:
+                payload = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+                }
+                return f"data: {json.dumps(payload)}\n\n"
+
+            yield chunk({"role": "assistant", "content": "" if content is not None else None})
+            if tool_calls:
+                for i, call in enumerate(tool_calls):
+                    yield chunk({"tool_calls": [dict(call, index=i)]})
+                yield chunk({}, "tool_calls")
+            else:
+                for word in content.split(" "):
+                    if llm.token_ms:
+                        await asyncio.sleep(llm.token_ms / 1000)
+                    yield chunk({"content": word + " "})
+                yield chunk({}, "stop")
+            if (body.get("stream_options") or {}).get("include_usage"):
+                payload = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [],
+                    "usage": llm.usage(body, content or json.dumps(tool_calls)),
+                }
+                yield f"data: {json.dumps(payload)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.post("/v1/embeddings")
+    async def embeddings(request: Request):
+        body = await request.json()
+        error = maybe_error()
+        if error:
+            return error
+
+        texts = body["input"] if isinstance(body["input"], list) else [body["input"]]
+        llm.stats["embeddings"] += len(texts)
+        return {
+            "object": "list",
+            "model": body.get("model", "text-embedding-3-small"),
+            "data": [{"object": "embedding", "index": i, "embedding": llm.embed(text)} for i, text in enumerate(texts)],
+            "usage": {"prompt_tokens": sum(len(t) // 4 for t in texts), "total_tokens": sum(len(t) // 4 for t in texts)},
+        }
+
+    @app.get("/stats")
+    async def stats():
+        return {"latency": llm.latency.spec, "token_ms": llm.token_ms, "error_rate": llm.error_rate, **llm.stats}
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI-compatible stub server for offline load tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency", default="lognormal:400,0.5", help="Time-to-first-byte distribution in ms")
+    parser.add_argument("--token-ms", type=float, default=0.0, help="Delay between streamed tokens in ms")
+    parser.add_argument("--tool-script", help="JSON file with tool-call rules (see module docstring)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 429/500/503")
+    parser.add_argument("--reply-words", type=int, default=60, help="Words per canned reply")
+    parser.add_argument("--seed", type=int, help="Random seed for reproducible latency/error sequences")
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    tool_script = None
+    if args.tool_script:
+        with open(args.tool_script, 'r') as f:
+            tool_script = json.load(f)
+
+    llm = FakeLLM(LatencyModel(args.latency), args.token_ms, tool_script, args.error_rate, args.reply_words)
+    uvicorn.run(create_app(llm), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Measure prompt-token savings of relevance-pruned catalog injection
+Compares the full-menu system prompt with the pruned one for a set of sample questions
+
+Only tokens are measured. End-to-end latency against scripts/fake_llm_server.py
+doesn't change with pruning (the fake doesn't model prefill time), so upstream
+latency savings need a run against the real API.
+
+Usage:
+    python scripts/measure_catalog_pruning.py [--questions questions.txt]
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.catalog import Catalog
+from core.catalog_selector import CatalogSelector
+from core.tokens import count_tokens, is_exact, tokenizer_name
+from prompts.system_prompt_no_vector import SYSTEM_PROMPT_NO_VECTOR
+
+SAMPLE_QUESTIONS = [
+    "What oils do you have?",
+    "I need something heart-healthy",
+    "Best oil for deep frying?",
+    "Show me gluten-free options",
+    "Tell me about ragi flour",
+    "Do you have Nallennai?",
+    "How much is the peanut oil?",
+    "Compare toor dal and moong dal",
+    "Any jaggery?",
+    "Millet noodles for kids",
+    "Something sweet for breakfast",
+    "What do you sell?",
+]
+
+HEADER = "\n\n" + "="*80 + "\nPRODUCT CATALOG:\n" + "="*80 + "\n\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--products", default="data/products.json")
+    parser.add_argument("--questions", help="Text file with one question per line")
+    parser.add_argument("--model", default="gpt-4o")
+    args = parser.parse_args()
+
+    with open(args.products, 'r') as f:
+        products = json.load(f)
+
+    questions = SAMPLE_QUESTIONS
+    if args.questions:
+        with open(args.questions, 'r') as f:
+            questions = [line.strip() for line in f if line.strip()]
+
+    selector = CatalogSelector(Catalog(products))
+    full_tokens = count_tokens(SYSTEM_PROMPT_NO_VECTOR + HEADER + selector.section(None), args.model)
+
+    print(f"Tokenizer: {tokenizer_name(args.model)}")
+    if not is_exact(args.model):
+        print("⚠️ ESTIMATE: tiktoken encoding unavailable, token counts are chars/token approximations")
+    print(f"Full-menu system prompt: {full_tokens} tokens ({len(products)} products)\n")
+    print(f"{'question':<36} {'products':>8} {'tokens':>7} {'saved':>7} {'select_us':>9}")
+
+    total_tokens = 0
+    total_select_us = 0.0
+    for question in questions:
+        started = time.perf_counter()
+        section = selector.render(question)
+        select_us = (time.perf_counter() - started) * 1_000_000
+        selected = selector.select(question)
+
+        tokens = count_tokens(SYSTEM_PROMPT_NO_VECTOR + HEADER + section, args.model)
+        total_tokens += tokens
+        total_select_us += select_us
+
+        count = len(products) if selected is None else len(selected)
+        print(f"{question[:36]:<36} {count:>8} {tokens:>7} {1 - tokens / full_tokens:>6.0%} {select_us:>9.0f}")
+
+    avg_tokens = total_tokens / len(questions)
+    print(f"\nAverage system prompt: {avg_tokens:.0f} tokens vs {full_tokens} full ({1 - avg_tokens / full_tokens:.0%} fewer prompt tokens)")
+    print(f"Average selection cost: {total_select_us / len(questions):.0f} us per turn")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Replay load test for the chat server
+Fires recorded conversations at a running server with configurable concurrency
+and reports throughput, latency percentiles and error rates per endpoint
+
+Run the server against the fake LLM to keep it offline and free:
+    python scripts/fake_llm_server.py --port 9100 --latency lognormal:400,0.5 &
+    OPENAI_BASE_URL=http://localhost:9100/v1 OPENAI_API_KEY=fake uvicorn application:app --port 8001 &
+    python scripts/replay_load_test.py --concurrency 50 --iterations 20
+
+Usage:
+    python scripts/replay_load_test.py [--url http://localhost:8001] [--conversations benchmarks/conversations.jsonl]
+                                       [--concurrency 20] [--iterations 10 | --duration 60] [--json]
+
+Conversations file: one JSON object per line, {"name": ..., "messages": [...]}.
+A message is either a chat message string (POST /chat on the conversation's
+session) or a request object {"method": "GET", "path": "/health"}.
+Conversations replay their messages in order; each replay uses a fresh session.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import sys
+import time
+import uuid
+from collections import defaultdict
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ab_harness import percentile
+
+DEFAULT_CONVERSATIONS = Path(__file__).resolve().parent.parent / "benchmarks" / "conversations.jsonl"
+
+
+def load_conversations(path: Path) -> list:
+    with open(path, 'r') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class EndpointStats:
+    """Latencies and outcomes for one endpoint"""
+
+    def __init__(self):
+        self.latencies = []
+        self.errors = defaultdict(int)
+
+    def record(self, latency_ms: float, error: str = None):
+        self.latencies.append(latency_ms)
+        if error:
+            self.errors[error] += 1
+
+    def summary(self, elapsed: float) -> dict:
+        requests = len(self.latencies)
+        failed = sum(self.errors.values())
+        return {
+            "requests": requests,
+            "throughput_rps": round(requests / elapsed, 2) if elapsed else None,
+            "error_rate": round(failed / requests, 4) if requests else None,
+            "errors": dict(self.errors),
+            "latency_ms_p50": round(percentile(self.latencies, 0.50), 1) if requests else None,
+            "latency_ms_p95": round(percentile(self.latencies, 0.95), 1) if requests else None,
+            "latency_ms_p99": round(percentile(self.latencies, 0.99), 1) if requests else None,
+            "latency_ms_max": round(max(self.latencies), 1) if requests else None,
+        }
+
+
+async def replay(client: httpx.AsyncClient, conversation: dict, stats: dict):
+    """Replay one conversation on a fresh session"""
+    session_id = f"replay-{uuid.uuid4().hex[:12]}"
+
+    for step in conversation["messages"]:
+        if isinstance(step, str):
+            method, path, body = "POST", "/chat", {"message": step, "session_id": session_id}
+        else:
+            method, path, body = step.get("method", "POST"), step["path"], step.get("json")
+
+        endpoint = f"{method} {path}"
+        started = time.perf_counter()
+        error = None
+        try:
+            response = await client.request(method, path, json=body)
+            if response.status_code >= 400:
+                error = f"HTTP {response.status_code}"
+        except httpx.HTTPError as e:
+            error = type(e).__name__
+        stats[endpoint].record((time.perf_counter() - started) * 1000, error)
+
+        # Later turns depend on earlier ones; stop the conversation on a failed chat turn
+        if error and endpoint == "POST /chat":
+            return
+
+
+async def run(url: str, conversations: list, concurrency: int, iterations: int, duration: float, timeout: float) -> dict:
+    stats = defaultdict(EndpointStats)
+    queue: asyncio.Queue = asyncio.Queue()
+    for _ in range(iterations):
+        for conversation in conversations:
+            queue.put_nowait(conversation)
+
+    deadline = time.perf_counter() + duration if duration else None
+    # Duration mode cycles through the conversation set until time is up
+    cycle = itertools.cycle(conversations)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=url, timeout=timeout, limits=limits) as client:
+        async def worker():
+            while True:
+                if deadline:
+                    if time.perf_counter() >= deadline:
+                        return
+                    conversation = next(cycle)
+                else:
+                    try:
+                        conversation = queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        return
+                await replay(client, conversation, stats)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    overall = EndpointStats()
+    for endpoint_stats in stats.values():
+        overall.latencies.extend(endpoint_stats.latencies)
+        for error, count in endpoint_stats.errors.items():
+            overall.errors[error] += count
+
+    return {
+        "url": url,
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed, 2),
+        "endpoints": {endpoint: s.summary(elapsed) for endpoint, s in sorted(stats.items())},
+        "total": overall.summary(elapsed),
+    }
+
+
+def print_report(report: dict):
+    print(f"Replay against {report['url']} - concurrency {report['concurrency']}, {report['elapsed_s']}s\n")
+    columns = ["requests", "throughput_rps", "error_rate", "latency_ms_p50", "latency_ms_p95", "latency_ms_p99", "latency_ms_max"]
+    labels = ["reqs", "req/s", "err_rate", "p50_ms", "p95_ms", "p99_ms", "max_ms"]
+    print(f"{'endpoint':<24}" + "".join(f"{label:>10}" for label in labels))
+    for endpoint, summary in list(report["endpoints"].items()) + [("TOTAL", report["total"])]:
+        print(f"{endpoint:<24}" + "".join(f"{str(summary[key]):>10}" for key in columns))
+        if summary["errors"]:
+            print(f"{'':<24}errors: {summary['errors']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded conversations against the chat server")
+    parser.add_argument("--url", default="http://localhost:8001", help="Base URL of the server under test")
+    parser.add_argument("--conversations", default=str(DEFAULT_CONVERSATIONS), help="JSONL file of conversations")
+    parser.add_argument("--concurrency", type=int, default=20, help="Conversations in flight at once")
+    parser.add_argument("--iterations", type=int, default=10, help="Times to replay the whole conversation set")
+    parser.add_argument("--duration", type=float, help="Run for this many seconds instead of a fixed number of iterations")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout in seconds")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    conversations = load_conversations(Path(args.conversations))
+    report = asyncio.run(run(args.url, conversations, args.concurrency, args.iterations, args.duration, args.timeout))
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+    # Non-zero exit when anything failed, for CI smoke runs
+    sys.exit(1 if report["total"]["error_rate"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Shared test setup
+Puts the repo root and scripts/ (the offline stub servers) on the import path
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "scripts"))
+
+# Importing application-level modules must never need real credentials
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ["ADMIN_TOKEN"] = "test-admin"
+os.environ["CATALOG_WATCH_INTERVAL"] = "0"
+
+ADMIN_HEADERS = {"X-Admin-Token": "test-admin"}
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    """
+    The application, talking to scripts/fake_llm_server.py in-process
+
+    Returns the FakeLLM; set its `latency` to keep requests in flight.
+    """
+    import application
+    from openai import AsyncOpenAI
+    from fake_llm_server import FakeLLM, LatencyModel, create_app
+
+    llm = FakeLLM(LatencyModel("constant:0"))
+    http_client = httpx.AsyncClient(transport=httpx.ASGITransport(app=create_app(llm)), base_url="http://fake-llm/v1")
+    monkeypatch.setattr(application, "client", AsyncOpenAI(api_key="test", base_url="http://fake-llm/v1", http_client=http_client))
+    return llm
+
+
+def app_client():
+    """Async client for the application, served in-process"""
+    import application
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=application.app), base_url="http://test")
@@ -0,0 +1,15 @@
+"""Runs the cassette-replay benchmark gate (scripts/benchmark_chat.py) against benchmarks/baseline.json"""
+
+import subprocess
+import sys
+
+from conftest import ROOT
+
+
+def test_chat_pipeline_within_baseline_thresholds():
+    # Its own process: the benchmark pins caches and retrieval mode before importing the app
+    result = subprocess.run(
+        [sys.executable, str(ROOT / "scripts" / "benchmark_chat.py"), "--attempts", "3"],
+        cwd=ROOT, capture_output=True, text=True, timeout=600,
+    )
+    assert result.returncode == 0, result.stderr[-2000:] + result.stdout[-2000:]
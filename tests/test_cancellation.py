@@ -0,0 +1,58 @@
+"""Tests for cancelling work when the HTTP client disconnects"""
+
+import asyncio
+
+import pytest
+
+from core.cancellation import CancellationStats, ClientDisconnected, cancel_on_disconnect
+
+
+class FakeRequest:
+    """Just enough of a Request: receive() reports a disconnect after `disconnect_after` seconds"""
+
+    def __init__(self, disconnect_after: float = None):
+        self.disconnect_after = disconnect_after
+
+    async def receive(self):
+        if self.disconnect_after is None:
+            await asyncio.Event().wait()
+        await asyncio.sleep(self.disconnect_after)
+        return {"type": "http.disconnect"}
+
+
+def test_result_is_returned_while_connected():
+    stats = CancellationStats()
+    result = asyncio.run(cancel_on_disconnect(FakeRequest(), asyncio.sleep(0.01, result="answer"), stats))
+    assert result == "answer"
+    assert stats.http_disconnects == 0
+
+
+def test_disconnect_cancels_the_work():
+    stats = CancellationStats()
+
+    async def scenario():
+        cancelled = asyncio.Event()
+
+        async def work():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        with pytest.raises(ClientDisconnected):
+            await cancel_on_disconnect(FakeRequest(disconnect_after=0.01), work(), stats)
+        return cancelled.is_set()
+
+    assert asyncio.run(scenario())
+    assert stats.http_disconnects == 1
+
+
+def test_work_errors_propagate():
+    stats = CancellationStats()
+
+    async def fail():
+        raise ValueError("bad")
+
+    with pytest.raises(ValueError):
+        asyncio.run(cancel_on_disconnect(FakeRequest(), fail(), stats))
@@ -0,0 +1,185 @@
+"""Tests for CarrierTracker batching, caching, coalescing and failure handling"""
+
+import asyncio
+from typing import Dict, List
+
+import httpx
+import pytest
+
+from core.carrier import CarrierAdapter, CarrierTracker, HttpCarrierAdapter
+from fake_carrier_server import FakeCarrier, create_app
+from fake_llm_server import LatencyModel
+
+
+class StubAdapter(CarrierAdapter):
+    """Answers every number after `delay` seconds, recording each call"""
+
+    name = "stub"
+
+    def __init__(self, delay: float = 0.0, max_batch: int = 50, response=None, error: Exception = None):
+        self.delay = delay
+        self.max_batch = max_batch
+        self.response = response
+        self.error = error
+        self.calls: List[List[str]] = []
+
+    async def fetch(self, tracking_numbers: List[str]) -> Dict[str, dict]:
+        self.calls.append(list(tracking_numbers))
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        if self.response is not None:
+            return self.response
+        return {number: {"status": "In Transit", "events": []} for number in tracking_numbers}
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_concurrent_lookups_share_one_batch():
+    adapter = StubAdapter()
+    tracker = CarrierTracker(adapter, batch_wait=0.01)
+
+    async def scenario():
+        return await asyncio.gather(tracker.track(["A", "B"]), tracker.track(["C"]), tracker.track(["B"]))
+
+    first, second, third = run(scenario())
+    assert set(first) == {"A", "B"} and set(second) == {"C"} and set(third) == {"B"}
+    assert len(adapter.calls) == 1
+    assert sorted(adapter.calls[0]) == ["A", "B", "C"]
+
+
+def test_batches_are_split_at_max_batch():
+    adapter = StubAdapter(max_batch=2)
+    tracker = CarrierTracker(adapter)
+
+    results = run(tracker.track(["A", "B", "C", "D", "E"]))
+    assert all(results[number] is not None for number in "ABCDE")
+    assert all(len(call) <= 2 for call in adapter.calls)
+    assert sorted(number for call in adapter.calls for number in call) == list("ABCDE")
+
+
+def test_fresh_results_are_served_from_cache():
+    adapter = StubAdapter()
+    tracker = CarrierTracker(adapter, cache_ttl=60)
+
+    async def scenario():
+        await tracker.track(["A"])
+        return await tracker.track(["A"])
+
+    results = run(scenario())
+    assert results["A"]["status"] == "In Transit"
+    assert len(adapter.calls) == 1
+    assert tracker.cache_hits == 1
+
+
+def test_number_in_flight_is_not_fetched_twice():
+    adapter = StubAdapter(delay=0.05)
+    tracker = CarrierTracker(adapter, batch_wait=0.001)
+
+    async def scenario():
+        first = asyncio.ensure_future(tracker.track(["A"]))
+        await asyncio.sleep(0.02)  # first batch is in flight by now
+        second = await tracker.track(["A"])
+        return await first, second
+
+    first, second = run(scenario())
+    assert first["A"] == second["A"]
+    assert len(adapter.calls) == 1
+
+
+def test_timeout_serves_stale_result_and_late_answer_fills_cache():
+    adapter = StubAdapter()
+    tracker = CarrierTracker(adapter, cache_ttl=0, timeout=0.05)
+
+    async def scenario():
+        await tracker.track(["A"])
+        adapter.delay = 0.2
+        stale = await tracker.track(["A"])
+        await asyncio.sleep(0.25)
+        return stale
+
+    stale = run(scenario())
+    assert stale["A"]["stale"] is True
+    assert tracker.timeouts == 1 and tracker.stale_served == 1
+    assert not tracker._in_flight
+
+
+@pytest.mark.parametrize("response", [["not", "a", "dict"], "oops", None])
+def test_malformed_response_resolves_every_waiter(response):
+    adapter = StubAdapter(response=response) if response is not None else StubAdapter(error=ValueError("bad json"))
+    tracker = CarrierTracker(adapter, timeout=1.0)
+
+    async def scenario():
+        results = await asyncio.wait_for(tracker.track(["A", "B"]), timeout=0.5)
+        # Nothing left pending, so the next lookup fetches again instead of hanging
+        adapter.response, adapter.error = None, None
+        return results, await asyncio.wait_for(tracker.track(["A"]), timeout=0.5)
+
+    failed, retried = run(scenario())
+    assert failed == {"A": None, "B": None}
+    assert tracker.errors == 1 and not tracker._in_flight
+    assert retried["A"]["status"] == "In Transit"
+
+
+def test_malformed_entries_count_as_unknown():
+    adapter = StubAdapter(response={"A": "garbage", "B": {"status": "Delivered", "events": []}})
+    tracker = CarrierTracker(adapter)
+
+    results = run(tracker.track(["A", "B"]))
+    assert results["A"] is None
+    assert results["B"]["status"] == "Delivered"
+
+
+def test_close_cancels_running_fetches():
+    adapter = StubAdapter(delay=10)
+    tracker = CarrierTracker(adapter, timeout=0.01, batch_wait=0.001)
+
+    async def scenario():
+        await tracker.track(["A"])
+        assert tracker._tasks
+        await tracker.close()
+
+    run(scenario())
+    assert not tracker._tasks and not tracker._in_flight
+
+
+def test_http_adapter_against_stub_carrier():
+    carrier = FakeCarrier(LatencyModel("constant:0"), max_batch=3)
+    transport = httpx.ASGITransport(app=create_app(carrier))
+    tracker = CarrierTracker(HttpCarrierAdapter("http://carrier", max_batch=3, transport=transport), timeout=2.0)
+
+    async def scenario():
+        try:
+            return await tracker.track(["1Z001", "1Z002", "1Z003", "1Z004", "1Z010"])
+        finally:
+            await tracker.close()
+
+    results = run(scenario())
+    assert results["1Z010"] is None  # numbers ending in "0" are unknown to the stub
+    assert all(results[number]["events"] for number in ["1Z001", "1Z002", "1Z003", "1Z004"])
+    assert carrier.stats["requests"] == 2 and carrier.stats["numbers"] == 5
+
+
+def test_http_adapter_error_status_is_a_failure():
+    carrier = FakeCarrier(LatencyModel("constant:0"), error_rate=1.0)
+    transport = httpx.ASGITransport(app=create_app(carrier))
+    tracker = CarrierTracker(HttpCarrierAdapter("http://carrier", transport=transport), timeout=2.0)
+
+    async def scenario():
+        try:
+            return await tracker.track(["1Z001"])
+        finally:
+            await tracker.close()
+
+    assert run(scenario()) == {"1Z001": None}
+    assert tracker.errors == 1
+
+
+def test_adapter_must_implement_fetch():
+    class Incomplete(CarrierAdapter):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
@@ -0,0 +1,165 @@
+"""Tests for the compiled catalog, its validation and atomic hot reload"""
+
+import asyncio
+import copy
+import json
+
+import pytest
+
+import core.catalog as catalog_module
+from conftest import ADMIN_HEADERS, app_client
+from core.catalog import Catalog, CatalogError, get_catalog, normalize_name, reload_catalog, validate_products
+
+SAMPLE_PRODUCTS = [
+    {
+        "name": "Cold Pressed Sesame Oil", "category": "Cold-Pressed Oils", "alternative_names": ["Nallennai"],
+        "variants": [{"size": "1L", "price": 12.25}, {"size": "5L", "price": 49.99}],
+    },
+    {
+        "name": "Toor Dal", "category": "Dals", "subcategory": "Lentils",
+        "variants": [{"price": 4.5, "size": "1kg"}],
+    },
+]
+
+
+def test_indexes_are_normalized():
+    catalog = Catalog(SAMPLE_PRODUCTS)
+    assert normalize_name("Little Millet Rice (Samai Arisi)") == "little millet rice samai arisi"
+    assert catalog.by_name["nallennai"] == [0]
+    assert catalog.by_name["cold pressed sesame oil"] == [0]
+    assert catalog.by_category["lentils"] == catalog.by_category["dals"] == [1]
+    assert list(catalog.categories) == ["Cold-Pressed Oils", "Dals"]
+    assert catalog.price_ranges == [(12.25, 49.99), (4.5, 4.5)]
+
+
+def test_version_tracks_content_not_key_order():
+    version = Catalog(SAMPLE_PRODUCTS).version
+    reordered = [dict(reversed(list(p.items()))) for p in SAMPLE_PRODUCTS]
+    assert Catalog(reordered).version == version
+
+    changed = json.loads(json.dumps(SAMPLE_PRODUCTS))
+    changed[1]["variants"][0]["price"] = 4.75
+    assert Catalog(changed).version != version
+
+
+def test_rendering_uses_canonical_key_order():
+    reordered = [dict(reversed(list(p.items()))) for p in SAMPLE_PRODUCTS]
+    catalog, catalog_reordered = Catalog(SAMPLE_PRODUCTS), Catalog(reordered)
+    assert catalog_reordered.full_json == catalog.full_json
+    assert catalog_reordered.product_json == catalog.product_json
+    assert list(json.loads(catalog.product_json[1])) == ["name", "category", "subcategory", "variants"]
+    assert list(json.loads(catalog.product_json[1])["variants"][0]) == ["size", "price"]
+
+
+def test_compact_text_and_index():
+    catalog = Catalog(SAMPLE_PRODUCTS)
+    assert catalog.compact_text[0] == "Cold Pressed Sesame Oil (aka Nallennai) [Cold-Pressed Oils] - 1L $12.25, 5L $49.99"
+    assert catalog.index_text == "- Cold-Pressed Oils: Cold Pressed Sesame Oil\n- Dals: Toor Dal (Lentils)"
+
+
+@pytest.fixture
+def products():
+    return copy.deepcopy(get_catalog().products)
+
+
+@pytest.fixture
+def catalog_file(tmp_path, monkeypatch):
+    """Write a products list to a temp file; live catalog state is restored afterwards"""
+    import application
+    import tools.vector_search as vector_search
+
+    monkeypatch.setattr(catalog_module, "_catalog", get_catalog())
+    monkeypatch.setattr(application, "prompt_state", application.prompt_state)
+    monkeypatch.setattr(vector_search, "_vector_search_instance", None)
+    monkeypatch.setattr(vector_search, "_disk_index_stale", False)
+
+    path = tmp_path / "products.json"
+
+    def write(payload) -> str:
+        path.write_text(payload if isinstance(payload, str) else json.dumps(payload))
+        return path
+
+    return write
+
+
+@pytest.mark.parametrize("field, value", [
+    ("alternative_names", ["ok", 3]),
+    ("key_features", "not a list"),
+    ("description", ["not", "a", "string"]),
+    ("ingredients", {"oil": 1}),
+    ("name", ""),
+])
+def test_validation_rejects_wrong_field_types(products, field, value):
+    products[0][field] = value
+    with pytest.raises(CatalogError, match=field):
+        validate_products(products)
+
+
+def test_validation_rejects_bad_prices(products):
+    products[0]["variants"][0]["price"] = -1
+    with pytest.raises(CatalogError, match="invalid price"):
+        validate_products(products)
+
+
+def test_unreadable_files_raise_catalog_error(tmp_path):
+    with pytest.raises(CatalogError, match="could not be read"):
+        Catalog.load(tmp_path / "missing.json")
+    (tmp_path / "broken.json").write_text("[{")
+    with pytest.raises(CatalogError, match="not valid JSON"):
+        Catalog.load(tmp_path / "broken.json")
+
+
+def test_unchanged_catalog_is_not_swapped(products, catalog_file):
+    current = get_catalog()
+    catalog, changed = reload_catalog(catalog_file(products))
+    assert catalog is current and not changed
+
+
+def test_reload_swaps_catalog_and_derived_state(products, catalog_file):
+    import application
+    import tools.vector_search as vector_search
+
+    stale_index = object()
+    vector_search._vector_search_instance = stale_index
+    products[0]["variants"][0]["price"] += 1
+
+    catalog, changed = reload_catalog(catalog_file(products))
+    assert changed and get_catalog() is catalog
+    assert application.prompt_state.catalog_version == catalog.version
+    # The pre-generated index describes the old catalog: dropped, and never loaded again
+    assert vector_search._vector_search_instance is None and vector_search._disk_index_stale
+
+
+def test_failing_listener_leaves_everything_in_place(products, catalog_file, monkeypatch):
+    import application
+
+    current, state = get_catalog(), application.prompt_state
+    swapped = []
+
+    def broken(catalog):
+        raise RuntimeError("index build failed")
+
+    monkeypatch.setattr(catalog_module, "_listeners", [lambda catalog: lambda: swapped.append(catalog)] + catalog_module._listeners + [broken])
+    products[0]["variants"][0]["price"] += 1
+
+    with pytest.raises(CatalogError, match="index build failed"):
+        reload_catalog(catalog_file(products))
+    assert get_catalog() is current
+    assert application.prompt_state is state
+    assert swapped == []
+
+
+def test_reload_endpoint_rejects_invalid_catalog(catalog_file, monkeypatch):
+    import application
+
+    monkeypatch.setattr(catalog_module, "PRODUCTS_PATH", catalog_file([{"name": "Oil"}]))
+    version = application.prompt_state.catalog_version
+
+    async def scenario():
+        async with app_client() as client:
+            return await client.post("/admin/reload-catalog", headers=ADMIN_HEADERS)
+
+    response = asyncio.run(scenario())
+    assert response.status_code == 422
+    assert "Invalid catalog" in response.json()["detail"]
+    assert application.prompt_state.catalog_version == version
@@ -0,0 +1,60 @@
+"""Tests for relevance-pruned catalog injection"""
+
+import pytest
+
+from core.catalog import get_catalog
+from core.catalog_selector import CatalogSelector
+
+
+@pytest.fixture(scope="module")
+def selector():
+    return CatalogSelector(get_catalog())
+
+
+def names(selector, selected):
+    return None if selected is None else {selector.products[i]["name"] for i in selected}
+
+
+@pytest.mark.parametrize("message, expected", [
+    ("How much is the peanut oil?", {"Cold Pressed Peanut Oil"}),
+    ("Do you have Nallennai?", {"Cold Pressed Sesame Oil"}),
+    ("Any jaggery?", {"Raw Cane Jaggery", "Palmyra Palm Jaggery"}),
+])
+def test_named_products_are_selected(selector, message, expected):
+    assert names(selector, selector.select(message)) == expected
+
+
+@pytest.mark.parametrize("message", ["What do you sell?", "Show me everything", "xyzzy"])
+def test_catalog_wide_or_unmatched_questions_get_everything(selector, message):
+    assert selector.select(message) is None
+
+
+def test_generic_name_terms_do_not_name_products(selector):
+    assert "millet" in selector.generic_terms
+    # "millet" alone names most of the catalog: no pruning
+    assert selector.select("millet") is None
+    # ...and alongside a specific term it doesn't pull in every other millet product
+    selected = names(selector, selector.select("millet noodles"))
+    assert selected and all("Noodles" in name for name in selected)
+
+
+def test_follow_ups_keep_the_products_in_context(selector):
+    assert names(selector, selector.select("how much is it?", last_reply="Our Cold Pressed Peanut Oil costs $12")) == {"Cold Pressed Peanut Oil"}
+    assert names(selector, selector.select("and the bigger size?", previous_user_messages=["Any jaggery?"])) == {"Raw Cane Jaggery", "Palmyra Palm Jaggery"}
+
+
+def test_sections_share_the_index_prefix(selector):
+    pruned = selector.section(selector.select("Any jaggery?"))
+    full = selector.section(None)
+    assert pruned.startswith(selector.index_section) and full.startswith(selector.index_section)
+    assert "Jaggery" in pruned and "Peanut Oil" not in pruned[len(selector.index_section):]
+    assert len(pruned) < len(full)
+
+
+def test_render_records_what_was_injected():
+    selector = CatalogSelector(get_catalog())
+    selector.render("Any jaggery?")
+    selector.render("What do you sell?")
+    stats = selector.snapshot()
+    assert stats["selections"] == 2 and stats["full_expansions"] == 1
+    assert stats["avg_products"] == (2 + len(selector.products)) / 2
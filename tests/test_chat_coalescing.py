@@ -0,0 +1,35 @@
+"""Tests for single-flight coalescing of identical first-turn /chat requests"""
+
+import asyncio
+import uuid
+
+from conftest import app_client
+from fake_llm_server import LatencyModel
+
+
+def test_followers_keep_their_own_wording_and_private_tool_messages(fake_llm):
+    import application
+
+    fake_llm.latency = LatencyModel("constant:50")
+    leader, follower = f"lead-{uuid.uuid4().hex}", f"follow-{uuid.uuid4().hex}"
+
+    async def scenario():
+        async with app_client() as client:
+            responses = await asyncio.gather(
+                client.post("/chat", json={"message": "Do you have sesame oil?", "session_id": leader}),
+                client.post("/chat", json={"message": "do you have sesame oil", "session_id": follower}),
+            )
+        return responses, await application.sessions.get(leader), await application.sessions.get(follower)
+
+    responses, leader_history, follower_history = asyncio.run(scenario())
+
+    assert [r.status_code for r in responses] == [200, 200]
+    assert responses[0].json()["response"] == responses[1].json()["response"]
+    # One upstream turn (tool call + final answer) for both
+    assert fake_llm.stats["completions"] == 2
+
+    assert leader_history[0]["content"] == "Do you have sesame oil?"
+    assert follower_history[0]["content"] == "do you have sesame oil"
+    assert leader_history[1:] == follower_history[1:]
+    assert leader_history[1]["tool_calls"] is not follower_history[1]["tool_calls"]
+    assert leader_history[1]["tool_calls"][0] is not follower_history[1]["tool_calls"][0]
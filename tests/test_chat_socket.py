@@ -0,0 +1,113 @@
+"""Tests for the /ws/chat WebSocket and its per-connection send channel"""
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from core.chat_socket import SlowConsumerError, SocketChannel, SocketStats
+from fake_llm_server import LatencyModel
+
+
+@pytest.fixture
+def socket_client(fake_llm):
+    import application
+    with TestClient(application.app) as client:
+        yield client
+
+
+def receive_until(ws, frame_type: str) -> list:
+    frames = [ws.receive_json()]
+    while frames[-1]["type"] != frame_type:
+        frames.append(ws.receive_json())
+    return frames
+
+
+def test_answers_stream_as_deltas(socket_client):
+    with socket_client.websocket_connect("/ws/chat?session_id=ws-stream") as ws:
+        assert ws.receive_json() == {"type": "session", "session_id": "ws-stream"}
+        ws.send_json({"message": "Which oil is best for deep frying?", "id": "m1"})
+        frames = receive_until(ws, "done")
+
+    assert frames[0] == {"type": "start", "id": "m1"}
+    deltas = [f["content"] for f in frames if f["type"] == "delta"]
+    assert deltas and all(f["id"] == "m1" for f in frames)
+    assert "".join(deltas) == frames[-1]["response"]
+
+
+def test_bad_frames_are_answered_with_errors(socket_client):
+    with socket_client.websocket_connect("/ws/chat") as ws:
+        ws.receive_json()
+        ws.send_text("not json")
+        assert ws.receive_json() == {"type": "error", "status": 400, "detail": "Expected a JSON object"}
+        ws.send_json({"id": "m1"})
+        error = ws.receive_json()
+        assert (error["type"], error["id"], error["status"]) == ("error", "m1", 422)
+
+
+def test_cancel_stops_the_answer_in_progress(socket_client, fake_llm):
+    import application
+
+    fake_llm.latency = LatencyModel("constant:5000")
+    cancels = application.cancellations.client_cancels
+    with socket_client.websocket_connect("/ws/chat") as ws:
+        ws.receive_json()
+        ws.send_json({"message": "Which oil is best for deep frying?", "id": "slow"})
+        assert ws.receive_json() == {"type": "start", "id": "slow"}
+        ws.send_json({"type": "cancel"})
+        assert ws.receive_json() == {"type": "cancelled", "id": "slow"}
+    assert application.cancellations.client_cancels == cancels + 1
+
+
+def test_too_many_waiting_messages_are_rejected(socket_client, fake_llm, monkeypatch):
+    import application
+
+    monkeypatch.setattr(application, "WS_MAX_PENDING", 1)
+    fake_llm.latency = LatencyModel("constant:5000")
+    with socket_client.websocket_connect("/ws/chat") as ws:
+        ws.receive_json()
+        ws.send_json({"message": "Which oil is best for deep frying?", "id": "m1"})
+        assert ws.receive_json() == {"type": "start", "id": "m1"}
+        ws.send_json({"message": "Any jaggery?", "id": "m2"})
+        ws.send_json({"message": "Tell me about ragi flour", "id": "m3"})
+        error = ws.receive_json()
+        assert (error["id"], error["status"]) == ("m3", 429)
+        ws.send_json({"type": "cancel"})
+        assert ws.receive_json()["type"] == "cancelled"
+
+
+class StalledSocket:
+    """A client that never reads: every send blocks"""
+
+    async def send_json(self, frame):
+        await asyncio.Event().wait()
+
+
+def test_slow_consumers_hit_backpressure_then_time_out():
+    async def scenario():
+        stats = SocketStats()
+        channel = SocketChannel(StalledSocket(), stats, max_frames=2, send_timeout=0.05)
+        channel.start()
+        # One frame is stuck in send_json, two fill the queue
+        for i in range(3):
+            await channel.send({"n": i})
+            await asyncio.sleep(0)
+        with pytest.raises(SlowConsumerError):
+            await channel.send({"n": 3})
+        await channel.close(flush_timeout=0.01)
+        return stats
+
+    stats = asyncio.run(scenario())
+    assert stats.slow_consumers == 1
+
+
+def test_pushes_never_wait():
+    async def scenario():
+        stats = SocketStats()
+        channel = SocketChannel(StalledSocket(), stats, max_frames=1)
+        assert channel.push({"type": "order_status"})
+        assert not channel.push({"type": "order_status"})
+        return stats
+
+    stats = asyncio.run(scenario())
+    assert (stats.pushes, stats.pushes_dropped) == (1, 1)
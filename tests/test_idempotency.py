@@ -0,0 +1,110 @@
+"""Tests for idempotency-keyed chat requests"""
+
+import asyncio
+
+import pytest
+
+from core.idempotency import IdempotencyConflict, IdempotencyStore, request_fingerprint
+
+
+def _counting(result="answer", delay=0.01):
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        return result
+
+    return work, calls
+
+
+def test_retry_after_completion_replays_the_result():
+    store = IdempotencyStore()
+    work, calls = _counting()
+    fp = request_fingerprint("s", "hello")
+
+    async def scenario():
+        return await store.run("k", fp, work), await store.run("k", fp, work)
+
+    first, second = asyncio.run(scenario())
+    assert first == ("answer", False) and second == ("answer", True)
+    assert len(calls) == 1 and store.replayed == 1
+
+
+def test_retry_while_running_attaches():
+    store = IdempotencyStore()
+    work, calls = _counting()
+    fp = request_fingerprint("s", "hello")
+
+    async def scenario():
+        return await asyncio.gather(store.run("k", fp, work), store.run("k", fp, work))
+
+    results = asyncio.run(scenario())
+    assert sorted(results) == [("answer", False), ("answer", True)]
+    assert len(calls) == 1 and store.attached == 1
+
+
+def test_key_reused_for_another_request_conflicts():
+    store = IdempotencyStore()
+    work, _ = _counting()
+
+    async def scenario():
+        await store.run("k", request_fingerprint("s", "hello"), work)
+        await store.run("k", request_fingerprint("s", "goodbye"), work)
+
+    with pytest.raises(IdempotencyConflict):
+        asyncio.run(scenario())
+
+
+def test_failed_work_is_forgotten():
+    store = IdempotencyStore()
+    fp = request_fingerprint("s", "hello")
+
+    async def fail():
+        raise RuntimeError("upstream down")
+
+    async def scenario():
+        with pytest.raises(RuntimeError):
+            await store.run("k", fp, fail)
+        return await store.run("k", fp, lambda: asyncio.sleep(0, result="ok"))
+
+    assert asyncio.run(scenario()) == ("ok", False)
+    assert store.failures == 1
+
+
+def test_work_outlives_a_disconnected_caller():
+    store = IdempotencyStore()
+    work, calls = _counting(delay=0.05)
+    fp = request_fingerprint("s", "hello")
+
+    async def scenario():
+        caller = asyncio.ensure_future(store.run("k", fp, work))
+        await asyncio.sleep(0.01)
+        caller.cancel()
+        await asyncio.gather(caller, return_exceptions=True)
+        return await store.run("k", fp, work)
+
+    assert asyncio.run(scenario()) == ("answer", True)
+    assert len(calls) == 1
+
+
+def test_results_expire():
+    store = IdempotencyStore(ttl_seconds=0)
+
+    async def scenario():
+        await store.run("k", "fp", lambda: asyncio.sleep(0, result=1))
+        return await store.run("k", "fp", lambda: asyncio.sleep(0, result=2))
+
+    assert asyncio.run(scenario()) == (2, False)
+
+
+def test_oldest_results_are_evicted():
+    store = IdempotencyStore(max_entries=1)
+
+    async def scenario():
+        await store.run("a", "fp", lambda: asyncio.sleep(0, result=1))
+        await store.run("b", "fp", lambda: asyncio.sleep(0, result=2))
+        return await store.run("a", "fp", lambda: asyncio.sleep(0, result=3))
+
+    assert asyncio.run(scenario()) == (3, False)
+    assert store.evictions >= 1
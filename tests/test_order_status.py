@@ -0,0 +1,48 @@
+"""Tests for bulk order-status lookups and the streaming /orders/status endpoint"""
+
+import asyncio
+import json
+
+from conftest import ADMIN_HEADERS, app_client
+from tools.shipping_tracker import get_shipping_status, get_shipping_statuses
+
+ORDER_IDS = ["ORD-1003", "ord1001", "ORD-9999", "ORD-1003", "order 1002"]
+
+
+def test_bulk_lookup_matches_single_lookups_in_request_order():
+    results = get_shipping_statuses(ORDER_IDS)
+    assert results == [get_shipping_status(order_id) for order_id in ORDER_IDS]
+    assert [r.get("order_id") for r in results] == ["ORD-1003", "ORD-1001", None, "ORD-1003", "ORD-1002"]
+    assert results[2] == {"success": False, "error": "Order ORD-9999 not found in our system."}
+
+
+def test_repeated_ids_get_independent_results():
+    first, second = get_shipping_statuses(["ORD-1001", "ORD-1001"])
+    first["status"] = "changed"
+    assert second["status"] != "changed"
+
+
+def _post(order_ids, headers=ADMIN_HEADERS):
+    async def scenario():
+        async with app_client() as client:
+            return await client.post("/orders/status", json={"order_ids": order_ids}, headers=headers)
+    return asyncio.run(scenario())
+
+
+def test_endpoint_streams_one_ndjson_line_per_id(monkeypatch):
+    import application
+    monkeypatch.setattr(application, "ORDER_STATUS_CHUNK", 2)
+
+    response = _post(ORDER_IDS)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines == get_shipping_statuses(ORDER_IDS)
+
+
+def test_endpoint_needs_admin_and_caps_ids(monkeypatch):
+    import application
+    monkeypatch.setattr(application, "ORDER_STATUS_MAX_IDS", 3)
+
+    assert _post(ORDER_IDS[:2], headers={}).status_code == 403
+    assert _post(ORDER_IDS).status_code == 413
@@ -0,0 +1,68 @@
+"""Tests for order-id normalization and the indexed OrderBook"""
+
+import asyncio
+
+import pytest
+
+from core.orders import OrderBook, normalize_order_id
+
+ORDERS = [
+    {"order_id": "ORD-1001", "customer_name": "John Smith", "order_date": "2026-01-20", "status": "Delivered"},
+    {"order_id": "ORD-1002", "customer_name": "Sarah Johnson", "order_date": "2026-01-25", "status": "In Transit"},
+    {"order_id": "ORD-1003", "customer_name": "John Appleseed", "order_date": "2026-02-02", "status": "In Transit"},
+    {"order_id": "ORD-1004", "customer_name": "John Smith", "order_date": "2026-02-10", "status": "Processing"},
+]
+
+
+@pytest.mark.parametrize("text", ["ORD-1001", "ord1001", "ORD 1001", "order 1001", "order #1001", "order no. 1001", "#1001", "1001"])
+def test_normalize_order_id(text):
+    assert normalize_order_id(text) == "ORD-1001"
+
+
+@pytest.mark.parametrize("text", ["", "hello", "ORD-12", "my order"])
+def test_non_order_text_is_not_an_id(text):
+    assert normalize_order_id(text) is None
+
+
+def test_get_accepts_any_spelling():
+    book = OrderBook(ORDERS)
+    assert book.get("ORD-1002")["customer_name"] == "Sarah Johnson"
+    assert book.get("order #1002")["customer_name"] == "Sarah Johnson"
+    assert book.get("ORD-9999") is None
+
+
+def test_find_by_customer_full_and_partial_name():
+    book = OrderBook(ORDERS)
+    assert [o["order_id"] for o in book.find(customer_name="john smith")] == ["ORD-1004", "ORD-1001"]
+    assert [o["order_id"] for o in book.find(customer_name="john")] == ["ORD-1004", "ORD-1003", "ORD-1001"]
+    assert book.find(customer_name="nobody") == []
+
+
+def test_find_combines_filters():
+    book = OrderBook(ORDERS)
+    found = book.find(customer_name="john", status="in transit")
+    assert [o["order_id"] for o in found] == ["ORD-1003"]
+
+    found = book.find(date_from="2026-01-25", date_to="2026-02-02")
+    assert [o["order_id"] for o in found] == ["ORD-1003", "ORD-1002"]
+
+
+def test_find_without_filters_matches_nothing():
+    assert OrderBook(ORDERS).find() == []
+
+
+def test_admin_order_search_validates_dates():
+    from conftest import ADMIN_HEADERS, app_client
+
+    async def scenario():
+        async with app_client() as client:
+            bad = await client.get("/admin/orders", params={"date_from": "garbage"}, headers=ADMIN_HEADERS)
+            good = await client.get("/admin/orders", params={"date_from": "2026-01-01", "status": "delivered"}, headers=ADMIN_HEADERS)
+            anonymous = await client.get("/admin/orders", params={"status": "delivered"})
+        return bad, good, anonymous
+
+    bad, good, anonymous = asyncio.run(scenario())
+    assert bad.status_code == 422
+    assert good.status_code == 200
+    assert good.json()["orders"] and all(o["status"] == "Delivered" for o in good.json()["orders"])
+    assert anonymous.status_code == 403
@@ -0,0 +1,49 @@
+"""Tests for the get_product_details lookup tool"""
+
+import pytest
+
+from tools.product_lookup import MAX_RESULTS, get_product_details
+
+
+def test_alternative_names_and_size_filter():
+    result = get_product_details(name="Nallennai", fields=["variants"], sizes=["1l"])
+    assert result["success"] and result["total"] == 1
+    product = result["products"][0]
+    assert product["name"] == "Cold Pressed Sesame Oil"
+    assert set(product) == {"name", "category", "variants"}
+    assert [v["size"] for v in product["variants"]] == ["1L"]
+
+
+def test_broad_lookups_page_through_every_match():
+    first = get_product_details(category="millet")
+    assert first["total"] > MAX_RESULTS
+    assert first["count"] == MAX_RESULTS and first["truncated"] and first["next_offset"] == MAX_RESULTS
+
+    names = [p["name"] for p in first["products"]]
+    offset = first["next_offset"]
+    while offset is not None:
+        page = get_product_details(category="millet", offset=offset)
+        names.extend(p["name"] for p in page["products"])
+        offset = page.get("next_offset")
+        assert page["truncated"] if offset is not None else "truncated" not in page
+
+    assert len(names) == first["total"]
+
+
+@pytest.mark.parametrize("query", [{}, {"name": "!!!"}, {"name": "  ", "category": "--"}])
+def test_queries_that_normalize_to_nothing_are_rejected(query):
+    result = get_product_details(**query)
+    assert not result["success"] and "name or a category" in result["error"]
+
+
+def test_blank_name_falls_back_to_the_category():
+    assert get_product_details(name="!!!", category="Dals")["total"] == get_product_details(category="Dals")["total"]
+
+
+def test_name_and_category_must_both_match():
+    assert not get_product_details(name="sesame oil", category="Dals")["success"]
+
+
+def test_unknown_fields_are_reported():
+    result = get_product_details(name="oil", fields=["price"])
+    assert not result["success"] and "Unknown fields: price" in result["error"]
@@ -0,0 +1,56 @@
+"""Tests for on-demand request profiling"""
+
+import asyncio
+import uuid
+
+from conftest import ADMIN_HEADERS, app_client
+from fake_llm_server import LatencyModel
+
+PROFILE_HEADERS = {**ADMIN_HEADERS, "X-Profile": "1"}
+
+
+def _chat(client, message: str, headers=None):
+    return client.post("/chat", json={"message": message, "session_id": f"prof-{uuid.uuid4().hex}"}, headers=headers or {})
+
+
+def test_profile_is_stored_and_served(fake_llm):
+    async def scenario():
+        async with app_client() as client:
+            response = await _chat(client, "Hello there", PROFILE_HEADERS)
+            profile_id = response.headers["X-Profile-Id"]
+            details = await client.get(f"/debug/profiles/{profile_id}", headers=ADMIN_HEADERS)
+            collapsed = await client.get(f"/debug/profiles/{profile_id}/collapsed", headers=ADMIN_HEADERS)
+            return response, details, collapsed
+
+    response, details, collapsed = asyncio.run(scenario())
+    assert response.status_code == 200
+    assert details.json()["other_requests"] == 0
+    assert details.json()["duration_ms"] > 0
+    assert collapsed.status_code == 200
+
+
+def test_header_needs_admin_token(fake_llm):
+    async def scenario():
+        async with app_client() as client:
+            return await _chat(client, "Hello there", {"X-Profile": "1"})
+
+    assert "X-Profile-Id" not in asyncio.run(scenario()).headers
+
+
+def test_profile_reports_concurrent_requests(fake_llm):
+    import application
+
+    fake_llm.latency = LatencyModel("constant:50")
+
+    async def scenario():
+        async with app_client() as client:
+            profiled = asyncio.ensure_future(_chat(client, "Tell me about ragi flour", PROFILE_HEADERS))
+            await asyncio.sleep(0.01)
+            await asyncio.gather(_chat(client, "Is the peanut oil cold pressed?"), _chat(client, "Which dal cooks fastest?"))
+            return await profiled
+
+    response = asyncio.run(scenario())
+    profile = application.profiler.get(response.headers["X-Profile-Id"])
+    # The samples include their work: the profile says so
+    assert profile.other_requests == 2
+    assert application.profiler.requests_in_flight == 0
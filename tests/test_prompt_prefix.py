@@ -0,0 +1,73 @@
+"""Tests for byte-identical request prefixes (upstream prompt caching)"""
+
+import copy
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from core.catalog import Catalog, get_catalog
+from core.prompt_state import PromptState
+from core.router import GREETING, ModelRouter
+from tools.definitions import TOOLS_BY_PROMPT, canonical_tools
+
+QUESTIONS = ["How much is the peanut oil?", "Any jaggery?", "What do you sell?", "Tell me about ragi flour"]
+
+
+@pytest.fixture(scope="module")
+def state():
+    return PromptState(get_catalog())
+
+
+@pytest.mark.parametrize("variant", ["minimal", "orders", "lookup", "catalog", "vector", "hybrid"])
+def test_every_turn_starts_with_the_variant_prefix(state, variant):
+    history = [{"role": "user", "content": "Any jaggery?"}, {"role": "assistant", "content": "We have Raw Cane Jaggery."}]
+    for question in QUESTIONS:
+        assert state.system_prompt(variant, history, question).startswith(state.prefixes[variant])
+
+
+def test_catalog_prefix_reaches_the_product_details(state):
+    prefix = state.prefixes["catalog"]
+    assert prefix.endswith(state.selector.index_section)
+    assert state.system_prompt("catalog", [], QUESTIONS[0]) != state.system_prompt("catalog", [], QUESTIONS[1])
+
+
+def test_prompts_ignore_key_order_in_the_catalog_file(state):
+    reordered = [dict(reversed(list(copy.deepcopy(p).items()))) for p in get_catalog().products]
+    for product in reordered:
+        product["variants"] = [dict(reversed(list(v.items()))) for v in product["variants"]]
+
+    other = PromptState(Catalog(reordered))
+    assert other.system_prompts == state.system_prompts
+    assert other.prefix_snapshot() == state.prefix_snapshot()
+    assert other.system_prompt("catalog", [], QUESTIONS[0]) == state.system_prompt("catalog", [], QUESTIONS[0])
+
+
+def test_tool_schemas_are_canonical():
+    for tools in TOOLS_BY_PROMPT.values():
+        if not tools:
+            continue
+        names = [tool["function"]["name"] for tool in tools]
+        assert names == sorted(names)
+        shuffled = [json.loads(json.dumps(tool)) for tool in reversed(tools)]
+        assert json.dumps(canonical_tools(shuffled)) == json.dumps(tools)
+
+
+@pytest.mark.parametrize("details, expected", [
+    (None, 0),
+    ({"cached_tokens": 512}, 512),
+    (SimpleNamespace(cached_tokens=256), 256),
+    ({"cached_tokens": None}, 0),
+])
+def test_cached_prompt_tokens(details, expected):
+    from application import cached_prompt_tokens
+    assert cached_prompt_tokens(SimpleNamespace(prompt_tokens_details=details)) == expected
+
+
+def test_cached_tokens_are_billed_at_a_discount():
+    router = ModelRouter()
+    route = router.route("hello")
+    router.record(route, "gpt-4o-mini", prompt_tokens=1_000_000, completion_tokens=0, cached_tokens=500_000)
+    stats = router.snapshot()[GREETING]
+    assert stats["cost_usd"] == pytest.approx(0.15 * 0.75)
+    assert stats["prompt_cache_hit_rate"] == 0.5
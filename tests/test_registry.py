@@ -0,0 +1,101 @@
+"""Tests for tool dispatch through the registry"""
+
+import asyncio
+
+from tools.registry import ASYNC, INLINE, THREAD, Tool
+
+
+def _schema(name="lookup", required=("query",)):
+    return {
+        "type": "function",
+        "function": {
+            "name": name,
+            "parameters": {
+                "type": "object",
+                "properties": {"query": {"type": "string"}, "limit": {"type": "integer"}},
+                "required": list(required),
+            },
+        },
+    }
+
+
+def run(tool: Tool, args):
+    return asyncio.run(tool.run(args))
+
+
+def test_non_object_arguments_are_an_error_result():
+    tool = Tool(_schema(), lambda query: {"success": True}, mode=INLINE)
+    for args in (["query"], "query", None, 3):
+        assert run(tool, args) == {"success": False, "error": "lookup arguments must be a JSON object"}
+    assert tool.calls == 0
+
+
+def test_missing_required_arguments_are_an_error_result():
+    tool = Tool(_schema(), lambda query: {"success": True}, mode=INLINE)
+    assert run(tool, {"limit": 3}) == {"success": False, "error": "lookup needs: query"}
+    assert run(tool, {"query": ""})["success"] is False
+
+
+def test_undeclared_arguments_are_dropped():
+    tool = Tool(_schema(), lambda query, limit=5: {"success": True, "query": query, "limit": limit}, mode=INLINE)
+    assert run(tool, {"query": "oil", "color": "red"}) == {"success": True, "query": "oil", "limit": 5}
+
+
+def test_exceptions_become_error_results():
+    def broken(query):
+        raise KeyError(query)
+
+    tool = Tool(_schema(), broken, mode=THREAD)
+    assert run(tool, {"query": "oil"}) == {"success": False, "error": "lookup failed"}
+    assert tool.errors == 1
+
+
+def test_timeouts_become_error_results():
+    async def slow(query):
+        await asyncio.sleep(1)
+
+    tool = Tool(_schema(), slow, mode=ASYNC, timeout=0.01)
+    assert run(tool, {"query": "oil"})["error"] == "lookup timed out, please try again later"
+    assert tool.timeouts == 1
+
+
+def test_successful_results_are_cached_per_arguments():
+    calls = []
+
+    def lookup(query):
+        calls.append(query)
+        return {"success": True, "query": query}
+
+    tool = Tool(_schema(), lookup, mode=INLINE, cache_ttl=60)
+
+    async def scenario():
+        for query in ("oil", "oil", "rice"):
+            await tool.run({"query": query})
+
+    asyncio.run(scenario())
+    assert calls == ["oil", "rice"]
+    assert tool.cache_hits == 1
+
+    tool.clear_cache()
+    run(tool, {"query": "oil"})
+    assert calls == ["oil", "rice", "oil"]
+
+
+def test_failed_results_are_not_cached():
+    calls = []
+
+    def lookup(query):
+        calls.append(query)
+        return {"success": False, "error": "not found"}
+
+    tool = Tool(_schema(), lookup, mode=INLINE, cache_ttl=60)
+    run(tool, {"query": "oil"})
+    run(tool, {"query": "oil"})
+    assert len(calls) == 2
+
+
+def test_long_results_are_trimmed_to_budget():
+    tool = Tool(_schema(), lambda query: {"success": True, "items": ["x" * 50] * 100}, mode=INLINE, max_result_chars=500)
+    result = run(tool, {"query": "oil"})
+    assert result["truncated"] is True
+    assert 0 < len(result["items"]) < 100
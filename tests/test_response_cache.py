@@ -0,0 +1,35 @@
+"""Tests for the exact-match response cache"""
+
+import time
+
+from core.response_cache import ResponseCache, fingerprint, normalize_message
+
+
+def test_normalization_ignores_case_punctuation_and_spacing():
+    assert normalize_message("  What OILS do you have?? ") == "what oils do you have"
+    assert fingerprint("What oils do you have?", "p1", "c1") == fingerprint("what oils  do you have", "p1", "c1")
+
+
+def test_fingerprint_changes_with_prompt_or_catalog_version():
+    base = fingerprint("hi", "p1", "c1")
+    assert base != fingerprint("hi", "p2", "c1")
+    assert base != fingerprint("hi", "p1", "c2")
+
+
+def test_lru_eviction():
+    cache = ResponseCache(max_entries=2)
+    cache.put("a", "A")
+    cache.put("b", "B")
+    assert cache.get("a") == "A"  # "b" is now least recently used
+    cache.put("c", "C")
+    assert cache.get("b") is None
+    assert cache.get("a") == "A" and cache.get("c") == "C"
+    assert cache.evictions == 1
+
+
+def test_entries_expire():
+    cache = ResponseCache(ttl_seconds=0.01)
+    cache.put("a", "A")
+    time.sleep(0.02)
+    assert cache.get("a") is None
+    assert cache.expirations == 1
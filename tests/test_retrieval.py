@@ -0,0 +1,76 @@
+"""Tests for switchable retrieval modes"""
+
+import asyncio
+import uuid
+
+import pytest
+
+from conftest import app_client
+from core.retrieval import FULL, HYBRID, VECTOR, RetrievalModes
+from core.router import ModelRouter
+
+ADVICE = "Which oil is best for deep frying?"
+LOOKUP = "How much is the peanut oil?"
+ORDER = "where is my order ORD-1001"
+
+
+@pytest.mark.parametrize("mode, expected", [
+    (FULL, {ADVICE: "catalog", LOOKUP: "lookup", ORDER: "orders"}),
+    (VECTOR, {ADVICE: "vector", LOOKUP: "vector", ORDER: "orders"}),
+    (HYBRID, {ADVICE: "hybrid", LOOKUP: "lookup", ORDER: "orders"}),
+])
+def test_modes_swap_only_product_prompts(mode, expected):
+    router, modes = ModelRouter(), RetrievalModes()
+    for message, prompt in expected.items():
+        route = router.route(message)
+        applied = modes.apply(route, mode)
+        assert applied.prompt == prompt
+        assert (applied.category, applied.model) == (route.category, route.model)
+
+
+def test_default_mode_and_request_counts():
+    modes = RetrievalModes(default=HYBRID)
+    route = ModelRouter().route(ADVICE)
+    assert modes.apply(route).prompt == "hybrid"
+    assert modes.apply(route, FULL).prompt == "catalog"
+    assert modes.snapshot() == {"default": HYBRID, "requests": {FULL: 1, VECTOR: 0, HYBRID: 1}}
+
+
+def test_unknown_modes_are_rejected():
+    with pytest.raises(ValueError, match="Unknown retrieval mode"):
+        RetrievalModes(default="bm25")
+    with pytest.raises(ValueError, match="Unknown retrieval mode"):
+        RetrievalModes().apply(ModelRouter().route(ADVICE), "bm25")
+
+
+@pytest.mark.parametrize("mode, prompt, tool", [
+    (FULL, "catalog", "get_product_details"),
+    (VECTOR, "vector", "vector_search"),
+    (HYBRID, "hybrid", "vector_search"),
+])
+def test_chat_sends_the_mode_prompt_and_tools(fake_llm, monkeypatch, mode, prompt, tool):
+    import application
+
+    requests = []
+    monkeypatch.setattr(fake_llm, "tool_calls", lambda body: requests.append(body) or [])
+    # A cached answer from another test would skip the upstream call
+    application.response_cache.clear()
+    if application.semantic_cache:
+        application.semantic_cache.invalidate()
+
+    async def scenario():
+        async with app_client() as client:
+            return await client.post("/chat", json={"message": ADVICE, "session_id": f"mode-{uuid.uuid4().hex}", "retrieval_mode": mode})
+
+    assert asyncio.run(scenario()).status_code == 200
+    system, tools = requests[0]["messages"][0]["content"], {t["function"]["name"] for t in requests[0]["tools"]}
+    assert system.startswith(application.prompt_state.prefixes[prompt])
+    assert tool in tools
+
+
+def test_chat_rejects_unknown_modes(fake_llm):
+    async def scenario():
+        async with app_client() as client:
+            return await client.post("/chat", json={"message": ADVICE, "session_id": "mode-bad", "retrieval_mode": "bm25"})
+
+    assert asyncio.run(scenario()).status_code == 422
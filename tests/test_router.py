@@ -0,0 +1,71 @@
+"""Tests for message classification and ModelRouter config"""
+
+import pytest
+
+from core.router import COMPLEX_ADVICE, GREETING, ORDER_LOOKUP, SIMPLE_CATALOG, ModelRouter, classify_message
+
+
+@pytest.mark.parametrize("message, expected", [
+    ("hi!", GREETING),
+    ("thank you so much", GREETING),
+    ("Where is ORD-1001?", ORDER_LOOKUP),
+    ("has my package shipped", ORDER_LOOKUP),
+    ("where is my stuff", ORDER_LOOKUP),
+    ("when will our parcel arrive", ORDER_LOOKUP),
+    ("what's my order status?", ORDER_LOOKUP),
+    ("I need the tracking number", ORDER_LOOKUP),
+    ("do you have ragi flour", SIMPLE_CATALOG),
+    ("which millet is best for diabetics", COMPLEX_ADVICE),
+    ("I want something for breakfast that is light", COMPLEX_ADVICE),
+])
+def test_classify_message(message, expected):
+    assert classify_message(message) == expected
+
+
+@pytest.mark.parametrize("message", [
+    "can I order ragi?",
+    "do you deliver to Pune?",
+    "is shipping free on oils",
+    "how fast is delivery",
+])
+def test_product_questions_mentioning_orders_stay_off_the_orders_tier(message):
+    assert classify_message(message) != ORDER_LOOKUP
+
+
+@pytest.mark.parametrize("message", ["ok", "okay", "yes please"])
+def test_acknowledgements_follow_the_conversation(message):
+    assert classify_message(message, has_history=False) == GREETING
+    assert classify_message(message, has_history=True) == SIMPLE_CATALOG
+
+
+def test_disabled_router_sends_everything_to_complex_tier():
+    router = ModelRouter(enabled=False)
+    assert router.route("hi").category == COMPLEX_ADVICE
+
+
+def test_route_overrides_apply():
+    router = ModelRouter(routes={GREETING: {"model": "tiny", "max_tokens": 50}})
+    route = router.route("hello")
+    assert (route.model, route.max_tokens, route.prompt) == ("tiny", 50, "minimal")
+
+
+def test_unknown_category_is_rejected():
+    with pytest.raises(ValueError):
+        ModelRouter(routes={"smalltalk": {"model": "tiny"}})
+
+
+def test_validate_prompts_names_the_bad_route():
+    router = ModelRouter(routes={ORDER_LOOKUP: {"prompt": "order"}})
+    with pytest.raises(ValueError, match="order_lookup -> 'order'"):
+        router.validate_prompts(["minimal", "orders", "lookup", "catalog"])
+    ModelRouter().validate_prompts(["minimal", "orders", "lookup", "catalog"])
+
+
+def test_record_tracks_cost_per_category():
+    router = ModelRouter()
+    route = router.route("hello")
+    router.record(route, "gpt-4o-mini", prompt_tokens=1_000_000, completion_tokens=0)
+    router.record_request(route, latency_ms=12.0)
+    stats = router.snapshot()[GREETING]
+    assert stats["requests"] == 1
+    assert stats["cost_usd"] == pytest.approx(0.15)
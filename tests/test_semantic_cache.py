@@ -0,0 +1,45 @@
+"""Tests for the semantic cache index (embeddings are supplied directly, no upstream calls)"""
+
+import numpy as np
+
+from core.answer_overlap import answer_overlap
+from core.semantic_cache import SemanticCache
+
+
+def _unit(*values) -> np.ndarray:
+    vector = np.array(values, dtype='float32')
+    return vector / np.linalg.norm(vector)
+
+
+def test_similar_question_hits_and_dissimilar_misses():
+    cache = SemanticCache(client=None, audit_rate=0)
+    cache.store(_unit(1, 0, 0), "what oils do you have", "Sesame and groundnut.", "ns", "v1")
+
+    hit = cache.lookup(_unit(1, 0.05, 0), "ns", "v1")
+    assert hit is not None and hit.response == "Sesame and groundnut."
+    assert cache.lookup(_unit(0, 1, 0), "ns", "v1") is None
+
+
+def test_entries_are_scoped_by_namespace_and_catalog_version():
+    cache = SemanticCache(client=None, audit_rate=0)
+    cache.store(_unit(1, 0, 0), "q", "a", "ns", "v1")
+
+    assert cache.lookup(_unit(1, 0, 0), "other", "v1") is None
+    # A new catalog version drops the index
+    assert cache.lookup(_unit(1, 0, 0), "ns", "v2") is None
+    assert cache.snapshot()["entries"] == 0
+
+
+def test_index_is_compacted_to_max_entries():
+    cache = SemanticCache(client=None, max_entries=2, audit_rate=0)
+    for i, vector in enumerate([_unit(1, 0, 0), _unit(0, 1, 0), _unit(0, 0, 1)]):
+        cache.store(vector, f"q{i}", f"a{i}", "ns", "v1")
+
+    assert cache.snapshot()["entries"] == 2
+    assert cache.lookup(_unit(1, 0, 0), "ns", "v1") is None
+    assert cache.lookup(_unit(0, 0, 1), "ns", "v1").response == "a2"
+
+
+def test_answer_overlap():
+    assert answer_overlap("Sesame oil, 2L.", "sesame oil 2l") == 1.0
+    assert answer_overlap("yes", "no") == 0.0
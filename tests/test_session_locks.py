@@ -0,0 +1,88 @@
+"""Tests for per-session request serialization policies"""
+
+import asyncio
+
+import pytest
+
+from core.session_locks import CANCEL, REJECT, WAIT, SessionBusyError, SessionLocks
+
+
+async def _turn(locks: SessionLocks, session_id: str, log: list, name: str, delay: float = 0.02):
+    async with locks.hold(session_id):
+        log.append(f"{name} start")
+        await asyncio.sleep(delay)
+        log.append(f"{name} end")
+
+
+def test_wait_policy_serializes_one_session():
+    locks = SessionLocks(WAIT)
+    log = []
+
+    async def scenario():
+        await asyncio.gather(_turn(locks, "s", log, "a"), _turn(locks, "s", log, "b"))
+
+    asyncio.run(scenario())
+    assert log == ["a start", "a end", "b start", "b end"]
+    assert locks.waited == 1
+    assert locks.snapshot()["active_sessions"] == 0
+
+
+def test_different_sessions_run_concurrently():
+    locks = SessionLocks(WAIT)
+    log = []
+
+    async def scenario():
+        await asyncio.gather(_turn(locks, "s1", log, "a"), _turn(locks, "s2", log, "b"))
+
+    asyncio.run(scenario())
+    assert log[:2] == ["a start", "b start"]
+
+
+def test_reject_policy_fails_fast():
+    locks = SessionLocks(REJECT)
+
+    async def scenario():
+        first = asyncio.ensure_future(_turn(locks, "s", [], "a"))
+        await asyncio.sleep(0)
+        with pytest.raises(SessionBusyError):
+            await _turn(locks, "s", [], "b")
+        await first
+
+    asyncio.run(scenario())
+    assert locks.rejected == 1
+
+
+def test_wait_timeout():
+    locks = SessionLocks(WAIT, wait_timeout=0.01)
+
+    async def scenario():
+        first = asyncio.ensure_future(_turn(locks, "s", [], "a", delay=0.1))
+        await asyncio.sleep(0)
+        with pytest.raises(SessionBusyError):
+            await _turn(locks, "s", [], "b")
+        await first
+
+    asyncio.run(scenario())
+    assert locks.timeouts == 1
+
+
+def test_cancel_policy_supersedes_the_older_request():
+    locks = SessionLocks(CANCEL)
+    log = []
+
+    async def scenario():
+        first = asyncio.ensure_future(_turn(locks, "s", log, "a", delay=10))
+        await asyncio.sleep(0)
+        await _turn(locks, "s", log, "b")
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return locks.was_superseded(first)
+
+    assert asyncio.run(scenario())
+    assert log == ["a start", "b start", "b end"]
+    assert locks.cancelled == 1
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        SessionLocks("queue")
@@ -0,0 +1,84 @@
+"""Tests for the session store's durable log, shared catch-up and write-failure resync"""
+
+import asyncio
+
+from core.local_redis import LocalRedis
+from core.session_store import SessionStore
+
+
+def _turn(text: str) -> dict:
+    return {"role": "user", "content": text}
+
+
+def test_memory_store_keeps_history():
+    store = SessionStore()
+
+    async def scenario():
+        store.append("s", [_turn("1")])
+        return await store.get("s")
+
+    assert asyncio.run(scenario()) == [_turn("1")]
+    assert not store.durable
+
+
+def test_durable_history_survives_a_restart(tmp_path):
+    db = str(tmp_path / "sessions.db")
+    store = SessionStore(LocalRedis(db))
+    store.append("s", [_turn("1"), _turn("2")])
+    store.close()
+
+    restarted = SessionStore(LocalRedis(db))
+    assert asyncio.run(restarted.get("s")) == [_turn("1"), _turn("2")]
+    assert restarted.loads == 1
+
+
+def test_shared_store_catches_up_on_other_workers_turns(tmp_path):
+    db = str(tmp_path / "sessions.db")
+    a = SessionStore(LocalRedis(db), shared=True)
+    b = SessionStore(LocalRedis(db), shared=True)
+
+    async def scenario():
+        await a.get("s")
+        b.append("s", [_turn("from b")])
+        b.flush()
+        return await a.get("s")
+
+    assert asyncio.run(scenario()) == [_turn("from b")]
+    assert a.catch_ups == 1
+
+
+class FlakyRedis(LocalRedis):
+    """LocalRedis whose next pipeline execute() fails once"""
+
+    fail_next = False
+
+    def pipeline(self):
+        pipe = super().pipeline()
+        if self.fail_next:
+            self.fail_next = False
+
+            def execute():
+                raise ConnectionError("store unavailable")
+            pipe.execute = execute
+        return pipe
+
+
+def test_failed_write_reloads_session_from_store(tmp_path):
+    client = FlakyRedis(str(tmp_path / "sessions.db"))
+    store = SessionStore(client, shared=True)
+
+    async def scenario():
+        store.append("s", [_turn("1")])
+        store.flush()
+        client.fail_next = True
+        store.append("s", [_turn("lost")])
+        store.flush()
+        history = await store.get("s")
+        store.append("s", [_turn("2")])
+        store.flush()
+        return history, client.lrange("session:s", 0, -1)
+
+    history, stored = asyncio.run(scenario())
+    assert history == [_turn("1"), _turn("2")]
+    assert len(stored) == 2
+    assert store.write_errors == 1 and store.resyncs == 1
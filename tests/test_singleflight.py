@@ -0,0 +1,91 @@
+"""Tests for single-flight coalescing"""
+
+import asyncio
+
+import pytest
+
+from core.singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "answer"
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do("key", work) for _ in range(5)))
+
+    results = asyncio.run(scenario())
+    assert calls == 1
+    assert [result for result, _ in results] == ["answer"] * 5
+    assert sorted(shared for _, shared in results) == [False] + [True] * 4
+    assert flight.snapshot()["in_flight"] == 0
+
+
+def test_failure_reaches_every_waiter_and_is_not_kept():
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    async def scenario():
+        results = await asyncio.gather(flight.do("key", fail), flight.do("key", fail), return_exceptions=True)
+        retried, _ = await flight.do("key", lambda: asyncio.sleep(0, result="ok"))
+        return results, retried
+
+    results, retried = asyncio.run(scenario())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert retried == "ok"
+    assert flight.failures == 1
+
+
+def test_work_survives_until_the_last_waiter_leaves():
+    flight = SingleFlight()
+
+    async def scenario():
+        work_done = asyncio.Event()
+
+        async def work():
+            await asyncio.sleep(0.05)
+            work_done.set()
+            return "answer"
+
+        first = asyncio.ensure_future(flight.do("key", work))
+        second = asyncio.ensure_future(flight.do("key", work))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        result, shared = await second
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return result, shared, work_done.is_set()
+
+    assert asyncio.run(scenario()) == ("answer", True, True)
+
+
+def test_last_waiter_leaving_cancels_the_work():
+    flight = SingleFlight()
+
+    async def scenario():
+        cancelled = asyncio.Event()
+
+        async def work():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        caller = asyncio.ensure_future(flight.do("key", work))
+        await asyncio.sleep(0.01)
+        caller.cancel()
+        await asyncio.gather(caller, return_exceptions=True)
+        await asyncio.sleep(0)
+        return cancelled.is_set()
+
+    assert asyncio.run(scenario())
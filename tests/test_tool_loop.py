@@ -0,0 +1,91 @@
+"""Tests for the parallel, multi-round tool loop in run_turn"""
+
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+from openai.types.chat import ChatCompletionMessage, ChatCompletionMessageToolCall
+
+QUESTION = "Which oil is best for deep frying?"
+
+
+def lookup(call_id: str, **arguments) -> ChatCompletionMessageToolCall:
+    """A get_product_details call"""
+    return ChatCompletionMessageToolCall(id=call_id, type="function", function={"name": "get_product_details", "arguments": json.dumps(arguments)})
+
+
+@pytest.fixture
+def model(monkeypatch):
+    """Scripted upstream: answers each round with the next list of tool calls, then with text"""
+    import application
+
+    script = SimpleNamespace(rounds=[], tools_offered=[])
+
+    async def create_completion(route, messages, tools):
+        script.tools_offered.append(bool(tools))
+        calls = script.rounds.pop(0) if tools and script.rounds else None
+        message = ChatCompletionMessage(role="assistant", content=None if calls else "Sesame oil.", tool_calls=calls)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    monkeypatch.setattr(application, "create_completion", create_completion)
+    return script
+
+
+def run_turn():
+    import application
+
+    route = application.router.route(QUESTION)
+    return asyncio.run(application.run_turn(application.prompt_state, route, [], QUESTION))
+
+
+def test_tool_calls_in_a_round_run_concurrently_in_call_order(model, monkeypatch):
+    import application
+
+    async def slow_tool_call(call):
+        await asyncio.sleep(0.15 if call.id == "first" else 0.1)
+        return {"tool_call_id": call.id, "role": "tool", "name": call.function.name, "content": "{}"}
+
+    monkeypatch.setattr(application, "execute_tool_call", slow_tool_call)
+    model.rounds = [[lookup("first", name="sesame oil"),
+                     lookup("second", name="peanut oil"),
+                     lookup("third", name="sunflower oil")]]
+
+    started = time.perf_counter()
+    turn = run_turn()
+    assert time.perf_counter() - started < 0.3
+
+    assert [m["role"] for m in turn] == ["user", "assistant", "tool", "tool", "tool", "assistant"]
+    assert [m["tool_call_id"] for m in turn[2:5]] == ["first", "second", "third"]
+    assert turn[-1]["content"] == "Sesame oil."
+
+
+def test_tool_results_reach_the_model(model):
+    model.rounds = [[lookup("a", name="Nallennai", fields=["variants"])], [lookup("b", name="!!!")]]
+
+    turn = run_turn()
+    first, second = json.loads(turn[2]["content"]), json.loads(turn[4]["content"])
+    assert first["products"][0]["name"] == "Cold Pressed Sesame Oil"
+    assert not second["success"]
+    assert model.tools_offered == [True, True, True]
+
+
+def test_rounds_stop_at_max_tool_rounds(model, monkeypatch):
+    import application
+
+    monkeypatch.setattr(application, "MAX_TOOL_ROUNDS", 2)
+    model.rounds = [[lookup(f"r{i}", name="oil")] for i in range(5)]
+
+    turn = run_turn()
+    # Two rounds of tools, then a round without tools forces the answer
+    assert model.tools_offered == [True, True, False]
+    assert sum(1 for m in turn if m["role"] == "tool") == 2
+    assert turn[-1] == {"role": "assistant", "content": "Sesame oil."}
+
+
+def test_bad_arguments_become_a_tool_error(model):
+    model.rounds = [[ChatCompletionMessageToolCall(id="bad", type="function", function={"name": "get_product_details", "arguments": "{oops"})]]
+
+    turn = run_turn()
+    assert json.loads(turn[2]["content"]) == {"success": False, "error": "Tool arguments were not valid JSON"}
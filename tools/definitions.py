@@ -0,0 +1,134 @@
+"""
+OpenAI function/tool definitions exposed to the model, and the registry
+that runs them
+"""
+import json
+
+from core.catalog import on_catalog_change
+from tools.product_lookup import PRODUCT_FIELDS, get_product_details
+from tools.registry import ASYNC, INLINE, THREAD, Tool, ToolRegistry
+from tools.shipping_tracker import get_live_shipping_status
+from tools.vector_search import vector_search
+from prompts.tool_description_v2 import VECTOR_SEARCH_TOOL_DESCRIPTION
+
+
+def canonical_tools(tools: list) -> list:
+    """
+    Tool schemas sorted by name, with sorted keys at every level
+
+    Tool definitions are part of the upstream prompt prefix, so they must
+    serialize byte-identically on every request for prompt caching to hit.
+    """
+    ordered = sorted(tools, key=lambda tool: tool["function"]["name"])
+    return json.loads(json.dumps(ordered, sort_keys=True))
+
+
+SHIPPING_STATUS_TOOL = {
+    "type": "function",
+    "function": {
+        "name": "get_shipping_status",
+        "description": "Look up order/shipment status by order ID. Use this when customers ask about their order, delivery status, tracking information, or when they mention an order number. For several orders, call it once per order ID in the same response.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "order_id": {
+                    "type": "string",
+                    "description": "The order ID exactly as the customer wrote it (e.g., ORD-1001, ord1001, order 1001)"
+                }
+            },
+            "required": ["order_id"]
+        }
+    }
+}
+
+PRODUCT_DETAILS_TOOL = {
+    "type": "function",
+    "function": {
+        "name": "get_product_details",
+        "description": "Look up product facts (prices/sizes, features, ingredients, serving ideas) by product name, alternative name, or category. Request only the fields needed to answer the question. Results come in pages of 10; 'total' is the number of matches, and a truncated result has a next_offset for the next page.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "name": {
+                    "type": "string",
+                    "description": "Product name or alternative name (e.g., 'Sesame Oil', 'Nallennai')"
+                },
+                "category": {
+                    "type": "string",
+                    "description": "Category or subcategory (e.g., 'Dals', 'Instant Millet Noodles')"
+                },
+                "fields": {
+                    "type": "array",
+                    "items": {"type": "string", "enum": PRODUCT_FIELDS},
+                    "description": "Fields to return; omit for all fields"
+                },
+                "sizes": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Only return these variant sizes (e.g., ['1L', '5L'])"
+                },
+                "offset": {
+                    "type": "integer",
+                    "description": "Skip this many matches; pass next_offset from a truncated result to get the next page"
+                }
+            }
+        }
+    }
+}
+
+VECTOR_SEARCH_TOOL = {
+    "type": "function",
+    "function": {
+        "name": "vector_search",
+        "description": VECTOR_SEARCH_TOOL_DESCRIPTION,
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "Natural language search query (e.g., 'oil for deep frying')"
+                },
+                "top_k": {
+                    "type": "integer",
+                    "description": "Maximum number of products to return (default 5)"
+                },
+                "metadata_filter": {
+                    "type": "object",
+                    "description": "Optional filter on category, subcategory or price, e.g. {\"category\": {\"$ne\": \"Cold-Pressed Oils\"}} (operators: $eq, $ne, $in, $nin, $gt, $lt)"
+                }
+            },
+            "required": ["query"]
+        }
+    }
+}
+
+# How each tool runs and its limits
+registry = ToolRegistry()
+
+# Indexed order store plus live carrier tracking (with its own, shorter time budget);
+# order status is live data, so never cached here
+registry.register(Tool(SHIPPING_STATUS_TOOL, get_live_shipping_status, mode=ASYNC, timeout=5.0, max_result_chars=4000))
+
+# In-memory catalog lookup: a thread hop would cost more than the call itself
+registry.register(Tool(PRODUCT_DETAILS_TOOL, get_product_details, mode=INLINE, max_result_chars=12000))
+
+# Embeds the query with a blocking client; identical searches reuse the result
+registry.register(Tool(VECTOR_SEARCH_TOOL, vector_search, mode=THREAD, timeout=15.0, cache_ttl=300, max_result_chars=8000))
+
+# Cached results describe the catalog they were computed from
+on_catalog_change(lambda catalog: registry.clear_cache)
+
+# Shipping tracker and product lookup
+TOOLS = canonical_tools(registry.definitions(["get_shipping_status", "get_product_details"]))
+
+# Shipping tracker and semantic product search (vector / hybrid retrieval modes)
+VECTOR_TOOLS = canonical_tools(registry.definitions(["get_shipping_status", "vector_search"]))
+
+# Tools offered with each prompt variant (variants without tools are absent)
+TOOLS_BY_PROMPT = {
+    "orders": TOOLS,
+    "lookup": TOOLS,
+    "catalog": TOOLS,
+    "vector": VECTOR_TOOLS,
+    "hybrid": VECTOR_TOOLS,
+}
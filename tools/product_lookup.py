@@ -0,0 +1,140 @@
+"""
+Product lookup tool backed by the compiled catalog's name/category indexes
+Lets the model fetch only the product facts it needs instead of reading the whole catalog
+"""
+from typing import Dict, List, Optional
+
+from core.catalog import Catalog, get_catalog, normalize_name
+
+# Fields the model can ask for (name and category are always returned)
+PRODUCT_FIELDS = [
+    "subcategory",
+    "description",
+    "key_features",
+    "ingredients",
+    "serving_ideas",
+    "variants",
+    "alternative_names",
+]
+
+# Products per page for broad lookups (e.g. a whole category); callers page with offset
+MAX_RESULTS = 10
+
+def find_products(catalog: Catalog, name: Optional[str] = None, category: Optional[str] = None) -> List[int]:
+    """Product indexes matching a name and/or category (best matches first, all of them)"""
+    matches: Optional[List[int]] = None
+    # Queries that are only punctuation/whitespace normalize to "" - treat them as absent
+    category = normalize_name(category) if category else ""
+    name = normalize_name(name) if name else ""
+
+    if category:
+        matches = _match(category, catalog.by_category)
+
+    if name:
+        by_name = _match(name, catalog.by_name)
+        if matches is None:
+            matches = by_name
+        else:
+            in_category = set(matches)
+            matches = [i for i in by_name if i in in_category]
+
+    return matches or []
+
+
+def _match(query: str, index: Dict[str, List[int]]) -> List[int]:
+    # Exact, then substring ("sesame oil" in "cold pressed sesame oil"), then all-words match
+    if query in index:
+        return list(index[query])
+
+    found: List[int] = []
+    for key, ids in index.items():
+        if query in key or key in query:
+            found.extend(i for i in ids if i not in found)
+    if found:
+        return found
+
+    words = set(query.split())
+    for key, ids in index.items():
+        if words and words <= set(key.split()) | {"s"}:
+            found.extend(i for i in ids if i not in found)
+    return found
+
+
+def get_product_details(
+    name: Optional[str] = None,
+    category: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+    sizes: Optional[List[str]] = None,
+    offset: int = 0
+) -> dict:
+    """
+    Look up products by name / alternative name and/or category
+
+    Args:
+        name: Product name or alternative name (e.g. "Sesame Oil", "Nallennai")
+        category: Category or subcategory (e.g. "Dals", "Instant Millet Noodles")
+        fields: Fields to return (defaults to all of PRODUCT_FIELDS)
+        sizes: Only return these variant sizes (e.g. ["1L", "5L"])
+        offset: Skip this many matches (paging through a large category, MAX_RESULTS at a time)
+
+    Returns:
+        Dictionary with a page of matching products ("total" matches overall;
+        "truncated" and "next_offset" when more remain) or an error message
+    """
+    try:
+        if not (name and normalize_name(name)) and not (category and normalize_name(category)):
+            return {
+                "success": False,
+                "error": "Provide a product name or a category to look up."
+            }
+
+        unknown = [f for f in (fields or []) if f not in PRODUCT_FIELDS]
+        if unknown:
+            return {
+                "success": False,
+                "error": f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(PRODUCT_FIELDS)}"
+            }
+
+        catalog = get_catalog()
+        matches = find_products(catalog, name=name, category=category)
+        offset = max(0, int(offset or 0))
+
+        if not matches:
+            return {
+                "success": False,
+                "error": f"No products found matching {name or category!r}."
+            }
+
+        wanted = fields or PRODUCT_FIELDS
+        wanted_sizes = {normalize_name(s) for s in sizes} if sizes else None
+
+        page = matches[offset:offset + MAX_RESULTS]
+        products = []
+        for i in page:
+            product = catalog.products[i]
+            result = {"name": product["name"], "category": product["category"]}
+
+            for field in wanted:
+                if field == "variants" and wanted_sizes:
+                    result["variants"] = [v for v in product["variants"] if normalize_name(v["size"]) in wanted_sizes]
+                else:
+                    result[field] = product.get(field)
+
+            products.append(result)
+
+        result = {
+            "success": True,
+            "count": len(products),
+            "total": len(matches),
+            "products": products
+        }
+        if offset + len(page) < len(matches):
+            result["truncated"] = True
+            result["next_offset"] = offset + len(page)
+        return result
+
+    except Exception as e:
+        return {
+            "success": False,
+            "error": f"Error looking up product: {str(e)}"
+        }
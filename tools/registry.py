@@ -0,0 +1,233 @@
+"""
+Declarative tool registry
+Each tool declares its schema, how it runs, and its limits; the chat loop
+dispatches through the registry, which collects per-tool metrics.
+"""
+
+import asyncio
+import inspect
+import json
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Dict, Iterable, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Execution modes
+INLINE = "inline"  # sync, on the event loop (fast in-memory work; no timeout)
+THREAD = "thread"  # sync and blocking, in a worker thread
+ASYNC = "async"    # coroutine function, cancelled on timeout
+
+MODES = (INLINE, THREAD, ASYNC)
+
+
+class Tool:
+    """
+    One tool the model can call
+
+    Args:
+        schema: OpenAI function tool definition ({"type": "function", "function": {...}})
+        fn: Implementation; called with the schema's declared parameters as keyword arguments
+        mode: INLINE, THREAD or ASYNC (default: ASYNC for coroutine functions, else THREAD)
+        timeout: Seconds before the call is abandoned (THREAD) or cancelled (ASYNC)
+        cache_ttl: Seconds to reuse the result for identical arguments (0: no caching)
+        max_result_chars: Serialized result budget; longer results are trimmed
+    """
+
+    CACHE_SIZE = 256
+    LATENCY_WINDOW = 1000
+
+    def __init__(
+        self,
+        schema: Dict,
+        fn: Callable,
+        mode: Optional[str] = None,
+        timeout: float = 10.0,
+        cache_ttl: float = 0,
+        max_result_chars: Optional[int] = None
+    ):
+        self.schema = schema
+        self.name = schema["function"]["name"]
+        self.fn = fn
+        self.mode = mode or (ASYNC if inspect.iscoroutinefunction(fn) else THREAD)
+        if self.mode not in MODES:
+            raise ValueError(f"Unknown tool mode for {self.name}: {self.mode} (expected one of {MODES})")
+        if self.mode == ASYNC and not inspect.iscoroutinefunction(fn):
+            raise ValueError(f"Tool {self.name} is declared async but {fn.__name__} is not a coroutine function")
+        self.timeout = timeout
+        self.cache_ttl = cache_ttl
+        self.max_result_chars = max_result_chars
+        self.parameters = set(schema["function"].get("parameters", {}).get("properties", {}))
+        self.required = list(schema["function"].get("parameters", {}).get("required", []))
+
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()
+        # clear_cache() also runs on the catalog watcher thread
+        self._cache_lock = threading.Lock()
+        self.latencies = deque(maxlen=self.LATENCY_WINDOW)
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.cancelled = 0
+        self.cache_hits = 0
+        self.truncated = 0
+
+    def _cached(self, key: str) -> Optional[Dict]:
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            expires_at, result = entry
+            if expires_at <= time.time():
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            return result
+
+    def _store(self, key: str, result: Dict):
+        with self._cache_lock:
+            self._cache[key] = (time.time() + self.cache_ttl, result)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.CACHE_SIZE:
+                self._cache.popitem(last=False)
+
+    def clear_cache(self):
+        with self._cache_lock:
+            self._cache.clear()
+
+    async def _invoke(self, args: Dict) -> Dict:
+        if self.mode == INLINE:
+            return self.fn(**args)
+        if self.mode == THREAD:
+            # wait_for stops waiting on timeout; the thread finishes on its own
+            return await asyncio.wait_for(asyncio.to_thread(self.fn, **args), self.timeout)
+        return await asyncio.wait_for(self.fn(**args), self.timeout)
+
+    async def run(self, args: Dict) -> Dict:
+        """
+        Call the tool, never raising except on cancellation
+
+        Args:
+            args: Decoded tool-call arguments (the model can send any JSON value)
+
+        Returns:
+            The tool's result, or {"success": False, "error": ...} on failure
+        """
+        if not isinstance(args, dict):
+            self.errors += 1
+            logger.warning(f"⚠️ Tool {self.name} called with {type(args).__name__} arguments")
+            return {"success": False, "error": f"{self.name} arguments must be a JSON object"}
+
+        # Hallucinated arguments the schema doesn't declare are dropped
+        args = {key: value for key, value in args.items() if key in self.parameters}
+        missing = [name for name in self.required if args.get(name) in (None, "")]
+        if missing:
+            self.errors += 1
+            return {"success": False, "error": f"{self.name} needs: {', '.join(missing)}"}
+
+        key = json.dumps(args, sort_keys=True) if self.cache_ttl else None
+        if key is not None:
+            cached = self._cached(key)
+            if cached is not None:
+                self.cache_hits += 1
+                return cached
+
+        self.calls += 1
+        started = time.perf_counter()
+        try:
+            result = await self._invoke(args)
+
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            logger.warning(f"⏱️ Tool {self.name} timed out after {self.timeout}s")
+            return {"success": False, "error": f"{self.name} timed out, please try again later"}
+
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"❌ Tool {self.name} failed: {str(e)}", exc_info=True)
+            return {"success": False, "error": f"{self.name} failed"}
+
+        finally:
+            self.latencies.append((time.perf_counter() - started) * 1000)
+
+        result = self._fit(result)
+        if key is not None and result.get("success", True):
+            self._store(key, result)
+        return result
+
+    def _fit(self, result: Dict) -> Dict:
+        """Trim the longest list in the result until it fits max_result_chars"""
+        if not self.max_result_chars or len(json.dumps(result)) <= self.max_result_chars:
+            return result
+
+        self.truncated += 1
+        result = dict(result)
+        while len(json.dumps(result)) > self.max_result_chars:
+            lists = [key for key, value in result.items() if isinstance(value, list) and value]
+            if not lists:
+                logger.warning(f"✂️ Tool {self.name} result exceeds {self.max_result_chars} chars")
+                return {"success": False, "error": f"{self.name} result too large - narrow the request"}
+            longest = max(lists, key=lambda key: len(json.dumps(result[key])))
+            result[longest] = result[longest][:-1]
+        result["truncated"] = True
+        return result
+
+    def snapshot(self) -> dict:
+        latencies = sorted(self.latencies)
+
+        def pct(p):
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))], 2)
+
+        lookups = self.calls + self.cache_hits
+        return {
+            "mode": self.mode,
+            "calls": self.calls,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "cancelled": self.cancelled,
+            "truncated": self.truncated,
+            "cache_hits": self.cache_hits,
+            "cache_hit_rate": round(self.cache_hits / lookups, 3) if self.cache_ttl and lookups else None,
+            "latency_ms_p50": pct(0.50),
+            "latency_ms_p95": pct(0.95),
+        }
+
+
+class ToolRegistry:
+    """Tools by name; builds the definitions offered to the model and dispatches calls"""
+
+    def __init__(self):
+        self._tools: Dict[str, Tool] = {}
+
+    def register(self, tool: Tool) -> Tool:
+        if tool.name in self._tools:
+            raise ValueError(f"Tool {tool.name} is already registered")
+        self._tools[tool.name] = tool
+        return tool
+
+    def get(self, name: str) -> Optional[Tool]:
+        return self._tools.get(name)
+
+    def definitions(self, names: Iterable[str]) -> List[Dict]:
+        """Schemas of the named tools (order follows `names`)"""
+        return [self._tools[name].schema for name in names]
+
+    async def run(self, name: str, args: Dict) -> Dict:
+        tool = self._tools.get(name)
+        if tool is None:
+            return {"success": False, "error": f"Unknown tool: {name}"}
+        return await tool.run(args)
+
+    def clear_cache(self):
+        for tool in self._tools.values():
+            tool.clear_cache()
+
+    def snapshot(self) -> dict:
+        return {name: tool.snapshot() for name, tool in self._tools.items()}
@@ -1,32 +1,76 @@
 """
 Shipping tracker tool for order status lookup
 """
+import asyncio
 import json
-import os
-from datetime import datetime, timedelta
-from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from core.carrier import CarrierTracker
+from core.orders import ORDERS_PATH, get_order_book, order_book_is_current
+
+# Default cap on orders returned by a customer / status / date search
+MAX_ORDER_MATCHES = 10
+
+# Live carrier tracking (CARRIER_API_URL); None keeps results to orders.json
+carrier = CarrierTracker.from_env()
+
+# Orders the carrier has and hasn't delivered yet - the only ones worth a live lookup
+IN_TRANSIT_STATUSES = {"shipped", "in transit", "out for delivery"}
+
+# Most recent carrier events returned per order
+MAX_TRACKING_EVENTS = 3
 
 def load_orders():
     """Load orders from JSON file"""
-    orders_path = Path(__file__).parent.parent / "data" / "orders.json"
-    with open(orders_path, 'r') as f:
+    with open(ORDERS_PATH, 'r') as f:
         return json.load(f)
 
+def format_order(order: dict) -> dict:
+    """Per-order status result returned by the shipping tools"""
+    result = {
+        "success": True,
+        "order_id": order["order_id"],
+        "customer_name": order["customer_name"],
+        "product_name": order["product_name"],
+        "quantity": order["quantity"],
+        "order_date": order["order_date"],
+        "status": order["status"],
+        "shipping_method": order["shipping_method"]
+    }
+
+    # Add shipping dates if available
+    if order.get("shipped_date"):
+        result["shipped_date"] = order["shipped_date"]
+
+    if order.get("estimated_delivery"):
+        result["estimated_delivery"] = order["estimated_delivery"]
+
+    if order.get("actual_delivery"):
+        result["actual_delivery"] = order["actual_delivery"]
+
+    if order.get("tracking_number"):
+        result["tracking_number"] = order["tracking_number"]
+
+    # Add shipping policy info based on method
+    if order["shipping_method"] == "Standard":
+        result["shipping_policy"] = "Standard shipping: 5-7 business days"
+    elif order["shipping_method"] == "Express":
+        result["shipping_policy"] = "Express shipping: 2-3 business days"
+
+    return result
+
 def get_shipping_status(order_id: str) -> dict:
     """
     Look up order status by order ID
 
     Args:
-        order_id: The order ID to look up (e.g., "ORD-1001")
+        order_id: The order ID to look up, as the customer wrote it (e.g., "ORD-1001", "ord1001", "order 1001")
 
     Returns:
         Dictionary with order status information or error message
     """
     try:
-        orders = load_orders()
-
-        # Find the order
-        order = next((o for o in orders if o["order_id"] == order_id), None)
+        order = get_order_book().get(order_id)
 
         if not order:
             return {
@@ -34,38 +78,142 @@ def get_shipping_status(order_id: str) -> dict:
                 "error": f"Order {order_id} not found in our system."
             }
 
-        # Format the response
-        result = {
-            "success": True,
-            "order_id": order["order_id"],
-            "customer_name": order["customer_name"],
-            "product_name": order["product_name"],
-            "quantity": order["quantity"],
-            "order_date": order["order_date"],
-            "status": order["status"],
-            "shipping_method": order["shipping_method"]
+        return format_order(order)
+
+    except Exception as e:
+        return {
+            "success": False,
+            "error": f"Error looking up order: {str(e)}"
         }
 
-        # Add shipping dates if available
-        if order.get("shipped_date"):
-            result["shipped_date"] = order["shipped_date"]
+def find_orders(
+    customer_name: Optional[str] = None,
+    status: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    limit: int = MAX_ORDER_MATCHES
+) -> dict:
+    """
+    Search orders by customer, status and order date (newest first)
 
-        if order.get("estimated_delivery"):
-            result["estimated_delivery"] = order["estimated_delivery"]
+    For support staff only (see /admin/orders): chat users aren't identified,
+    so this is not offered to the model - it would list other customers' orders.
 
-        if order.get("actual_delivery"):
-            result["actual_delivery"] = order["actual_delivery"]
+    Args:
+        customer_name: Full or partial customer name (e.g., "John Smith", "Smith")
+        status: Order status (e.g., "In Transit")
+        date_from: Earliest order date, inclusive (YYYY-MM-DD)
+        date_to: Latest order date, inclusive (YYYY-MM-DD)
+        limit: Most orders to return
 
-        # Add shipping policy info based on method
-        if order["shipping_method"] == "Standard":
-            result["shipping_policy"] = "Standard shipping: 5-7 business days"
-        elif order["shipping_method"] == "Express":
-            result["shipping_policy"] = "Express shipping: 2-3 business days"
+    Returns:
+        Dictionary with the match count and matching orders, or an error message
+    """
+    if not (customer_name or status or date_from or date_to):
+        return {
+            "success": False,
+            "error": "Provide a customer name, status or order date range."
+        }
 
-        return result
+    try:
+        matches = get_order_book().find(customer_name=customer_name, status=status, date_from=date_from, date_to=date_to)
+        return {
+            "success": True,
+            "matches": len(matches),
+            "orders": [format_order(order) for order in matches[:limit]]
+        }
 
     except Exception as e:
         return {
             "success": False,
-            "error": f"Error looking up order: {str(e)}"
+            "error": f"Error searching orders: {str(e)}"
         }
+
+async def add_live_tracking(orders: List[dict]):
+    """
+    Add the carrier's status and latest tracking events to the orders in transit
+
+    One batched carrier lookup covers all of them. Orders keep their stored
+    status when the carrier is slow or down (tracking is then stale or marked
+    unavailable); see CarrierTracker. No-op when live tracking is off.
+    """
+    in_transit = [order for order in orders if order.get("status", "").lower() in IN_TRANSIT_STATUSES]
+    if carrier is None or not in_transit:
+        return
+
+    tracking = await carrier.track(order.get("tracking_number") or order["order_id"] for order in in_transit)
+    for order in in_transit:
+        live = tracking.get(order.get("tracking_number") or order["order_id"])
+        if live is None:
+            order["live_tracking"] = "unavailable"
+            continue
+        order["carrier_status"] = live.get("status")
+        order["tracking_events"] = (live.get("events") or [])[-MAX_TRACKING_EVENTS:]
+        if live.get("stale"):
+            order["live_tracking"] = "stale"
+
+async def get_live_shipping_status(order_id: str) -> dict:
+    """
+    get_shipping_status, plus the carrier's latest tracking events when the order is in transit
+
+    Args:
+        order_id: Same as get_shipping_status
+
+    Returns:
+        Dictionary as returned by get_shipping_status, with "carrier_status" and
+        "tracking_events" added for orders in transit
+    """
+    # Lookups on the current index are in-memory; only a reload from disk leaves the event loop
+    if order_book_is_current():
+        result = get_shipping_status(order_id)
+    else:
+        result = await asyncio.to_thread(get_shipping_status, order_id)
+    if result.get("success"):
+        await add_live_tracking([result])
+    return result
+
+def iter_shipping_statuses(order_ids: Iterable[str]) -> Iterator[dict]:
+    """
+    Look up the status of many orders against the indexed order store
+
+    Args:
+        order_ids: Order IDs to look up; duplicates are answered each time
+
+    Yields:
+        One result per requested ID, in request order, in the same format as
+        get_shipping_status (including the per-order "not found" error)
+    """
+    try:
+        book = get_order_book()
+    except Exception as e:
+        error = {"success": False, "error": f"Error looking up order: {str(e)}"}
+        for _ in order_ids:
+            yield dict(error)
+        return
+
+    # Repeated ids (common in bulk requests) are formatted once
+    formatted: Dict[str, dict] = {}
+    for order_id in order_ids:
+        result = formatted.get(order_id)
+        if result is None:
+            order = book.get(order_id)
+            if order is None:
+                yield {
+                    "success": False,
+                    "error": f"Order {order_id} not found in our system."
+                }
+                continue
+            result = formatted[order_id] = format_order(order)
+        yield dict(result)
+
+def get_shipping_statuses(order_ids: List[str]) -> List[dict]:
+    """
+    Look up order status for a list of order IDs
+
+    Args:
+        order_ids: The order IDs to look up (e.g., ["ORD-1001", "ORD-1002"])
+
+    Returns:
+        One result per order ID, in the same order, each as returned by get_shipping_status
+    """
+    return list(iter_shipping_statuses(order_ids))
@@ -1,19 +1,45 @@
 """
 Vector search using FAISS index and OpenAI embeddings
-Loads pre-generated FAISS index and uses OpenAI for query embeddings
+Loads pre-generated FAISS index (or builds one in memory from the catalog)
+and uses OpenAI for query embeddings
 """
 
 import json
 import numpy as np
 import faiss
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional
 import os
 from openai import OpenAI
 import logging
 
+from core.catalog import Catalog, get_catalog, on_catalog_change
+
 logger = logging.getLogger(__name__)
 
+EMBEDDING_MODEL = "text-embedding-3-small"
+
+
+def embed_texts(client: OpenAI, texts: List[str], model: str = EMBEDDING_MODEL) -> np.ndarray:
+    """
+    Embed a batch of texts with OpenAI
+
+    Args:
+        client: OpenAI client
+        texts: Texts to embed
+        model: Embedding model name
+
+    Returns:
+        float32 numpy array of shape (len(texts), dim)
+    """
+    response = client.embeddings.create(
+        input=texts,
+        model=model
+    )
+
+    return np.array([item.embedding for item in response.data], dtype='float32')
+
+
 class VectorSearch:
     """
     Vector search implementation using FAISS and OpenAI embeddings
@@ -42,14 +68,9 @@ class VectorSearch:
         """
         self.index_path = Path(index_path)
         self.metadata_path = Path(metadata_path)
-        
-        # Initialize OpenAI client
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            raise ValueError("OPENAI_API_KEY not found in environment variables")
-        
-        self.client = OpenAI(api_key=api_key)
-        self.embedding_model = "text-embedding-3-small"
+        self.from_catalog_version = None
+
+        self._init_client()
         
         # Load FAISS index and metadata
         self._load_index()
@@ -60,6 +81,38 @@ class VectorSearch:
         logger.info(f"   Products: {len(self.metadata)}")
         logger.info(f"   Vectors: {self.index.ntotal}")
     
+    @classmethod
+    def from_catalog(cls, catalog: Catalog) -> "VectorSearch":
+        """
+        Build an in-memory index over the compiled catalog
+        Used when no pre-generated index exists; embeds one document per product.
+        """
+        self = cls.__new__(cls)
+        self.index_path = self.metadata_path = None
+        self.from_catalog_version = catalog.version
+        self._init_client()
+
+        self.metadata = [catalog_metadata(product, catalog.price_ranges[i]) for i, product in enumerate(catalog.products)]
+        documents = [catalog.compact_text[i] + "\n" + (product.get("description") or "") + "\n" + "; ".join(product.get("key_features") or [])
+                     for i, product in enumerate(catalog.products)]
+
+        logger.info(f"🧮 Building in-memory vector index for {len(documents)} products (catalog {catalog.version})...")
+        embeddings = embed_texts(self.client, documents, self.embedding_model)
+        self.index = faiss.IndexFlatL2(embeddings.shape[1])
+        self.index.add(embeddings)
+        logger.info(f"✅ In-memory vector index built: {self.index.ntotal} vectors")
+
+        return self
+
+    def _init_client(self):
+        """Initialize OpenAI client"""
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise ValueError("OPENAI_API_KEY not found in environment variables")
+
+        self.client = OpenAI(api_key=api_key, base_url=os.getenv("OPENAI_BASE_URL"))
+        self.embedding_model = EMBEDDING_MODEL
+
     def _load_index(self):
         """Load FAISS index from disk"""
         if not self.index_path.exists():
@@ -97,12 +150,7 @@ class VectorSearch:
         """
         logger.info(f"🤖 Generating query embedding via OpenAI...")
         
-        response = self.client.embeddings.create(
-            input=[query],
-            model=self.embedding_model
-        )
-        
-        embedding = np.array(response.data[0].embedding, dtype='float32')
+        embedding = embed_texts(self.client, [query], self.embedding_model)[0]
         
         logger.info(f"✅ Query embedding generated (dim: {len(embedding)})")
         
@@ -195,12 +243,31 @@ class VectorSearch:
         return True
 
 
+def catalog_metadata(product: dict, price_range: Optional[tuple]) -> dict:
+    """Search result / filter fields for one catalog product (price = lowest variant price)"""
+    return {
+        "name": product["name"],
+        "category": product["category"],
+        "subcategory": product.get("subcategory"),
+        "description": product.get("description"),
+        "key_features": product.get("key_features"),
+        "variants": product.get("variants"),
+        "price": price_range[0] if price_range else None,
+    }
+
+
 # Singleton instance
 _vector_search_instance = None
 
+# Set once the catalog has been reloaded: a pre-generated index on disk still
+# describes the catalog the process started with, so it's never used again
+_disk_index_stale = False
+
 def get_vector_search() -> VectorSearch:
     """
     Get or create VectorSearch singleton instance
+    Falls back to an in-memory index over the catalog when no pre-generated index
+    exists, or when the catalog has been reloaded since the index was generated
     
     Returns:
         VectorSearch instance
@@ -209,6 +276,56 @@ def get_vector_search() -> VectorSearch:
     
     if _vector_search_instance is None:
         logger.info("🔄 Initializing VectorSearch (first call)...")
-        _vector_search_instance = VectorSearch()
+        if _disk_index_stale:
+            _vector_search_instance = VectorSearch.from_catalog(get_catalog())
+        else:
+            try:
+                _vector_search_instance = VectorSearch()
+            except FileNotFoundError as e:
+                logger.warning(f"⚠️ {str(e).splitlines()[0]} - indexing the catalog instead")
+                _vector_search_instance = VectorSearch.from_catalog(get_catalog())
     
-    return _vector_search_instance
\ No newline at end of file
+    return _vector_search_instance
+
+
+def _drop_catalog_index(catalog: Catalog):
+    """Drop the index on catalog reload; the next search rebuilds it in memory from the new catalog"""
+    def swap():
+        global _vector_search_instance, _disk_index_stale
+
+        _vector_search_instance = None
+        _disk_index_stale = True
+
+    return swap
+
+on_catalog_change(_drop_catalog_index)
+
+
+def vector_search(query: str, top_k: int = 5, metadata_filter: Optional[dict] = None) -> dict:
+    """
+    Semantic product search tool
+
+    Blocking (embeds the query) - call from a worker thread, not the event loop.
+
+    Args:
+        query: Natural language search query
+        top_k: Maximum number of products to return
+        metadata_filter: Optional filter, e.g. {"category": {"$ne": "Cold-Pressed Oils"}}
+
+    Returns:
+        Dictionary with the matching products or an error message
+    """
+    try:
+        results = get_vector_search().search(query, top_k=max(1, min(int(top_k or 5), 10)), metadata_filter=metadata_filter)
+
+        return {
+            "success": True,
+            "count": len(results),
+            "products": results
+        }
+
+    except Exception as e:
+        return {
+            "success": False,
+            "error": f"Error searching products: {str(e)}"
+        }